@@ -0,0 +1,218 @@
+"""
+LLM 摘要路径的压测：通过 `mock` provider 把 LLMClient 指向本地 stub，
+按可配置的延迟分布、生成速度、错误率和 429 比例驱动以下场景：
+
+  - burst:   直接并发调用 LLMClient.generate_response（--concurrency 个线程）
+  - stream:  同 burst，但使用 LLMClient.stream_response，额外统计首 token 延迟
+  - filter:  process_papers（关键词筛选 + 逐篇摘要，与流水线一致）
+  - summary: generate_llm_summary 的 hierarchical 模式（map 并发数 = --concurrency）
+
+每个场景输出 requests/sec、p50/p95/p99 延迟（stream 场景另有首 token 延迟）、错误率、429 比例和输入/输出 token 数，
+用于在接入真实 provider 之前确定并发与分块配置。
+
+用法（在仓库根目录）:
+    python benchmarks/llm_load_test.py --requests 200 --concurrency 8 --latency-ms 400 --error-rate 0.02 --rate-limit-rate 0.05
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import yaml
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_benchmark import DEFAULT_RESULTS_DIR, git_revision, write_bench_config
+from stub_server import LLMProfile, StubAPIServer, TOPIC_WORDS, synthetic_title
+
+SCENARIOS = ("burst", "stream", "filter", "summary")
+
+
+def synthetic_abstract(index, n_sentences=6):
+    words = TOPIC_WORDS[index % len(TOPIC_WORDS)], TOPIC_WORDS[(index * 7) % len(TOPIC_WORDS)]
+    sentence = (f"We study {words[0]} and propose a method that combines it with {words[1]}, "
+                f"improving accuracy and efficiency on standard benchmarks.")
+    return " ".join([sentence] * n_sentences)
+
+
+def synthetic_papers(n):
+    return [{
+        'title': synthetic_title(i),
+        'authors': ["Bench Author"],
+        'abstract': synthetic_abstract(i),
+        'pdf_url': "",
+        'venue': ["CVPR", "ICLR", "ACL"][i % 3],
+        'decision': None,
+    } for i in range(n)]
+
+
+def collect(server, wall, calls_before):
+    """从 metrics 注册表与 stub 状态码统计汇总一个场景的结果"""
+    from utils.metrics import metrics
+
+    data = metrics.to_dict()
+    requests = {'ok': 0, 'error': 0}
+    tokens = {'in': 0, 'out': 0}
+    tokens_saved = 0
+    for counter in data['counters']:
+        if counter['name'] == "llm_requests":
+            requests[counter['labels']['status']] += counter['value']
+        elif counter['name'] == "llm_tokens":
+            tokens[counter['labels']['direction']] += counter['value']
+        elif counter['name'] == "prompt_tokens_saved":
+            tokens_saved += counter['value']
+    latency = next((h for h in data['histograms'] if h['name'] == "llm_request_seconds"), None)
+    first_token = next((h for h in data['histograms'] if h['name'] == "llm_first_token_seconds"), None)
+
+    statuses = {k: v - calls_before.get(k, 0) for k, v in server.state.statuses.items()
+                if k.startswith("llm_chat:") and v - calls_before.get(k, 0)}
+    total = requests['ok'] + requests['error']
+    http_total = sum(statuses.values()) or 1
+
+    def ms(value):
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        'wall_seconds': round(wall, 3),
+        'requests': total,
+        'requests_per_second': round(total / wall, 2) if wall else None,
+        'ok': requests['ok'],
+        'errors': requests['error'],
+        'error_rate': round(requests['error'] / total, 4) if total else 0,
+        'http_statuses': {k.split(":", 1)[1]: v for k, v in statuses.items()},
+        'http_429_rate': round(statuses.get("llm_chat:429", 0) / http_total, 4),
+        'http_5xx_rate': round(sum(v for k, v in statuses.items() if k.split(":", 1)[1].startswith("5")) / http_total, 4),
+        'latency_ms': {
+            'p50': ms(latency['p50']) if latency else None,
+            'p95': ms(latency['p95']) if latency else None,
+            'p99': ms(latency['p99']) if latency else None,
+            'mean': ms(latency['mean']) if latency else None,
+        },
+        'first_token_ms': {
+            'p50': ms(first_token['p50']),
+            'p95': ms(first_token['p95']),
+        } if first_token else None,
+        'tokens_in': tokens['in'],
+        'tokens_out': tokens['out'],
+        'tokens_out_per_second': round(tokens['out'] / wall, 1) if wall else None,
+        'prompt_tokens_saved': tokens_saved,
+    }
+
+
+def run_scenario(name, args, papers):
+    from processors.filter_and_summarize import process_papers
+    from processors.llm_client import get_llm_client
+    from processors.llm_summary import generate_llm_summary
+
+    if name in ("burst", "stream"):
+        client = get_llm_client()
+        messages = [[{"role": "system", "content": "Summarize the paper abstract into 2-3 sentences."},
+                     {"role": "user", "content": p['abstract']}] for p in papers[:args.requests]]
+
+        def call(message):
+            try:
+                if name == "stream":
+                    for _ in client.stream_response(message, temperature=0.3, max_tokens=200):
+                        pass
+                else:
+                    client.generate_response(message, temperature=0.3, max_tokens=200)
+            except Exception:
+                pass  # 错误已记录在 llm_requests 指标中
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(call, messages))
+    elif name == "filter":
+        process_papers(papers[:args.requests])
+    elif name == "summary":
+        scored = [{**p, 'summary': p['abstract'], 'repo': None, 'stars': 0, 'score': 0} for p in papers]
+        stats = {'total_papers': len(scored), 'open_source_count': 0, 'avg_score': 0.0, 'keyword_counts': {}}
+        generate_llm_summary(stats, scored)
+
+
+def print_result(name, result):
+    latency = result['latency_ms']
+    print(f"  {name:<8} {result['requests']:>5} req  {result['requests_per_second']:>7} req/s  "
+          f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms  "
+          f"errors={result['error_rate']:.1%} 429={result['http_429_rate']:.1%}  "
+          f"tokens in/out={result['tokens_in']}/{result['tokens_out']} saved={result['prompt_tokens_saved']}"
+          + (f"  first token p50={result['first_token_ms']['p50']}ms p95={result['first_token_ms']['p95']}ms"
+             if result['first_token_ms'] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the LLM summarization path against a mock provider")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=100, help="Requests for burst and stream / papers for filter")
+    parser.add_argument("--papers", type=int, default=500, help="Papers for the hierarchical summary scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Threads for burst and stream / map workers for summary")
+    parser.add_argument("--chunk-tokens", type=int, default=3000)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Median latency before the first token")
+    parser.add_argument("--latency-dist", default="lognormal", choices=["fixed", "uniform", "lognormal"])
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Spread of the lognormal distribution")
+    parser.add_argument("--tokens-per-sec", type=float, default=0, help="Generation speed (0: no generation time)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 500 response")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument("--max-retries", type=int, default=0, help="OpenAI SDK retries in the mock provider")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR)
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline output")
+    args = parser.parse_args()
+
+    profile = LLMProfile(args.latency_ms, args.latency_dist, args.latency_sigma, args.tokens_per_sec,
+                         args.error_rate, args.rate_limit_rate, seed=args.seed)
+    server = StubAPIServer(cvf_papers=1, llm_profile=profile).start()
+    workdir = tempfile.mkdtemp(prefix="research-agent-llm-load-")
+    previous_cwd = os.getcwd()
+    print(f"🧪 Mock LLM provider on {server.url}/v1 ({args.latency_dist} {args.latency_ms}ms, "
+          f"errors {args.error_rate:.0%}, 429 {args.rate_limit_rate:.0%})")
+
+    results = {}
+    try:
+        config = write_bench_config(workdir, server.url, "mock")
+        config['mock']['max_retries'] = args.max_retries
+        config['llm_summary'] = {'mode': 'hierarchical', 'group_by': 'venue', 'chunk_tokens': args.chunk_tokens,
+                                 'reduce_tokens': args.chunk_tokens * 2, 'max_workers': args.concurrency}
+        with open(os.path.join(workdir, "configs", "config.yaml"), "w") as f:
+            yaml.safe_dump(config, f)
+        os.chdir(workdir)
+
+        from utils.metrics import metrics
+
+        papers = synthetic_papers(max(args.requests, args.papers))
+        for name in args.scenarios:
+            metrics.reset()
+            calls_before = dict(server.state.statuses)
+            sink = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            start = time.perf_counter()
+            with sink:
+                run_scenario(name, args, papers if name != "summary" else papers[:args.papers])
+            results[name] = collect(server, time.perf_counter() - start, calls_before)
+            print_result(name, results[name])
+    finally:
+        os.chdir(previous_cwd)
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    result_path = os.path.join(args.results_dir, f"llm-load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'params': vars(args),
+            'scenarios': results,
+        }, f, indent=2)
+    print(f"💾 Results saved → {result_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+离线端到端基准测试：在独立进程中启动本地 stub 服务，调用 main.py 的各阶段函数（run_fetch / run_filter /
+run_score / run_report）跑完整流程，统计吞吐量、各阶段耗时、每篇论文的 API 调用次数和内存峰值
+（tracemalloc 只统计本进程，不含 stub 服务），并保存结果以便比较回归。
+fetch 阶段包含 CVF 列表页（无摘要）和 arXiv OAI-PMH（带摘要，filter 阶段会调用 LLM 生成摘要）。
+
+用法（在仓库根目录）:
+    python benchmarks/run_benchmark.py --papers 300 --latency-ms 20 --llm-latency-ms 300
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import yaml
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubProcess, latency_config, rate_limit_config
+
+DEFAULT_RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+
+def write_bench_config(workdir, stub_url, provider, max_papers=200, arxiv_papers=0):
+    """在临时工作目录中写入指向 stub 服务的 configs/config.yaml 和 keywords.txt"""
+    configs_dir = os.path.join(workdir, "configs")
+    os.makedirs(configs_dir, exist_ok=True)
+    config = {
+        'llm_provider': provider,
+        'huggingface': {'api_key': 'bench', 'model': 'stub-model', 'base_url': f"{stub_url}/hf"},
+        'groq': {'api_key': 'bench', 'model': 'stub-model', 'base_url': f"{stub_url}/v1"},
+        'together': {'api_key': 'bench', 'model': 'stub-model', 'base_url': f"{stub_url}/v1"},
+        'openai': {'api_key': 'bench', 'base_url': f"{stub_url}/v1"},
+        'mock': {'base_url': f"{stub_url}/v1"},
+        'github': {'token': 'bench', 'api_url': f"{stub_url}/github"},
+        'paperswithcode': {'api_key': 'bench', 'api_url': f"{stub_url}/pwc"},
+        'slack': {'webhook_url': ''},
+        'fetch': {
+            'since_date': '2022-01-01',
+            'max_papers': max_papers,
+            'cvf_conferences': [{'url': f"{stub_url}/cvf/CVPR2023", 'venue': "CVPR"}],
+        },
+        'arxiv': {
+            'enabled': bool(arxiv_papers),
+            'oai_url': f"{stub_url}/arxiv/oai",
+            'categories': ["cs.CV", "cs.CL", "cs.LG"],
+            'since_date': '2024-01-01',
+            'max_papers': arxiv_papers,
+        },
+    }
+    with open(os.path.join(configs_dir, "config.yaml"), "w") as f:
+        yaml.safe_dump(config, f)
+    shutil.copy(os.path.join(REPO_ROOT, "configs", "keywords.txt"), os.path.join(configs_dir, "keywords.txt"))
+    return config
+
+
+class StageRecorder:
+    """记录每个阶段的耗时、API 调用增量和内存峰值"""
+
+    def __init__(self, server, verbose=False):
+        self.server = server
+        self.verbose = verbose
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        calls_before = self.server.state.snapshot()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        sink = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        try:
+            with sink:
+                yield
+        finally:
+            wall = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            calls_after = self.server.state.snapshot()
+            calls = {k: v - calls_before.get(k, 0) for k, v in calls_after.items() if v - calls_before.get(k, 0)}
+            self.stages[name] = {
+                'wall_seconds': round(wall, 4),
+                'api_calls': calls,
+                'peak_memory_mb': round(peak / 1024 / 1024, 2),
+            }
+            print(f"  ⏱️  {name:<10} {wall:8.2f}s  calls={sum(calls.values()):<6} peak={peak / 1024 / 1024:.1f}MB")
+
+
+def run_pipeline(recorder):
+    """调用 main.py 的阶段函数运行流程（validate 在 run_score 中），返回各阶段的论文数量"""
+    import main as pipeline
+    from utils import config as config_loader
+
+    config_loader.set_config_path(os.path.join("configs", "config.yaml"))
+    config = config_loader.validate_config(config_loader.load_config(), pipeline.STAGES)
+    counts = {}
+
+    with recorder.stage("fetch"):
+        counts['fetched'] = len(pipeline.run_fetch(config))
+
+    with recorder.stage("filter"):
+        counts['filtered'] = len(pipeline.run_filter(config))
+
+    with recorder.stage("score"):
+        scored = pipeline.run_score(config, workers=0)
+    counts['scored'] = len(scored)
+    counts['matched'] = sum(1 for p in scored if p.get('repo'))
+
+    with recorder.stage("report"):
+        pipeline.run_report(config, notify=False)
+
+    return counts
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def latest_result(results_dir, exclude=None):
+    files = sorted(glob.glob(os.path.join(results_dir, "bench-*.json")))
+    files = [f for f in files if f != exclude]
+    return files[-1] if files else None
+
+
+def compare(current, baseline_path):
+    """打印与基线结果的差异（百分比）"""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    print(f"\n📈 Comparison with {os.path.basename(baseline_path)} ({baseline.get('git_revision')}):")
+
+    def delta(new, old):
+        if not old:
+            return "   n/a"
+        return f"{(new - old) / old:+7.1%}"
+
+    for key in ('papers_per_second', 'wall_seconds', 'api_calls_per_paper', 'peak_memory_mb'):
+        new, old = current['totals'].get(key), baseline.get('totals', {}).get(key)
+        if new is not None and old is not None:
+            print(f"  {key:<22} {old:>10} → {new:<10} {delta(new, old)}")
+    for name, stage in current['stages'].items():
+        old = baseline.get('stages', {}).get(name)
+        if old:
+            print(f"  stage {name:<16} {old['wall_seconds']:>10} → {stage['wall_seconds']:<10} "
+                  f"{delta(stage['wall_seconds'], old['wall_seconds'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark against a local API stub")
+    parser.add_argument("--papers", type=int, default=200, help="Number of CVF papers to fetch")
+    parser.add_argument("--arxiv-papers", type=int, default=50,
+                        help="Number of arXiv papers (with abstracts) to harvest from the stub OAI-PMH endpoint")
+    parser.add_argument("--latency-ms", type=float, default=10, help="Mean latency of REST stubs")
+    parser.add_argument("--llm-latency-ms", type=float, default=200, help="Mean latency of LLM stubs")
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="Rate-limit every Nth GitHub search / LLM call (note: GitHubFetcher waits 60s on 403)")
+    parser.add_argument("--pwc-hit-rate", type=float, default=0.3)
+    parser.add_argument("--provider", default="huggingface", choices=["huggingface", "groq", "together", "openai", "mock"])
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR)
+    parser.add_argument("--baseline", help="Result file to compare against (default: latest in results dir)")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline output")
+    args = parser.parse_args()
+
+    server = StubProcess(cvf_papers=max(args.papers, 1), arxiv_papers=args.arxiv_papers,
+                         latency_ms=latency_config(args.latency_ms, args.llm_latency_ms),
+                         rate_limit_every=rate_limit_config(args.rate_limit_every),
+                         pwc_hit_rate=args.pwc_hit_rate).start()
+    workdir = tempfile.mkdtemp(prefix="research-agent-bench-")
+    previous_cwd = os.getcwd()
+    print(f"🧪 Stub API server on {server.url}, workdir {workdir}")
+
+    tracemalloc.start()
+    try:
+        write_bench_config(workdir, server.url, args.provider, args.papers, args.arxiv_papers)
+        os.chdir(workdir)
+        recorder = StageRecorder(server, args.verbose)
+        start = time.perf_counter()
+        counts = run_pipeline(recorder)
+        wall = time.perf_counter() - start
+        api_calls, api_statuses = server.state.calls, server.state.statuses
+    finally:
+        tracemalloc.stop()
+        os.chdir(previous_cwd)
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total_calls = sum(api_calls.values())
+    fetched = counts['fetched'] or 1
+    result = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'params': vars(args),
+        'counts': counts,
+        'stages': recorder.stages,
+        'api_calls': api_calls,
+        'api_statuses': api_statuses,
+        'totals': {
+            'wall_seconds': round(wall, 3),
+            'papers_per_second': round(counts['fetched'] / wall, 2) if wall else None,
+            'api_calls': total_calls,
+            'api_calls_per_paper': round(total_calls / fetched, 3),
+            'api_calls_per_scored_paper': round(total_calls / counts['scored'], 3) if counts['scored'] else None,
+            'peak_memory_mb': max(s['peak_memory_mb'] for s in recorder.stages.values()),
+        },
+    }
+
+    print(f"\n✅ {counts['fetched']} papers in {wall:.2f}s ({result['totals']['papers_per_second']} papers/s), "
+          f"{total_calls} API calls ({result['totals']['api_calls_per_paper']}/paper), "
+          f"{counts['matched']} repos matched")
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    result_path = os.path.join(args.results_dir, f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    baseline_path = args.baseline or latest_result(args.results_dir)
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"💾 Results saved → {result_path}")
+
+    if baseline_path and os.path.exists(baseline_path):
+        compare(result, baseline_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,608 @@
+"""
+本地 API stub 服务，用于离线基准测试。
+
+模拟以下接口（路径前缀可直接填入 config.yaml 的 api_url / base_url）：
+  - GitHub REST/search:   {url}/github/search/repositories, {url}/github/repos/{owner}/{repo}[/readme]
+  - GitHub GraphQL:       {url}/github/graphql（仓库批量验证查询：别名 r0..rN，变量 o0/n0..oN/nN）
+  - PapersWithCode:       {url}/pwc/papers/search/?q=...
+  - CVF 论文列表页:        {url}/cvf/{CONF}?day=all
+  - arXiv OAI-PMH:         {url}/arxiv/oai（ListRecords，metadataPrefix=arXiv，每页 PAGE_SIZE 条，带摘要）
+  - OpenAI 兼容 chat 接口: {url}/v1/chat/completions（支持 stream=True 的 SSE 输出）
+  - HuggingFace 推理接口:  {url}/hf/models/{model}
+
+所有数据由请求内容的哈希确定性地生成，同样的请求总是得到同样的结果。
+调用计数可通过 {url}/_stats 读取（不计入调用数），StubProcess 在独立进程中运行服务时用它读取计数。
+"""
+import argparse
+import base64
+import hashlib
+import json
+import math
+import multiprocessing
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+import requests
+
+# arXiv OAI-PMH 每页记录数
+ARXIV_PAGE_SIZE = 100
+
+# 合成标题使用的词汇
+MODEL_PREFIXES = ['Bi', 'Vi', 'Mask', 'Seg', 'Diff', 'Flow', 'Point', 'Scene', 'Neu', 'Omni', 'Dream', 'Style']
+MODEL_SUFFIXES = ['Former', 'Net', 'GAN', 'Fusion', 'Diff', 'NeRF', 'Track', 'Mamba', 'Adapter', 'CLIP']
+TOPIC_WORDS = ['transformer', 'attention', 'diffusion', 'autoregressive', 'generative model',
+               'segmentation', 'detection', 'depth estimation', '3D reconstruction', 'video generation',
+               'reinforcement learning', 'fine-tuning', 'large language model', 'point clouds',
+               'optical flow', 'image restoration', 'self-supervised learning', 'domain adaptation']
+CONNECTIVES = ['for', 'via', 'with', 'towards', 'using']
+FIRST_NAMES = ['Wei', 'Anna', 'Kai', 'Maria', 'Jun', 'Lukas', 'Priya', 'Tom', 'Yuki', 'Omar']
+LAST_NAMES = ['Zhang', 'Smith', 'Li', 'Garcia', 'Wang', 'Müller', 'Patel', 'Chen', 'Sato', 'Haddad']
+# 与 fetchers/github_fetcher.py 的 README_ALIASES 一致
+GRAPHQL_README_ALIASES = ['readmeMd', 'readmeRst', 'readmeLower', 'readmeTitle', 'readmeMarkdown', 'readmeTxt',
+                          'readmePlain']
+
+
+def _rng(*parts):
+    """根据请求内容得到确定性的随机数生成器"""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def synthetic_title(index, seed=0):
+    rng = _rng("title", seed, index)
+    model = rng.choice(MODEL_PREFIXES) + rng.choice(MODEL_SUFFIXES)
+    topic = rng.choice(TOPIC_WORDS)
+    other = rng.choice(TOPIC_WORDS)
+    if rng.random() < 0.7:
+        return f"{model}: {topic.title()} {rng.choice(CONNECTIVES)} {other.title()}"
+    return f"{topic.title()} {rng.choice(CONNECTIVES)} {other.title()} {index}"
+
+
+def synthetic_abstract(index, seed=0):
+    """4-8 句摘要，话题词来自 TOPIC_WORDS（大部分论文能通过关键词筛选）"""
+    rng = _rng("abstract", seed, index)
+    sentences = []
+    for _ in range(rng.randint(4, 8)):
+        topic, other = rng.choice(TOPIC_WORDS), rng.choice(TOPIC_WORDS)
+        sentences.append(rng.choice([
+            f"We study {topic} in the setting of {other}.",
+            f"Existing approaches to {topic} struggle when {other} data is scarce.",
+            f"Our method combines {topic} with {other} and improves accuracy by {rng.randint(1, 15)}.{rng.randint(0, 9)}%.",
+            f"Experiments on {rng.randint(2, 6)} benchmarks show consistent gains over strong {other} baselines.",
+            f"The key idea is to treat {topic} as a form of {other}.",
+        ]))
+    return " ".join(sentences)
+
+
+def _readme_text(owner, name):
+    rng = _rng("readme", owner, name)
+    words = name.replace('-', ' ')
+    return (f"# {words}\n\nOfficial implementation of the paper \"{words.title()}\".\n\n"
+            f"[arXiv](https://arxiv.org/abs/23{rng.randint(1, 12):02d}.{rng.randint(10000, 99999)})\n\n"
+            + "\n".join(f"- {rng.choice(TOPIC_WORDS)}" for _ in range(rng.randint(5, 40))))
+
+
+def _repo_payload(owner, name):
+    """/repos/{owner}/{repo} 的返回内容；搜索结果中的条目与其一致"""
+    rng = _rng("repo", owner, name)
+    stars = int(rng.paretovariate(1.1) * 20)
+    created = f"20{rng.randint(18, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00Z"
+    updated = f"20{rng.randint(23, 26)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00Z"
+    words = name.replace('-', ' ').replace('_', ' ')
+    description = rng.choice([
+        f"Official PyTorch implementation of {words}",
+        f"Code for the paper {words}",
+        f"{words} toolkit",
+        f"A collection of resources about {words}",
+        None,
+    ])
+    return {
+        'id': int(hashlib.sha1(f"{owner}/{name}".encode("utf-8")).hexdigest()[:12], 16),
+        'name': name,
+        'full_name': f"{owner}/{name}",
+        'html_url': f"https://github.com/{owner}/{name}",
+        'description': description,
+        'topics': [t.replace(' ', '-') for t in _rng("topics", owner, name).sample(TOPIC_WORDS, 3)],
+        'stargazers_count': stars,
+        'forks_count': stars // 7,
+        'created_at': created,
+        'updated_at': updated,
+        'language': 'Python',
+    }
+
+
+class StubState:
+    """
+    stub 服务的共享状态：延迟/限流配置与调用计数
+    latency_ms: {endpoint: 平均延迟毫秒}，实际延迟在 [0.5x, 1.5x] 之间均匀抖动
+    rate_limit_every: {endpoint: N}，每第 N 次请求返回限流错误（GitHub 403 / LLM 429）
+    llm_profile: LLM 接口的压测配置（见 LLMProfile），设置后替代 latency_ms 中的 LLM 延迟
+    """
+
+    def __init__(self, latency_ms=None, rate_limit_every=None, pwc_hit_rate=0.3, seed=0, llm_profile=None):
+        self.latency_ms = latency_ms or {}
+        self.rate_limit_every = rate_limit_every or {}
+        self.pwc_hit_rate = pwc_hit_rate
+        self.seed = seed
+        self.llm_profile = llm_profile
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.statuses = {}
+
+    def record(self, endpoint, status):
+        with self.lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            key = f"{endpoint}:{status}"
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            return self.calls[endpoint]
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.calls)
+
+    def should_rate_limit(self, endpoint):
+        every = self.rate_limit_every.get(endpoint, 0)
+        if not every:
+            return False
+        with self.lock:
+            count = self.calls.get(endpoint, 0) + 1
+        return count % every == 0
+
+    def sleep(self, endpoint):
+        latency = self.latency_ms.get(endpoint, 0)
+        if latency:
+            time.sleep(latency * random.uniform(0.5, 1.5) / 1000.0)
+
+
+class LLMProfile:
+    """
+    LLM 接口的延迟与故障模型
+    latency_ms:      首 token 前的延迟中位数（毫秒）
+    latency_dist:    fixed / uniform（[0.5x, 1.5x]）/ lognormal（按 latency_sigma 拖出长尾）
+    tokens_per_sec:  生成速度，输出 token 数 / tokens_per_sec 计入总延迟（0 表示不计）
+    error_rate:      返回 500 的概率
+    rate_limit_rate: 返回 429 的概率
+    """
+
+    def __init__(self, latency_ms=300, latency_dist="lognormal", latency_sigma=0.5, tokens_per_sec=0,
+                 error_rate=0.0, rate_limit_rate=0.0, seed=0):
+        if latency_dist not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unsupported latency distribution: {latency_dist}")
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def fault(self):
+        """按概率返回 500 / 429，否则返回 None"""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            return 500
+        if roll < self.error_rate + self.rate_limit_rate:
+            return 429
+        return None
+
+    def delay(self, completion_tokens):
+        """一次请求的总延迟（秒）"""
+        return self.first_token_delay() + self.generation_time(completion_tokens)
+
+    def generation_time(self, completion_tokens):
+        return completion_tokens / self.tokens_per_sec if self.tokens_per_sec else 0
+
+    def first_token_delay(self):
+        """首 token 前的延迟（秒）"""
+        with self._lock:
+            if self.latency_dist == "lognormal":
+                latency = self._rng.lognormvariate(math.log(max(self.latency_ms, 1e-3)), self.latency_sigma)
+            elif self.latency_dist == "uniform":
+                latency = self.latency_ms * self._rng.uniform(0.5, 1.5)
+            else:
+                latency = self.latency_ms
+        return latency / 1000.0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ResearchAgentStub/1.0"
+    # 流式响应由许多小块组成，关闭 Nagle 算法避免每块都等待延迟 ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _send_json(self, endpoint, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self._send(endpoint, body, "application/json", status, headers)
+
+    def _send(self, endpoint, body, content_type, status=200, headers=None):
+        self.state.record(endpoint, status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split('/') if p]
+        query = parse_qs(parsed.query)
+
+        if parts[:3] == ['github', 'search', 'repositories']:
+            return self._github_search(query.get('q', [''])[0], int(query.get('per_page', ['30'])[0]))
+        if parts[:2] == ['github', 'repos'] and len(parts) >= 4:
+            if len(parts) == 5 and parts[4] == 'readme':
+                return self._github_readme(parts[2], parts[3])
+            return self._github_repo(parts[2], parts[3])
+        if parts[:3] == ['pwc', 'papers', 'search']:
+            return self._pwc_search(query.get('q', [''])[0])
+        if parts[:1] == ['cvf'] and len(parts) == 2:
+            return self._cvf_listing(parts[1])
+        if parts == ['arxiv', 'oai']:
+            return self._arxiv_oai(query.get('resumptionToken', ['0'])[0])
+        if parts == ['_stats']:
+            # 不经过 _send，读取计数本身不计入调用数
+            body = json.dumps({'calls': self.state.snapshot(), 'statuses': dict(self.state.statuses)}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self._send_json("unknown", {'message': 'Not Found'}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        path = urlparse(self.path).path
+
+        if path.endswith('/chat/completions'):
+            return self._chat_completion(payload)
+        if path == '/github/graphql':
+            return self._github_graphql(payload)
+        if path.startswith('/hf/models/'):
+            return self._hf_inference(payload)
+
+        self._send_json("unknown", {'message': 'Not Found'}, status=404)
+
+    # ── GitHub ────────────────────────────────────────────
+    def _github_search(self, q, per_page):
+        endpoint = "github_search"
+        self.state.sleep(endpoint)
+        if self.state.should_rate_limit(endpoint):
+            return self._send_json(endpoint, {'message': 'API rate limit exceeded'}, status=403,
+                                   headers={'X-RateLimit-Remaining': '0'})
+
+        terms = [t.strip('"').lower() for t in q.split() if not t.startswith('language:')]
+        rng = _rng("search", self.state.seed, q)
+        items = []
+        if rng.random() < 0.85:
+            base = '-'.join(t for t in terms[:2] if t) or 'repo'
+            names = [base, f"{base}-pytorch", f"awesome-{base}", f"{terms[0] if terms else 'repo'}",
+                     f"{base}-official", f"{base}-toolkit", f"pytorch-{base}"]
+            names += [f"{rng.choice(TOPIC_WORDS).replace(' ', '-')}-{rng.randint(1, 999)}" for _ in range(per_page)]
+            for name in names[:per_page]:
+                owner = f"{rng.choice(LAST_NAMES).lower()}-lab"
+                items.append(_repo_payload(owner, name))
+        self._send_json(endpoint, {'total_count': len(items), 'items': items})
+
+    def _github_repo(self, owner, name):
+        endpoint = "github_repo"
+        self.state.sleep(endpoint)
+        self._send_json(endpoint, _repo_payload(owner, name))
+
+    def _github_readme(self, owner, name):
+        endpoint = "github_readme"
+        self.state.sleep(endpoint)
+        text = _readme_text(owner, name)
+        self._send_json(endpoint, {'encoding': 'base64',
+                                   'content': base64.b64encode(text.encode("utf-8")).decode("ascii")})
+
+    def _github_graphql(self, payload):
+        """批量仓库查询：每个别名 r{i} 对应变量 o{i} / n{i}，返回 README.md 文本（约十分之一的仓库只有 REST 能找到的 README）"""
+        endpoint = "github_graphql"
+        self.state.sleep(endpoint)
+        variables = payload.get('variables') or {}
+        data = {}
+        i = 0
+        while f"o{i}" in variables:
+            owner, name = variables[f"o{i}"], variables[f"n{i}"]
+            node = {alias: None for alias in GRAPHQL_README_ALIASES}
+            # 其余仓库的 README 用不在常见文件名列表中的名字（如 docs/README.md），模拟 GraphQL 取不到的情况
+            if _rng("readme-name", owner, name).random() >= 0.1:
+                node['readmeMd'] = {'text': _readme_text(owner, name)}
+            data[f"r{i}"] = node
+            i += 1
+        self._send_json(endpoint, {'data': data})
+
+    # ── PapersWithCode ────────────────────────────────────
+    def _pwc_search(self, q):
+        endpoint = "pwc_search"
+        self.state.sleep(endpoint)
+        rng = _rng("pwc", self.state.seed, q)
+        if rng.random() >= self.state.pwc_hit_rate:
+            return self._send_json(endpoint, {'count': 0, 'results': []})
+        slug = '-'.join(q.lower().split()[:2]).strip(':') or 'paper'
+        self._send_json(endpoint, {'count': 1, 'results': [{
+            'paper': {'title': q},
+            'repository': {'url': f"https://github.com/pwc-{rng.randint(1, 50)}/{slug}"},
+            'is_code_open': True,
+        }]})
+
+    # ── CVF ───────────────────────────────────────────────
+    def _cvf_listing(self, conference):
+        endpoint = "cvf_listing"
+        self.state.sleep(endpoint)
+        count = getattr(self.server, 'cvf_papers', 500)
+        rows = []
+        for i in range(count):
+            title = synthetic_title(i, self.state.seed)
+            rng = _rng("authors", self.state.seed, i)
+            authors = ", ".join(
+                f'<form class="authsearch" method="post"><a href="#" onclick="this.parentNode.submit();">'
+                f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}</a></form>'
+                for _ in range(rng.randint(1, 8)))
+            slug = title.replace(' ', '_').replace(':', '')
+            rows.append(
+                f'<dt class="ptitle"><br><a href="/content/{conference}/html/{slug}_paper.html">{title}</a></dt>\n'
+                f'<dd>{authors}</dd>\n'
+                f'<dd>[<a href="/content/{conference}/papers/{slug}_paper.pdf">pdf</a>]</dd>'
+            )
+        body = ("<html><body><div id=\"content\"><dl>\n" + "\n".join(rows) + "\n</dl></div></body></html>").encode("utf-8")
+        self._send(endpoint, body, "text/html; charset=utf-8")
+
+    # ── arXiv OAI-PMH ─────────────────────────────────────
+    def _arxiv_oai(self, token):
+        endpoint = "arxiv_oai"
+        self.state.sleep(endpoint)
+        count = getattr(self.server, 'arxiv_papers', 0)
+        start = int(token) if token.isdigit() else 0
+        records = []
+        for i in range(start, min(start + ARXIV_PAGE_SIZE, count)):
+            rng = _rng("arxiv", self.state.seed, i)
+            created = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            authors = "".join(f"<author><keyname>{rng.choice(LAST_NAMES)}</keyname>"
+                              f"<forenames>{rng.choice(FIRST_NAMES)}</forenames></author>"
+                              for _ in range(rng.randint(1, 6)))
+            records.append(
+                f'<record><header><identifier>oai:arXiv.org:2401.{i:05d}</identifier>'
+                f'<datestamp>{created}</datestamp><setSpec>cs</setSpec></header><metadata>'
+                f'<arXiv xmlns="http://arxiv.org/OAI/arXiv/"><id>2401.{i:05d}</id><created>{created}</created>'
+                f'<authors>{authors}</authors><title>{escape(synthetic_title(i, self.state.seed + 1))}</title>'
+                f'<categories>{rng.choice(["cs.CV", "cs.CL", "cs.LG cs.AI"])}</categories>'
+                f'<abstract>{escape(synthetic_abstract(i, self.state.seed))}</abstract></arXiv></metadata></record>'
+            )
+        end = start + ARXIV_PAGE_SIZE
+        token_xml = (f'<resumptionToken cursor="{start}" completeListSize="{count}">{end}</resumptionToken>'
+                     if end < count else f'<resumptionToken cursor="{start}" completeListSize="{count}"/>')
+        body = ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/"><ListRecords>'
+                + "".join(records) + token_xml + '</ListRecords></OAI-PMH>').encode("utf-8")
+        self._send(endpoint, body, "text/xml; charset=utf-8")
+
+    # ── LLM ───────────────────────────────────────────────
+    def _completion_text(self, prompt, max_tokens):
+        rng = _rng("llm", prompt[:200])
+        n_words = min(max_tokens, rng.randint(40, 120))
+        return " ".join(rng.choice(TOPIC_WORDS).split()[0] for _ in range(n_words))
+
+    def _llm_fault(self, endpoint, profile):
+        """按 LLMProfile 注入 500 / 429，返回是否已发送错误响应"""
+        status = profile.fault()
+        if status == 500:
+            self._send_json(endpoint, {'error': {'message': 'Internal server error', 'type': 'server_error'}}, status=500)
+            return True
+        if status == 429:
+            self._send_json(endpoint, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit'}},
+                            status=429, headers={'Retry-After': '1'})
+            return True
+        return False
+
+    def _chat_completion(self, payload):
+        endpoint = "llm_chat"
+        profile = self.state.llm_profile
+        if profile is None:
+            self.state.sleep(endpoint)
+        elif self._llm_fault(endpoint, profile):
+            return
+        if self.state.should_rate_limit(endpoint):
+            return self._send_json(endpoint, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit'}},
+                                   status=429, headers={'Retry-After': '1'})
+        prompt = "\n".join(m.get('content', '') for m in payload.get('messages', []))
+        text = self._completion_text(prompt, payload.get('max_tokens', 256))
+        if payload.get('stream'):
+            return self._stream_completion(endpoint, payload, text, profile)
+        if profile is not None:
+            time.sleep(profile.delay(len(text) // 4))
+        self._send_json(endpoint, {
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'stub'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': text}}],
+            'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(text) // 4,
+                      'total_tokens': (len(prompt) + len(text)) // 4},
+        })
+
+    def _stream_completion(self, endpoint, payload, text, profile):
+        """stream=True：按 SSE 逐词发送 chat.completion.chunk，生成速度按 LLMProfile 计时"""
+        self.state.record(endpoint, 200)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def event(delta, finish_reason=None):
+            chunk = {'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                     'model': payload.get('model', 'stub'),
+                     'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        if profile is not None:
+            time.sleep(profile.first_token_delay())
+        event({'role': 'assistant', 'content': ""})
+        for i, word in enumerate(text.split(" ")):
+            piece = word if i == 0 else " " + word
+            if profile is not None and profile.tokens_per_sec:
+                time.sleep(profile.generation_time(len(piece) / 4))
+            event({'content': piece})
+        event({}, finish_reason="stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _hf_inference(self, payload):
+        endpoint = "llm_hf"
+        profile = self.state.llm_profile
+        if profile is None:
+            self.state.sleep(endpoint)
+        elif self._llm_fault(endpoint, profile):
+            return
+        if self.state.should_rate_limit(endpoint):
+            return self._send_json(endpoint, {'error': 'Model is currently loading', 'estimated_time': 1.0},
+                                   status=503)
+        max_tokens = payload.get('parameters', {}).get('max_new_tokens', 256)
+        text = self._completion_text(payload.get('inputs', ''), max_tokens)
+        if profile is not None:
+            time.sleep(profile.delay(len(text) // 4))
+        self._send_json(endpoint, [{'generated_text': text}])
+
+
+class StubAPIServer:
+    """
+    在后台线程中运行的 stub 服务
+    用法:
+        server = StubAPIServer(latency_ms={'github_search': 50}).start()
+        ... 使用 server.url ...
+        server.stop()
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, cvf_papers=500, arxiv_papers=0, **state_kwargs):
+        self.state = StubState(**state_kwargs)
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self.httpd.cvf_papers = cvf_papers
+        self.httpd.arxiv_papers = arxiv_papers
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _serve(conn, kwargs):
+    server = StubAPIServer(**kwargs)
+    conn.send(server.url)
+    conn.close()
+    server.httpd.serve_forever()
+
+
+class RemoteState:
+    """独立进程中的 stub 的调用计数（通过 /_stats 读取），接口与 StubState 的计数部分一致"""
+
+    def __init__(self, url):
+        self.url = url
+
+    def _stats(self):
+        return requests.get(f"{self.url}/_stats", timeout=10).json()
+
+    def snapshot(self):
+        return self._stats()['calls']
+
+    @property
+    def calls(self):
+        return self._stats()['calls']
+
+    @property
+    def statuses(self):
+        return self._stats()['statuses']
+
+
+class StubProcess:
+    """
+    在独立进程中运行的 stub 服务：服务端的内存分配与 CPU 不计入被测流程（如 tracemalloc 的内存峰值）
+    用法与 StubAPIServer 相同，参数也相同
+    """
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.process = None
+        self.url = None
+        self.state = None
+
+    def start(self):
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child, self.kwargs), daemon=True)
+        self.process.start()
+        self.url = parent.recv()
+        self.state = RemoteState(self.url)
+        return self
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local API stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cvf-papers", type=int, default=500)
+    parser.add_argument("--arxiv-papers", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latency for REST endpoints")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Latency for LLM endpoints")
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="Return a rate-limit error on every Nth GitHub search / LLM request")
+    args = parser.parse_args()
+
+    server = StubAPIServer(port=args.port, cvf_papers=args.cvf_papers, arxiv_papers=args.arxiv_papers,
+                           latency_ms=latency_config(args.latency_ms, args.llm_latency_ms),
+                           rate_limit_every=rate_limit_config(args.rate_limit_every))
+    print(f"🧪 Stub API server listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+def latency_config(rest_ms, llm_ms):
+    return {
+        'github_search': rest_ms, 'github_repo': rest_ms, 'github_readme': rest_ms, 'github_graphql': rest_ms,
+        'pwc_search': rest_ms, 'cvf_listing': rest_ms, 'arxiv_oai': rest_ms,
+        'llm_chat': llm_ms, 'llm_hf': llm_ms,
+    }
+
+
+def rate_limit_config(every):
+    return {'github_search': every, 'llm_chat': every, 'llm_hf': every} if every else {}
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
-import requests
 from bs4 import BeautifulSoup
 
+from utils import http_client
+from utils.metrics import metrics
+from utils.paper import Paper
+
 class ACLFetcher:
     """
     爬取 ACL 系列（如 ACL, NAACL, EMNLP 等）会议的论文列表。
@@ -13,19 +16,22 @@ class ACLFetcher:
 
     def fetch_papers(self):
         url = f'https://aclanthology.org/events/{self.conference}/{self.year}/'
-        response = requests.get(url)
+        response = http_client.get(url, "acl_listing")
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
 
-        papers = []
-        for item in soup.find_all('h5', class_='align-middle'):
-            title = item.text.strip()
-            papers.append({
-                'title': title,
-                'authors': [],     
-                'abstract': '',    
-                'pdf_url': '',     
-                'venue': self.conference.upper(),
-                'decision': None
-            })
+        with metrics.span("parse", source="acl"):
+            soup = BeautifulSoup(response.text, 'html.parser')
+
+            papers = []
+            for item in soup.find_all('h5', class_='align-middle'):
+                title = item.text.strip()
+                papers.append(Paper(
+                    title=title,
+                    authors=[],
+                    abstract='',
+                    pdf_url='',
+                    venue=self.conference.upper(),
+                    year=int(self.year),
+                    decision=None
+                ))
         return papers
@@ -0,0 +1,244 @@
+"""
+arXiv 元数据批量拉取：流式解析本地 Kaggle 快照（arxiv-metadata-oai-snapshot.json，JSON Lines，可为 .gz），
+或通过 OAI-PMH（metadataPrefix=arXiv，resumptionToken 翻页）在线收割，按分类和日期筛选后输出 Paper。
+
+- 快照逐行读取：先用正则从原始字节中取出 categories / update_date 做预筛选，只有通过的行才 json 解析，
+  约 200 万条记录的快照几分钟内处理完，内存只与保留的论文数有关
+- OAI-PMH 每页（约 1000 条）用 iterparse 解析并及时清理元素；遇到 503 按 Retry-After 等待后重试
+- 分类："cs.CV" 精确匹配，"cs" 匹配该大类下的所有分类；论文的任一分类命中即保留
+- 日期：按第一个版本的提交日期筛选 since_date <= created <= until_date（YYYY-MM-DD）；
+  update_date / datestamp 不早于提交日期，快照用它预筛选，OAI-PMH 用它作为 from 参数
+
+配置（config.yaml）:
+arxiv:
+  enabled: true
+  snapshot_path: "data/arxiv-metadata-oai-snapshot.json"  # 留空时使用 OAI-PMH
+  oai_url: "https://oaipmh.arxiv.org/oai"
+  # oai_set: "cs"            # 默认取分类的大类（所有分类属于同一大类时）
+  categories: ["cs.CV", "cs.CL", "cs.LG"]
+  # since_date: "2024-01-01" # 默认使用 fetch.since_date
+  # until_date: "2024-12-31"
+  max_papers: 2000
+"""
+import gzip
+import io
+import json
+import re
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from utils import http_client
+from utils.metrics import metrics
+from utils.paper import Paper
+
+DEFAULT_OAI_URL = "https://oaipmh.arxiv.org/oai"
+
+OAI_NS = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV_NS = "{http://arxiv.org/OAI/arXiv/}"
+
+# 快照行内的预筛选字段（Kaggle 快照为紧凑 JSON，每行一条记录）
+CATEGORIES_PATTERN = re.compile(rb'"categories"\s*:\s*"([^"]*)"')
+UPDATE_DATE_PATTERN = re.compile(rb'"update_date"\s*:\s*"([^"]*)"')
+
+
+def _clean(text):
+    """arXiv 标题和摘要中有换行和连续空白"""
+    return " ".join((text or "").split())
+
+
+class ArxivFetcher:
+    """
+    批量拉取 arXiv 论文元数据。
+    categories: 如 ["cs.CV", "cs.CL"]，为空时不按分类筛选
+    since_date / until_date: YYYY-MM-DD，为空时不限制
+    """
+
+    def __init__(self, categories=None, since_date=None, until_date=None):
+        self.categories = frozenset(categories or ())
+        self.since_date = since_date or None
+        self.until_date = until_date or None
+
+    def fetch_papers(self, snapshot_path=None, oai_url=DEFAULT_OAI_URL, oai_set=None, max_papers=2000):
+        """
+        snapshot_path 不为空时读取本地快照，否则通过 OAI-PMH 收割
+        返回最多 max_papers 篇论文（Paper）
+        """
+        if snapshot_path:
+            print(f"🔍 Reading arXiv snapshot {snapshot_path}...")
+            records = self.iter_snapshot(snapshot_path)
+        else:
+            print(f"🔍 Harvesting arXiv metadata from {oai_url}...")
+            records = self.iter_oai(oai_url, oai_set)
+
+        papers = []
+        try:
+            for paper in records:
+                papers.append(paper)
+                if max_papers and len(papers) >= max_papers:
+                    print(f"⏹️  Reached limit of {max_papers} papers")
+                    break
+        finally:
+            records.close()
+
+        print(f"✅ Successfully fetched {len(papers)} papers from arXiv")
+        return papers
+
+    # ── 筛选 ────────────────────────────────────────────────
+    def match_categories(self, categories):
+        if not self.categories:
+            return True
+        return any(cat in self.categories or cat.split('.', 1)[0] in self.categories for cat in categories)
+
+    def match_date(self, date):
+        """date: YYYY-MM-DD"""
+        if self.since_date and date < self.since_date:
+            return False
+        return not (self.until_date and date > self.until_date)
+
+    # ── 本地快照 ────────────────────────────────────────────
+    def iter_snapshot(self, path):
+        """逐条产出快照中符合条件的论文（Paper）"""
+        opener = gzip.open if path.endswith(".gz") else open
+        scanned = matched = 0
+        started = time.perf_counter()
+        try:
+            with opener(path, "rb") as f, metrics.span("parse", source="arxiv_snapshot"):
+                for line in f:
+                    scanned += 1
+                    if not self._prefilter(line):
+                        continue
+                    paper = self._paper_from_snapshot(json.loads(line))
+                    if paper is not None:
+                        matched += 1
+                        yield paper
+        finally:
+            metrics.inc("arxiv_records", scanned - matched, result="skipped")
+            metrics.inc("arxiv_records", matched, result="matched")
+            print(f"📋 Scanned {scanned:,} arXiv records in {time.perf_counter() - started:.1f}s, {matched:,} matched")
+
+    def _prefilter(self, line):
+        """只看原始字节中的 categories / update_date；取不到字段时交给完整解析判断"""
+        if not line.strip():
+            return False
+        categories = CATEGORIES_PATTERN.search(line)
+        if categories and not self.match_categories(categories.group(1).decode().split()):
+            return False
+        if self.since_date:
+            updated = UPDATE_DATE_PATTERN.search(line)
+            if updated and updated.group(1).decode() < self.since_date:
+                return False
+        return True
+
+    def _paper_from_snapshot(self, record):
+        if not self.match_categories((record.get('categories') or "").split()):
+            return None
+        versions = record.get('versions') or []
+        created = parsedate_to_datetime(versions[0]['created']) if versions else None
+        if created is None and record.get('update_date'):
+            created = datetime.strptime(record['update_date'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        if created is None or not self.match_date(created.strftime('%Y-%m-%d')):
+            return None
+
+        if record.get('authors_parsed'):
+            authors = [" ".join(part for part in (first, last) if part)
+                       for last, first, *_ in record['authors_parsed']]
+        else:
+            authors = [a.strip() for a in re.split(r",| and ", _clean(record.get('authors'))) if a.strip()]
+        return self._paper(record['id'], record.get('title'), authors, record.get('abstract'), created)
+
+    # ── OAI-PMH ─────────────────────────────────────────────
+    def iter_oai(self, oai_url=DEFAULT_OAI_URL, oai_set=None, max_retries=5):
+        """按 resumptionToken 逐页收割，逐条产出符合条件的论文（Paper）"""
+        params = {'verb': 'ListRecords', 'metadataPrefix': 'arXiv'}
+        oai_set = oai_set or self._default_set()
+        if oai_set:
+            params['set'] = oai_set
+        # datestamp 为最后更新日期：from 可以在服务端排除提交日期更早的论文，until_date 只能在本地筛选
+        if self.since_date:
+            params['from'] = self.since_date
+
+        scanned = matched = pages = 0
+        try:
+            while True:
+                response = self._oai_request(oai_url, params, max_retries)
+                pages += 1
+                token = None
+                with metrics.span("parse", source="arxiv_oai"):
+                    for event, elem in ET.iterparse(io.BytesIO(response.content), events=("end",)):
+                        if elem.tag == f"{OAI_NS}record":
+                            scanned += 1
+                            paper = self._paper_from_oai(elem)
+                            elem.clear()
+                            if paper is not None:
+                                matched += 1
+                                yield paper
+                        elif elem.tag == f"{OAI_NS}resumptionToken":
+                            token = (elem.text or "").strip() or None
+                        elif elem.tag == f"{OAI_NS}error":
+                            if elem.get('code') == "noRecordsMatch":
+                                return
+                            raise RuntimeError(f"OAI-PMH error {elem.get('code')}: {_clean(elem.text)}")
+                if token is None:
+                    return
+                # 后续页只带 verb 和 resumptionToken
+                params = {'verb': 'ListRecords', 'resumptionToken': token}
+        finally:
+            metrics.inc("arxiv_records", scanned - matched, result="skipped")
+            metrics.inc("arxiv_records", matched, result="matched")
+            print(f"📋 Harvested {scanned:,} arXiv records from {pages} pages, {matched:,} matched")
+
+    def _default_set(self):
+        """所有分类属于同一大类（如 cs.CV、cs.LG → cs）时在服务端按该大类筛选"""
+        archives = {cat.split('.', 1)[0] for cat in self.categories}
+        return archives.pop() if len(archives) == 1 else None
+
+    def _oai_request(self, oai_url, params, max_retries):
+        """OAI-PMH 流量控制：503 + Retry-After 时等待后重试"""
+        for attempt in range(max_retries + 1):
+            response = http_client.get(oai_url, "arxiv_oai", params=params, timeout=120)
+            if response.status_code != 503 or attempt == max_retries:
+                response.raise_for_status()
+                return response
+            retry_after = response.headers.get('Retry-After', "")
+            seconds = int(retry_after) if retry_after.isdigit() else 2 ** attempt * 5
+            print(f"⏳ arXiv OAI-PMH asked to retry after {seconds}s")
+            http_client.retry("arxiv_oai", "503")
+            http_client.wait("arxiv_oai", seconds)
+
+    def _paper_from_oai(self, record):
+        header = record.find(f"{OAI_NS}header")
+        if header is not None and header.get('status') == "deleted":
+            return None
+        meta = record.find(f"{OAI_NS}metadata/{ARXIV_NS}arXiv")
+        if meta is None:
+            return None
+        if not self.match_categories((meta.findtext(f"{ARXIV_NS}categories") or "").split()):
+            return None
+        created = meta.findtext(f"{ARXIV_NS}created")
+        if not created or not self.match_date(created):
+            return None
+
+        authors = []
+        for author in meta.iterfind(f"{ARXIV_NS}authors/{ARXIV_NS}author"):
+            name = " ".join(part for part in (author.findtext(f"{ARXIV_NS}forenames"),
+                                              author.findtext(f"{ARXIV_NS}keyname")) if part)
+            if name:
+                authors.append(name)
+        created = datetime.strptime(created, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        return self._paper(meta.findtext(f"{ARXIV_NS}id"), meta.findtext(f"{ARXIV_NS}title"), authors,
+                           meta.findtext(f"{ARXIV_NS}abstract"), created)
+
+    # ── 记录 ────────────────────────────────────────────────
+    def _paper(self, arxiv_id, title, authors, abstract, created):
+        return Paper(
+            title=_clean(title),
+            authors=authors[:5],  # 限制作者数量
+            abstract=_clean(abstract),
+            pdf_url=f"https://arxiv.org/pdf/{arxiv_id}",
+            created=int(created.timestamp() * 1000),  # 与 OpenReview 的 tcdate 一致：毫秒时间戳
+            venue="arXiv",
+            year=created.year,
+            decision='Preprint (arXiv)'
+        )
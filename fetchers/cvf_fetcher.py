@@ -1,6 +1,70 @@
+import re
+
 import requests
 from bs4 import BeautifulSoup
-import time
+
+from utils import http_client, parallel
+from utils.metrics import metrics
+from utils.paper import Paper
+
+# 列表页中每篇论文以 <dt class="ptitle"> 开始，按此切分 HTML 以便分块并行解析
+DT_PATTERN = re.compile(r"<dt[\s>]", re.IGNORECASE)
+
+
+def _paper_from_tags(dt_tag, venue, year):
+    """从一对 dt / dd 标签提取论文信息（Paper），标题为空时返回 None"""
+    title = dt_tag.text.strip()
+    if not title:
+        return None
+    
+    # 查找对应的论文详情（通常在下一个dd标签中）
+    dd_tag = dt_tag.find_next_sibling('dd')
+    authors = []
+    abstract = ""
+    pdf_url = ""
+    
+    if dd_tag:
+        # 提取作者信息
+        author_links = dd_tag.find_all('a')
+        authors = [a.text.strip() for a in author_links if a.text.strip() and not a.text.strip().startswith('http')]
+        
+        # 查找PDF链接
+        pdf_link = dd_tag.find('a', href=True)
+        if pdf_link and pdf_link.get('href'):
+            pdf_url = pdf_link.get('href')
+            # 如果是相对路径，转换为绝对路径
+            if pdf_url.startswith('/'):
+                pdf_url = f"https://openaccess.thecvf.com{pdf_url}"
+
+    return Paper(
+        title=title,
+        authors=authors[:5],  # 限制作者数量
+        abstract=abstract,  # CVF页面通常不包含摘要
+        pdf_url=pdf_url,
+        venue=venue,
+        year=year,
+        decision='Published (CVF Open Access)'
+    )
+
+
+def parse_listing_chunk(html, venue, year):
+    """解析列表页中的一段 dt / dd 片段（模块级纯函数，可在进程池中执行）"""
+    soup = BeautifulSoup(html, 'html.parser')
+    papers = []
+    for dt_tag in soup.find_all('dt'):
+        paper = _paper_from_tags(dt_tag, venue, year)
+        if paper:
+            papers.append(paper)
+    return papers
+
+
+def split_listing(html, entries_per_chunk):
+    """按 <dt> 边界把列表页切成若干段，每段约 entries_per_chunk 篇论文"""
+    starts = [m.start() for m in DT_PATTERN.finditer(html)]
+    if not starts:
+        return []
+    bounds = starts[::max(1, entries_per_chunk)] + [len(html)]
+    return [html[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
 
 class CVFFetcher:
     """
@@ -15,6 +79,8 @@ class CVFFetcher:
         """
         self.base_url = conference_url
         self.venue = venue_name
+        year = re.search(r"(\d{4})", conference_url)
+        self.year = int(year.group(1)) if year else None
 
     def fetch_papers(self, max_papers=200):
         """
@@ -27,61 +93,11 @@ class CVFFetcher:
         all_papers_url = f"{self.base_url}?day=all"
         
         try:
-            response = requests.get(all_papers_url, timeout=30)
+            response = http_client.get(all_papers_url, "cvf_listing", timeout=30)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 查找论文标题（在dt标签中）
-            title_tags = soup.find_all('dt')
-            print(f"📋 Found {len(title_tags)} papers, processing up to {max_papers}...")
 
-            papers = []
-            processed_count = 0
-            
-            for i, dt_tag in enumerate(title_tags):
-                if processed_count >= max_papers:
-                    print(f"⏹️  Reached limit of {max_papers} papers")
-                    break
-                
-                title = dt_tag.text.strip()
-                if not title:
-                    continue
-                
-                # 查找对应的论文详情（通常在下一个dd标签中）
-                dd_tag = dt_tag.find_next_sibling('dd')
-                authors = []
-                abstract = ""
-                pdf_url = ""
-                
-                if dd_tag:
-                    # 提取作者信息
-                    author_links = dd_tag.find_all('a')
-                    authors = [a.text.strip() for a in author_links if a.text.strip() and not a.text.strip().startswith('http')]
-                    
-                    # 查找PDF链接
-                    pdf_link = dd_tag.find('a', href=True)
-                    if pdf_link and pdf_link.get('href'):
-                        pdf_url = pdf_link.get('href')
-                        # 如果是相对路径，转换为绝对路径
-                        if pdf_url.startswith('/'):
-                            pdf_url = f"https://openaccess.thecvf.com{pdf_url}"
-
-                paper_data = {
-                    'title': title,
-                    'authors': authors[:5],  # 限制作者数量
-                    'abstract': abstract,  # CVF页面通常不包含摘要
-                    'pdf_url': pdf_url,
-                    'venue': self.venue,
-                    'decision': 'Published (CVF Open Access)'
-                }
-                
-                papers.append(paper_data)
-                processed_count += 1
-                
-                # 进度提示
-                if (processed_count) % 50 == 0:
-                    print(f"  ⏳ Processed {processed_count} papers...")
-                    time.sleep(0.1)  # 小延迟避免过快处理
+            with metrics.span("parse", source="cvf"):
+                papers = self._parse_listing(response.text, max_papers)
 
             print(f"✅ Successfully fetched {len(papers)} papers from {self.venue}")
             return papers
@@ -93,12 +109,61 @@ class CVFFetcher:
             print(f"❌ Error parsing CVF papers: {e}")
             return []
 
+    def _parse_listing(self, html, max_papers):
+        """
+        解析论文列表页 HTML，返回论文列表
+        论文较多且配置了 parallel.processes 时按 <dt> 分块在进程池中解析
+        """
+        n_entries = len(DT_PATTERN.findall(html))
+        if parallel.enabled(min(n_entries, max_papers)):
+            return self._parse_listing_parallel(html, max_papers, n_entries)
+
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # 查找论文标题（在dt标签中）
+        title_tags = soup.find_all('dt')
+        print(f"📋 Found {len(title_tags)} papers, processing up to {max_papers}...")
+
+        papers = []
+        processed_count = 0
+        
+        for i, dt_tag in enumerate(title_tags):
+            if processed_count >= max_papers:
+                print(f"⏹️  Reached limit of {max_papers} papers")
+                break
+            
+            paper_data = _paper_from_tags(dt_tag, self.venue, self.year)
+            if paper_data is None:
+                continue
+            
+            papers.append(paper_data)
+            processed_count += 1
+            
+            # 进度提示
+            if (processed_count) % 50 == 0:
+                print(f"  ⏳ Processed {processed_count} papers...")
+                http_client.wait("cvf_listing", 0.1)  # 小延迟避免过快处理
+
+        return papers
+
+    def _parse_listing_parallel(self, html, max_papers, n_entries):
+        # 只切分前 max_papers 篇左右（空标题会被跳过，多留一个 chunk 的余量）
+        entries_per_chunk = parallel.chunk_size()
+        chunks = split_listing(html, entries_per_chunk)
+        chunks = chunks[:max_papers // entries_per_chunk + 2]
+        print(f"📋 Found {n_entries} papers, parsing up to {max_papers} in {len(chunks)} chunks on a process pool...")
+        papers = [paper for chunk in parallel.map_chunks(parse_listing_chunk, chunks, "cvf_parse", self.venue, self.year)
+                  for paper in chunk]
+        if len(papers) > max_papers:
+            print(f"⏹️  Reached limit of {max_papers} papers")
+        return papers[:max_papers]
+
     def get_paper_abstract(self, paper_url):
         """
         获取单篇论文的摘要（如果有详情页）
         """
         try:
-            response = requests.get(paper_url, timeout=10)
+            response = http_client.get(paper_url, "cvf_abstract", timeout=10)
             response.raise_for_status()
             soup = BeautifulSoup(response.text, 'html.parser')
             
@@ -1,54 +1,159 @@
-import requests
+import base64
 import re
-import time
-import yaml
-from datetime import datetime
+from functools import partial
+
+from fetchers.repo_ranking import FeatureCache, RepoMetadata, RepoRanker
+from utils import cassette, http_client, negative_cache, star_store, strategy_stats
+from utils.config import load_config
+from utils.metrics import metrics
+
+# 明显不相关的通用工具库（验证阶段使用的扩展列表）
+KNOWN_TOOLS = ['howdoi', 'graphrag', 'xpra', 'wavelets', 'nboost', 'awesome-pytorch-papers',
+               'awesome-deep-learning', 'awesome-machine-learning', 'pytorch-tutorial',
+               'tensorflow-examples', 'robustmatting', 'robustvideo']
+
+# 明显不相关的工具类型
+TOOL_PATTERNS = ['cli', 'tool', 'utility', 'framework', 'awesome', 'list', 'collection',
+                 'tutorial', 'example', 'template', 'boilerplate', 'starter', 'kit']
+
+# 描述中提到论文实现的指示词
+PAPER_INDICATORS = ['paper', 'implementation', 'code', 'official', 'reproduction', 'pytorch']
+
+# GraphQL 批量验证：每个候选仓库取常见文件名的 README 文本（topics 已在搜索结果中）
+# 都取不到时验证改用 REST /readme（服务端按任意文件名查找 README）
+README_ALIASES = {
+    'readmeMd': "README.md",
+    'readmeRst': "README.rst",
+    'readmeLower': "readme.md",
+    'readmeTitle': "Readme.md",
+    'readmeMarkdown': "README.markdown",
+    'readmeTxt': "README.txt",
+    'readmePlain': "README",
+}
+VERIFICATION_FRAGMENT = (
+    "\nfragment verification on Repository {\n"
+    + "".join(f'  {alias}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}\n'
+              for alias, path in README_ALIASES.items())
+    + "}\n"
+)
+
+class _VerificationBatch:
+    """
+    graphql 模式下一次搜索的候选仓库验证数据：第一次读取时用一个 GraphQL 查询取回全部候选
+    """
+
+    def __init__(self, fetcher, candidates):
+        self.fetcher = fetcher
+        self.candidates = candidates
+        self.data = None
+        self.failed = False
+
+    @property
+    def loaded(self):
+        return self.data is not None
+
+    def get(self, repo):
+        """{'readme'}；GraphQL 请求失败或结果中没有该仓库时返回 None"""
+        if self.data is None and not self.failed:
+            self.data = self.fetcher._fetch_verification_batch(self.candidates)
+            self.failed = self.data is None
+        return (self.data or {}).get(repo.full_name.lower())
+
 
 class GitHubFetcher:
     """
     利用 GitHub API 查询某个 Repo 的 stars 数量与开源时长（天）。
     """
 
-    def __init__(self, github_token):
+    def __init__(self, github_token, api_url="https://api.github.com"):
         self.headers = {"Authorization": f"token {github_token}"}
+        # API 地址（可在 config.yaml 的 github.api_url 中覆盖，例如指向本地 stub 服务）
+        self.api_url = api_url.rstrip("/")
+        # 候选仓库特征缓存（与论文无关，跨论文、跨策略复用；LRU，容量有上限）
+        self._repo_features = FeatureCache()
         # 从配置文件加载黑名单
         self.repo_blacklist = {}
         try:
-            with open("configs/config.yaml", "r") as f:
-                config = yaml.safe_load(f)
-                self.repo_blacklist = config.get('repo_blacklist', {})
-                if self.repo_blacklist:
-                    print(f"📋 Loaded repository blacklist with {len(self.repo_blacklist)} entries")
+            config = load_config()
+            self.repo_blacklist = config.get('repo_blacklist', {})
+            if self.repo_blacklist:
+                print(f"📋 Loaded repository blacklist with {len(self.repo_blacklist)} entries")
         except Exception as e:
             print(f"⚠️  Warning: Could not load blacklist from config: {e}")
+        # 预编译黑名单标题匹配器，绝大多数论文一次正则搜索即可排除
+        self._blacklist_pattern = None
+        if self.repo_blacklist:
+            self._blacklist_pattern = re.compile("|".join(re.escape(t) for t in self.repo_blacklist))
+        # star 快照存储：每次获取统计时追加快照，用于计算 star 增速
+        self.star_store = star_store.open_store(load_config())
+        # 负缓存：未找到仓库的论文在退避期内跳过搜索
+        self.negative_cache = negative_cache.open_cache(load_config())
+        self._strategies_tried = []
+        self._search_incomplete = False
+        # 搜索策略命中统计：按每次 API 调用的期望匹配数排序 / 跳过策略
+        strategy_settings = load_config().get('search_strategies') or {}
+        self.strategy_stats = strategy_stats.open_store(load_config())
+        self.max_strategies = strategy_settings.get('max_per_paper')
+        # 本 fetcher 发出的 GitHub API 调用数（用于按策略统计调用开销）
+        self._api_calls = 0
+        # 候选仓库验证方式：rest 只验证排名第一的候选；graphql 用一次查询取回前 top_k 个候选的
+        # README，在本地依次验证，取排名最高的通过验证的候选
+        verification = load_config().get('repo_verification') or {}
+        self.verification_mode = verification.get('mode', 'rest')
+        self.verify_top_k = verification.get('top_k', 3)
+        self.graphql_url = verification.get('graphql_url') or f"{self.api_url}/graphql"
+
+    def _get(self, url, endpoint, **kwargs):
+        """带认证头的 GitHub API GET，并计入 API 调用数"""
+        self._api_calls += 1
+        return http_client.get(url, endpoint, headers=self.headers, **kwargs)
 
-    def get_repo_stats(self, repo_url):
+    def _post(self, url, endpoint, **kwargs):
+        """带认证头的 GitHub API POST（GraphQL），并计入 API 调用数"""
+        self._api_calls += 1
+        return http_client.post(url, endpoint, headers=self.headers, **kwargs)
+
+    def _fetch_repo_metadata(self, owner_repo):
+        """请求 /repos/{owner}/{repo}，返回 RepoMetadata；无法获取时返回 None"""
+        response = self._get(f"{self.api_url}/repos/{owner_repo}", "github_repo")
+        if response.status_code != 200:
+            return None
+        return RepoMetadata.from_payload(response.json())
+
+    def get_repo_stats(self, repo_url, metadata=None):
         """
         repo_url 形如 "https://github.com/owner/repo"
-        返回字典：{'stars': int, 'forks': int, 'days_since_created': int}
+        metadata: 搜索结果中的 RepoMetadata，带有创建时间时直接使用，不再请求 /repos
+        返回字典：{'stars': int, 'forks': int, 'days_since_created': int, 'star_velocity': float | None,
+                  'velocity_basis': 'snapshots' / 'lifetime' / None}
         若无法获取则返回 None
         """
         if not repo_url or 'github.com' not in repo_url:
             return None
 
         owner_repo = repo_url.replace("https://github.com/", "").strip("/")
-        api_url = f"https://api.github.com/repos/{owner_repo}"
-        response = requests.get(api_url, headers=self.headers)
-        if response.status_code != 200:
-            return None
+        reused = metadata is not None and metadata.created_at is not None
+        metrics.cache("repo_metadata", reused)
+        if not reused:
+            metadata = self._fetch_repo_metadata(owner_repo)
+            if metadata is None:
+                return None
 
-        data = response.json()
-        created_at = data.get('created_at')
-        stars = data.get('stargazers_count', 0)
-        forks = data.get('forks_count', 0)
+        stars = metadata.stars
+        forks = metadata.forks
+        days_since_created = metadata.days_since_created()
 
-        created_date = datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%SZ")
-        days_since_created = (datetime.now() - created_date).days
+        star_velocity = velocity_basis = None
+        if self.star_store:
+            self.star_store.record(owner_repo, stars, forks)
+            star_velocity, velocity_basis = self.star_store.velocity(owner_repo, days_since_created)
 
         return {
             'stars': stars,
             'forks': forks,
-            'days_since_created': days_since_created
+            'days_since_created': days_since_created,
+            'star_velocity': star_velocity,
+            'velocity_basis': velocity_basis
         }
     
     def extract_keywords(self, title):
@@ -113,22 +218,47 @@ class GitHubFetcher:
             
         return filtered_keywords[:6]  # 返回前6个最重要的关键词
     
-    def search_paper_repository(self, paper_title):
+    def search_paper_repository(self, paper_title, venue=None):
         """
         基于论文标题搜索GitHub仓库
         返回最匹配的仓库URL和统计信息，如果没找到返回None
-        改进版：使用多重搜索策略和严格验证
+        改进版：使用多重搜索策略和严格验证；策略顺序按该会议（venue）的历史命中统计调整
         """
         print(f"    🔍 Searching GitHub for: {paper_title[:50]}...")
-        
+
+        if self.negative_cache:
+            cached = self.negative_cache.lookup(paper_title)
+            if cached:
+                days_left = (cached['next_check'] - int(cassette.now().timestamp())) / 86400
+                print(f"    ⏭️  No repo found in {cached['misses']} previous search(es), "
+                      f"re-checking in {days_left:.1f} days")
+                metrics.inc("github_negative_cache", result="hit")
+                return None
+
+        # 本次搜索执行过的策略；任一搜索未完整执行（限流、HTTP 错误、异常）时不写入负缓存
+        self._strategies_tried = []
+        self._search_incomplete = False
+        result = self._search_strategies(paper_title, venue)
+        if self.negative_cache:
+            if result:
+                self.negative_cache.clear(paper_title)
+            elif self._strategies_tried and not self._search_incomplete:
+                ttl_days = self.negative_cache.record_miss(paper_title, self._strategies_tried)
+                print(f"    🗃️  Cached negative result, next check in {ttl_days:g} days")
+                metrics.inc("github_negative_cache", result="recorded")
+        return result
+
+    def _search_strategies(self, paper_title, venue=None):
+        """依次执行搜索策略级联，返回第一个通过验证的仓库"""
         # 检查当前论文是否在黑名单中
         self._paper_specific_blacklist = []
-        for blacklist_title, blacklist_repos in self.repo_blacklist.items():
-            if blacklist_title in paper_title:
-                print(f"    ⚠️  Special case: '{blacklist_title}' has known bad matches")
-                # 在验证时会过滤这些仓库
-                self._paper_specific_blacklist = blacklist_repos
-                break
+        if self._blacklist_pattern and self._blacklist_pattern.search(paper_title):
+            for blacklist_title, blacklist_repos in self.repo_blacklist.items():
+                if blacklist_title in paper_title:
+                    print(f"    ⚠️  Special case: '{blacklist_title}' has known bad matches")
+                    # 在验证时会过滤这些仓库
+                    self._paper_specific_blacklist = blacklist_repos
+                    break
         
         # 提取关键词，去除常见问题词
         keywords = self.extract_keywords(paper_title)
@@ -145,44 +275,57 @@ class GitHubFetcher:
             
         print(f"    🔑 Keywords: {keywords[:3]}")
         
+        # 按默认顺序列出本论文适用的策略，再由命中统计决定实际顺序
+        strategies = []
+
         # 策略1: 尝试精确的模型名搜索 (使用引号包围完整的模型名)
         if keywords and len(keywords[0]) > 2:
             if re.match(r'^[A-Z]', keywords[0]) or '-' in keywords[0]:  # 只有模型名才用精确匹配
-                result = self._search_with_exact_match(keywords[0], paper_title, keywords)
-                if result:
-                    return result
+                strategies.append(("exact", partial(self._search_with_exact_match, keywords[0], paper_title, keywords)))
         
         # 策略2: 组合前两个关键词搜索 + 具体化
         if len(keywords) >= 2:
             # 添加特定关键词，提高搜索精确度
-            domain_keywords = ['paper', 'implementation', 'official']
-            
-            # 尝试包含特定关键词的搜索
-            for domain_keyword in domain_keywords:
-                if len(keywords) >= 2:
-                    result = self._search_with_specific_context(keywords[:2], domain_keyword, paper_title, keywords)
-                    if result:
-                        return result
+            for domain_keyword in ['paper', 'implementation', 'official']:
+                strategies.append((f"context_pair:{domain_keyword}", partial(
+                    self._search_with_specific_context, keywords[:2], domain_keyword, paper_title, keywords)))
             
             # 常规多关键词搜索
-            result = self._search_with_multiple_keywords(keywords[:2], paper_title, keywords)
-            if result:
-                return result
+            strategies.append(("multi", partial(self._search_with_multiple_keywords, keywords[:2], paper_title, keywords)))
         
         # 策略3: 单个最重要关键词搜索 + 具体化
-        domain_keywords = ['paper', 'implementation', 'official', 'code']
-        for domain_keyword in domain_keywords:
-            result = self._search_with_specific_context([keywords[0]], domain_keyword, paper_title, keywords)
-            if result:
-                return result
+        for domain_keyword in ['paper', 'implementation', 'official', 'code']:
+            strategies.append((f"context_single:{domain_keyword}", partial(
+                self._search_with_specific_context, [keywords[0]], domain_keyword, paper_title, keywords)))
         
         # 策略4: 最后的单关键词搜索
-        result = self._search_with_single_keyword(keywords[0], paper_title, keywords)
-        if result:
-            return result
+        strategies.append(("single", partial(self._search_with_single_keyword, keywords[0], paper_title, keywords)))
+
+        strategies, skipped = self._plan_strategies(strategies, venue, paper_title)
+        if skipped:
+            print(f"    ⏭️  Skipping low-yield strategies: {', '.join(skipped)}")
+            for name in skipped:
+                metrics.inc("github_strategy", strategy=name, result="skipped")
+
+        for name, run in strategies:
+            calls_before = self._api_calls
+            result = run()
+            metrics.inc("github_strategy", strategy=name, result="accepted" if result else "rejected")
+            if self.strategy_stats:
+                self.strategy_stats.record(venue, name, bool(result), self._api_calls - calls_before)
+            if result:
+                return result
         
         print(f"    ❌ No matching repository found with strict criteria")
         return None
+
+    def _plan_strategies(self, strategies, venue, paper_title):
+        """按命中统计排序 / 跳过策略，并限制每篇论文的策略数；返回 (策略列表, 跳过的策略名)"""
+        if self.strategy_stats:
+            return self.strategy_stats.plan(strategies, venue, paper_title, self.max_strategies)
+        if self.max_strategies:
+            return strategies[:self.max_strategies], [name for name, _ in strategies[self.max_strategies:]]
+        return strategies, []
     
     def _search_with_exact_match(self, keyword, paper_title, all_keywords):
         """使用精确匹配搜索策略"""
@@ -212,7 +355,7 @@ class GitHubFetcher:
         """
         执行GitHub搜索并返回最佳匹配
         """
-        api_url = "https://api.github.com/search/repositories"
+        api_url = f"{self.api_url}/search/repositories"
         params = {
             'q': query,
             'sort': 'stars',
@@ -221,15 +364,18 @@ class GitHubFetcher:
         }
         
         try:
-            response = requests.get(api_url, headers=self.headers, params=params)
+            response = self._get(api_url, "github_search", params=params)
+            self._strategies_tried.append(f"{strategy}: {query}")
             
             if response.status_code == 403:  # Rate limit
                 print(f"    ⚠️  GitHub API rate limit, waiting...")
-                time.sleep(60)  # 等待1分钟
-                response = requests.get(api_url, headers=self.headers, params=params)
+                http_client.wait("github_search", 60)  # 等待1分钟
+                http_client.retry("github_search", "rate_limit")
+                response = self._get(api_url, "github_search", params=params)
             
             if response.status_code != 200:
                 print(f"    ❌ GitHub search failed: {response.status_code}")
+                self._search_incomplete = True
                 return None
             
             data = response.json()
@@ -237,47 +383,118 @@ class GitHubFetcher:
                 print(f"    ❌ No repositories found")
                 return None
             
-            # 对结果进行相关性排序
-            best_repo = self._rank_repositories(data['items'], paper_title, keywords, strategy)
-            
-            if best_repo:
-                repo_url = best_repo['html_url']
-                
+            # 对结果进行相关性排序；搜索结果条目即包含验证和统计所需的元数据
+            repos = [RepoMetadata.from_payload(item) for item in data['items']]
+            if self.verification_mode == 'graphql':
+                candidates = self._rank_candidates(repos, paper_title, keywords, strategy, self.verify_top_k)
+                best_repo = self._verify_candidates(candidates, paper_title, keywords)
+            else:
+                best_repo = self._rank_repositories(repos, paper_title, keywords, strategy)
                 # 额外验证：检查仓库内容是否真的与论文相关
-                if self._verify_repository_relevance(repo_url, paper_title, keywords):
-                    stats = self.get_repo_stats(repo_url)
-                    if stats:
-                        print(f"    ✅ Found: {best_repo['name']} ({stats['stars']} ⭐)")
-                        return {
-                            'repo_url': repo_url,
-                            'stats': stats
-                        }
-                else:
+                if best_repo and not self._verify_repository_relevance(best_repo.html_url, paper_title, keywords, best_repo):
                     print(f"    ❌ Repository verification failed: not relevant to paper")
+                    best_repo = None
+            
+            if best_repo:
+                repo_url = best_repo.html_url
+                stats = self.get_repo_stats(repo_url, best_repo)
+                if stats:
+                    print(f"    ✅ Found: {best_repo.name} ({stats['stars']} ⭐)")
+                    return {
+                        'repo_url': repo_url,
+                        'stats': stats
+                    }
+                # 通过验证但无法获取统计信息：不能据此认定没有仓库
+                self._search_incomplete = True
             
             return None
         
         except Exception as e:
             print(f"    ❌ GitHub search error: {e}")
+            self._search_incomplete = True
         
         return None
     
-    def _verify_repository_relevance(self, repo_url, paper_title, keywords):
+    def _verify_candidates(self, candidates, paper_title, keywords):
+        """
+        graphql 模式：按排名依次验证候选，返回第一个通过验证的候选。
+        第一次需要 README 时用一个 GraphQL 查询取回所有候选的 README（仅凭描述和 topics 即可通过验证时不发请求）；
+        GraphQL 不可用时退回 REST，只验证排名第一的候选
+        """
+        batch = _VerificationBatch(self, candidates)
+        for rank, repo in enumerate(candidates, 1):
+            if self._verify_repository_relevance(repo.html_url, paper_title, keywords, repo, batch):
+                metrics.inc("github_verified_candidate", rank=rank)
+                if rank > 1:
+                    print(f"    ✅ Candidate #{rank} verified: {repo.name}")
+                return repo
+            print(f"    ❌ Candidate #{rank} failed verification: {repo.name}")
+            if batch.failed:
+                # GraphQL 不可用：与 rest 模式一样只验证排名第一的候选，不为其余候选逐个请求 README
+                metrics.inc("github_graphql_fallback")
+                break
+        return None
+
+    def _fetch_verification_batch(self, candidates):
+        """
+        用一个 GraphQL 查询取回候选仓库的验证数据
+        返回 {full_name 小写: {'readme': 小写文本 | None}}，请求失败时返回 None
+        （查询结果中缺少的仓库不在返回值中；缺少的仓库和 readme 为 None 的仓库验证时改用 REST 获取 README）
+        """
+        variables = {}
+        fields = []
+        for i, repo in enumerate(candidates):
+            owner, _, name = repo.full_name.partition('/')
+            variables[f"o{i}"] = owner
+            variables[f"n{i}"] = name
+            fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...verification }}")
+        declared = ", ".join(f"$o{i}: String!, $n{i}: String!" for i in range(len(candidates)))
+        query = f"query({declared}) {{\n  " + "\n  ".join(fields) + "\n}\n" + VERIFICATION_FRAGMENT
+        try:
+            response = self._post(self.graphql_url, "github_graphql", json={'query': query, 'variables': variables})
+            if response.status_code != 200:
+                print(f"    ⚠️  GitHub GraphQL failed: {response.status_code}, verifying via REST")
+                return None
+            body = response.json()
+        except Exception as e:
+            print(f"    ⚠️  GitHub GraphQL error: {e}, verifying via REST")
+            return None
+        data = body.get('data')
+        if not data:
+            print(f"    ⚠️  GitHub GraphQL returned no data, verifying via REST")
+            return None
+
+        prefetched = {}
+        for i, repo in enumerate(candidates):
+            node = data.get(f"r{i}")
+            if not node:
+                continue
+            readme = next((node[key]['text'] for key in README_ALIASES
+                           if node.get(key) and node[key].get('text')), None)
+            prefetched[repo.full_name.lower()] = {'readme': readme.lower() if readme else None}
+        return prefetched
+
+    def _verify_repository_relevance(self, repo_url, paper_title, keywords, metadata=None, batch=None):
         """
         验证仓库与论文的相关性
         检查README内容、仓库描述等
+        metadata: 搜索结果中的 RepoMetadata；没有时请求 /repos 获取
+        batch: graphql 模式的 _VerificationBatch；README 从批量结果中读取
+        graphql 模式下搜索结果中的 topics 与描述一起匹配（所有排名的候选一致）；rest 模式只匹配描述
         """
         try:
             # 获取仓库信息
             owner_repo = repo_url.replace("https://github.com/", "").strip("/")
-            api_url = f"https://api.github.com/repos/{owner_repo}"
-            response = requests.get(api_url, headers=self.headers)
+            if metadata is None:
+                metadata = self._fetch_repo_metadata(owner_repo)
+                if metadata is None:
+                    return True  # 如果无法获取信息，不拒绝
             
-            if response.status_code != 200:
-                return True  # 如果无法获取信息，不拒绝
-            
-            repo_data = response.json()
-            repo_name = repo_data.get('name', '').lower()
+            ranker = self._get_ranker(paper_title, keywords)
+            paper = ranker.paper
+            repo = ranker.features_for(metadata)
+            repo_name = repo.name
+            head_keywords = paper.keywords_lower[:2]
             
             # 检查是否在当前论文的特定黑名单中
             if hasattr(self, '_paper_specific_blacklist') and self._paper_specific_blacklist:
@@ -285,73 +502,41 @@ class GitHubFetcher:
                     print(f"    ⚠️  Repository {repo_name} is blacklisted for this paper")
                     return False
             
-            description = repo_data.get('description', '') or ''
-            
             # 特别过滤掉一些明显不相关的通用工具库 (扩展列表)
-            known_tools = ['howdoi', 'graphrag', 'xpra', 'wavelets', 'nboost', 'awesome-pytorch-papers', 
-                          'awesome-deep-learning', 'awesome-machine-learning', 'pytorch-tutorial', 
-                          'tensorflow-examples', 'robustmatting', 'robustvideo']
-            if repo_name in known_tools or any(kt in repo_name for kt in known_tools):
-                if not any(kw.lower() in repo_name.replace('-', ' ').replace('_', ' ') for kw in keywords[:2]):
+            if repo_name in KNOWN_TOOLS or any(kt in repo_name for kt in KNOWN_TOOLS):
+                if not any(kw in repo.name_spaced for kw in head_keywords):
                     print(f"    ⚠️  Filtering out known tool library: {repo_name}")
                     return False
                 
             # 过滤一些明显不相关的工具类型
-            tool_patterns = ['cli', 'tool', 'utility', 'framework', 'awesome', 'list', 'collection', 
-                            'tutorial', 'example', 'template', 'boilerplate', 'starter', 'kit']
-            if any(pattern in repo_name for pattern in tool_patterns) and not any(kw.lower() in repo_name for kw in keywords[:2]):
+            if any(pattern in repo_name for pattern in TOOL_PATTERNS) and not any(kw in repo_name for kw in head_keywords):
                 # 有工具特征，但没有论文关键词特征
-                stars = repo_data.get('stargazers_count', 0)
-                if stars > 1000:  # 高星通用工具很可能不是论文实现
-                    print(f"    ⚠️  Filtering out high-star general tool: {repo_name} ({stars} stars)")
+                if repo.stars > 1000:  # 高星通用工具很可能不是论文实现
+                    print(f"    ⚠️  Filtering out high-star general tool: {repo_name} ({repo.stars} stars)")
                     return False
             
-            # 严格检查仓库名与论文关键词的匹配度
-            # 提取论文标题中的关键词特征（更细致地处理）
-            paper_title_lower = paper_title.lower()
-            
-            # 1. 提取主要概念（冒号前的部分或第一个词组）
-            primary_concept = ""
-            if ':' in paper_title:
-                primary_concept = paper_title.split(':')[0].strip().lower()
-            else:
-                # 取前3个词作为主要概念
-                words = paper_title.split()
-                primary_concept = ' '.join(words[:min(3, len(words))]).lower()
-            
-            # 2. 检查仓库名是否包含主要概念中的关键词
-            primary_concept_words = re.findall(r'\b[a-z0-9]{3,}\b', primary_concept)
-            repo_name_words = re.findall(r'[a-z0-9]+', repo_name)
-            
-            # 如果不包含任何主要概念词，可能不相关
-            if primary_concept_words and not any(word in repo_name for word in primary_concept_words):
-                # 但如果是低星仓库，我们更宽松一些
-                stars = repo_data.get('stargazers_count', 0)
-                if stars > 500:
-                    # 如果是高星仓库，但名称与论文主要概念无关，可能不相关
-                    # 需要通过其他方式进一步验证
-                    strict_verification_needed = True
-                else:
-                    # 低星仓库更宽松一些
-                    strict_verification_needed = False
-            else:
-                # 有主要概念词匹配，可能相关
-                strict_verification_needed = False
+            # 严格检查仓库名与论文主要概念（冒号前的部分或前3个词）的匹配度
+            # 如果不包含任何主要概念词，且是高星仓库，需要通过README进一步验证；低星仓库更宽松一些
+            strict_verification_needed = (
+                bool(paper.primary_concept_words)
+                and not any(word in repo_name for word in paper.primary_concept_words)
+                and repo.stars > 500
+            )
             
             # 检查描述中是否包含关键词
-            description_lower = description.lower()
+            description_lower = repo.description
+            if batch is not None and metadata.topics:
+                description_lower = f"{description_lower} {' '.join(metadata.topics).lower()}".strip()
+            core_words = paper.core_words
             
             # 首先，检查描述中是否直接提到论文
-            paper_indicators = ['paper', 'implementation', 'code', 'official', 'reproduction', 'pytorch']
-            if any(indicator in description_lower for indicator in paper_indicators):
+            if any(indicator in description_lower for indicator in PAPER_INDICATORS):
                 # 描述中提到论文相关词汇，且包含关键词
-                core_words = [kw.lower() for kw in keywords[:3]]
                 if any(word in description_lower for word in core_words):
                     print(f"    ✅ Description mentions paper implementation")
                     return True
             
             # 如果描述中包含论文的核心词汇，认为相关
-            core_words = [kw.lower() for kw in keywords[:3]]
             matches = sum(1 for word in core_words if word in description_lower)
             
             if matches >= 1:  # 至少匹配一个核心词
@@ -364,110 +549,90 @@ class GitHubFetcher:
             
             # 对于需要严格验证的仓库，检查README内容
             if strict_verification_needed:
-                # 获取README内容
-                readme_url = f"https://api.github.com/repos/{owner_repo}/readme"
-                readme_response = requests.get(readme_url, headers=self.headers)
+                readme_content = self._readme(owner_repo, metadata, batch)
                 
-                if readme_response.status_code == 200:
-                    readme_data = readme_response.json()
-                    if 'content' in readme_data:
-                        import base64
-                        readme_content = base64.b64decode(readme_data['content']).decode('utf-8', errors='ignore').lower()
-                        
-                        # 1. 检查README中是否直接提到论文标题
-                        paper_title_clean = re.sub(r'[^\w\s]', ' ', paper_title.lower())
-                        title_words = set(paper_title_clean.split())
-                        title_word_count = len(title_words)
-                        
-                        matches = sum(1 for word in title_words if word.lower() in readme_content)
-                        match_ratio = matches / title_word_count if title_word_count > 0 else 0
-                        
-                        # README包含超过50%的标题词，可能相关
-                        if match_ratio > 0.5:
-                            print(f"    ✅ README contains many paper title words: {match_ratio:.1%}")
-                            return True
-                        
-                        # 2. 检查README中是否有论文的关键词
-                        important_words = [word for word in title_words if len(word) > 3 and word not in {'with', 'using', 'for', 'from', 'the', 'and'}]
-                        
-                        readme_matches = sum(1 for word in important_words if word in readme_content)
-                        if readme_matches >= 2:  # README中至少出现2个重要词汇
-                            print(f"    ✅ README contains multiple paper keywords")
-                            return True
+                if readme_content is not None:
+                    important_words = paper.strict_important_words
+                    
+                    # 1. 检查README中是否直接提到论文标题
+                    title_word_count = paper.strict_title_word_count
+                    matches = sum(1 for word in paper.strict_title_words if word in readme_content)
+                    match_ratio = matches / title_word_count if title_word_count > 0 else 0
+                    
+                    # README包含超过50%的标题词，可能相关
+                    if match_ratio > 0.5:
+                        print(f"    ✅ README contains many paper title words: {match_ratio:.1%}")
+                        return True
+                    
+                    # 2. 检查README中是否有论文的关键词
+                    readme_matches = sum(1 for word in important_words if word in readme_content)
+                    if readme_matches >= 2:  # README中至少出现2个重要词汇
+                        print(f"    ✅ README contains multiple paper keywords")
+                        return True
+                    
+                    # 3. 检查README中是否提到arXiv或论文引用
+                    if 'arxiv' in readme_content or 'paper' in readme_content:
+                        # 在arxiv或paper提及附近检查是否有论文关键词
+                        arxiv_idx = readme_content.find('arxiv')
+                        if arxiv_idx == -1:
+                            arxiv_idx = readme_content.find('paper')
                         
-                        # 3. 检查README中是否提到arXiv或论文引用
-                        if 'arxiv' in readme_content or 'paper' in readme_content:
-                            # 在arxiv或paper提及附近检查是否有论文关键词
-                            arxiv_idx = readme_content.find('arxiv')
-                            if arxiv_idx == -1:
-                                arxiv_idx = readme_content.find('paper')
+                        if arxiv_idx != -1:
+                            # 检查周围上下文
+                            context_window = readme_content[max(0, arxiv_idx-200):min(len(readme_content), arxiv_idx+200)]
                             
-                            if arxiv_idx != -1:
-                                # 检查周围上下文
-                                context_window = readme_content[max(0, arxiv_idx-200):min(len(readme_content), arxiv_idx+200)]
-                                
-                                # 计算上下文中有多少论文关键词
-                                context_matches = sum(1 for word in important_words if word in context_window)
-                                if context_matches >= 1:
-                                    print(f"    ✅ README mentions arxiv/paper with relevant keywords")
-                                    return True
+                            # 计算上下文中有多少论文关键词
+                            context_matches = sum(1 for word in important_words if word in context_window)
+                            if context_matches >= 1:
+                                print(f"    ✅ README mentions arxiv/paper with relevant keywords")
+                                return True
                 
                 # 严格验证失败，仓库可能不相关
                 print(f"    ❌ Repository fails strict verification: likely not related to paper")
                 return False
             
             # 提取论文标题的特征部分（通常是冒号前的部分，如"BiFormer: Vision Transformer..."中的"BiFormer"）
-            title_prefix = paper_title.split(':')[0].strip() if ':' in paper_title else paper_title.split()[0]
+            title_prefix = paper.title_prefix_lower
             
             # 获取README内容
-            readme_url = f"https://api.github.com/repos/{owner_repo}/readme"
-            readme_response = requests.get(readme_url, headers=self.headers)
+            readme_content = self._readme(owner_repo, metadata, batch)
             
-            if readme_response.status_code == 200:
-                readme_data = readme_response.json()
-                if 'content' in readme_data:
-                    import base64
-                    readme_content = base64.b64decode(readme_data['content']).decode('utf-8', errors='ignore').lower()
-                    
-                    # 1. 检查README中是否直接提到论文标题
-                    title_words = set(paper_title.lower().split())
-                    
-                    # 2. 检查README中是否有论文的关键词
-                    important_words = [word for word in title_words if len(word) > 3 and word not in {'with', 'using', 'for', 'from', 'the', 'and'}]
+            if readme_content is not None:
+                important_words = paper.loose_important_words
+                
+                # 1. 检查README中是否有论文的关键词
+                readme_matches = sum(1 for word in important_words if word in readme_content)
+                if readme_matches >= 2:  # README中至少出现2个重要词汇
+                    print(f"    ✅ README contains multiple paper keywords")
+                    return True
                     
-                    readme_matches = sum(1 for word in important_words if word in readme_content)
-                    if readme_matches >= 2:  # README中至少出现2个重要词汇
-                        print(f"    ✅ README contains multiple paper keywords")
+                # 2. 检查README中是否包含论文标题或特征部分
+                if title_prefix in readme_content:
+                    # 检查上下文是否与论文相关
+                    title_idx = readme_content.find(title_prefix)
+                    context_window = readme_content[max(0, title_idx-50):min(len(readme_content), title_idx+50)]
+                    if any(kw in context_window for kw in ['paper', 'implementation', 'code', 'official', 'arxiv']):
+                        print(f"    ✅ README mentions paper title in relevant context")
+                        return True
+                
+                # 3. 检查是否有arXiv或DOI链接
+                if 'arxiv.org' in readme_content or 'doi.org' in readme_content:
+                    # 有学术引用链接，且至少有一个关键词匹配
+                    if any(word in readme_content for word in important_words):
+                        print(f"    ✅ README contains academic references and paper keywords")
                         return True
-                        
-                    # 3. 检查README中是否包含论文标题或特征部分
-                    if title_prefix.lower() in readme_content:
-                        # 检查上下文是否与论文相关
-                        title_idx = readme_content.find(title_prefix.lower())
-                        context_window = readme_content[max(0, title_idx-50):min(len(readme_content), title_idx+50)]
-                        if any(kw in context_window for kw in ['paper', 'implementation', 'code', 'official', 'arxiv']):
-                            print(f"    ✅ README mentions paper title in relevant context")
-                            return True
-                    
-                    # 4. 检查是否有arXiv或DOI链接
-                    if 'arxiv.org' in readme_content or 'doi.org' in readme_content:
-                        # 有学术引用链接，且至少有一个关键词匹配
-                        if any(word in readme_content for word in important_words):
-                            print(f"    ✅ README contains academic references and paper keywords")
-                            return True
             
             # 如果描述和README都没有足够的匹配，但仓库名直接包含关键词，也认为相关
             for keyword in core_words:
-                if keyword.lower() in repo_name:
+                if keyword in repo_name:
                     print(f"    ✅ Repository name contains key model term: {keyword}")
                     return True
             
             # 对于低星仓库更宽松一些
-            stars = repo_data.get('stargazers_count', 0)
-            if stars < 100:
+            if repo.stars < 100:
                 # 对于低星仓库，如果仓库名或描述中有任何一个关键词匹配，都接受
-                for kw in keywords:
-                    if kw.lower() in repo_name or kw.lower() in description_lower:
+                for kw, kw_lower in zip(paper.keywords, paper.keywords_lower):
+                    if kw_lower in repo_name or kw_lower in description_lower:
                         print(f"    ✅ Low-star repo with keyword match: {kw}")
                         return True
             
@@ -477,172 +642,69 @@ class GitHubFetcher:
             print(f"    ⚠️  Verification error: {e}")
             return True  # 验证出错时不拒绝，避免过于严格
     
-    def _rank_repositories(self, repos, paper_title, keywords, strategy="general"):
+    def _readme(self, owner_repo, metadata=None, batch=None):
         """
-        对搜索结果按相关性排序，返回最佳匹配
-        改进版：更严格的评分标准，降低星星数的权重
+        验证用的 README：graphql 模式下从批量结果读取
+        批量结果中没有该仓库，或常见文件名都取不到 README 时通过 REST 获取
         """
-        scored_repos = []
-        title_lower = paper_title.lower()
-        keywords_lower = [kw.lower() for kw in keywords]
-        
-        # 特别关注的模式：
-        # 1. 常见的论文实现命名模式（如"Paper-Pytorch", "Model-Implementation"等）
-        implementation_patterns = ['implementation', 'official', 'pytorch', 'tensorflow', 'code', 'paper']
-        
-        # 2. 明显不相关的通用仓库
-        generic_tools = ['howdoi', 'graphrag', 'xpra', 'wavelets', 'nboost', 'awesome-papers', 'robustvideo']
-        
-        # 3. 提取主要概念（冒号前的部分或第一个词组）
-        primary_concept = ""
-        if ':' in paper_title:
-            primary_concept = paper_title.split(':')[0].strip().lower()
-            primary_concept_words = primary_concept.split()
-        else:
-            # 取前3个词作为主要概念
-            words = paper_title.split()
-            primary_concept = ' '.join(words[:min(3, len(words))]).lower()
-            primary_concept_words = words[:min(3, len(words))]
-        
-        for repo in repos:
-            score = 0
-            repo_name = repo.get('name', '').lower()
-            repo_description = repo.get('description', '') or ''
-            repo_description = repo_description.lower()
-            
-            # 0. 预先过滤明显不相关的工具库
-            if repo_name in generic_tools or any(tool in repo_name for tool in generic_tools):
-                # 除非名称中有明确的关键词匹配，否则跳过通用工具
-                if not any(kw.lower() in repo_name for kw in keywords_lower[:2]):
-                    score -= 100  # 严重惩罚，实际上排除这些仓库
-                    scored_repos.append((score, repo))
-                    continue
-            
-            # 1. 仓库名与主要概念词匹配 (权重最高)
-            concept_matches = 0
-            for concept_word in primary_concept_words:
-                if len(concept_word) > 2 and concept_word.lower() in repo_name:
-                    concept_matches += 1
-                    if concept_word.lower() == repo_name or repo_name.startswith(concept_word.lower()):
-                        score += 15  # 精确匹配给予更高分数
-                    else:
-                        score += 10
-            
-            # 2. 仓库名与关键词匹配
-            exact_name_match = False
-            for kw in keywords_lower:
-                if kw in repo_name:
-                    if kw == repo_name or repo_name.startswith(kw) or repo_name.endswith(kw):
-                        score += 8  # 精确匹配更高分
-                        exact_name_match = True
-                    else:
-                        score += 5
-            
-            # 3. 特别加分：实现模式 (implementation, official, pytorch等)
-            impl_match = False
-            for pattern in implementation_patterns:
-                if pattern in repo_name:
-                    score += 6
-                    impl_match = True
-                    break
-                    
-            # 4. 描述匹配
-            desc_matches = 0
-            for kw in keywords_lower:
-                if kw in repo_description:
-                    score += 3
-                    desc_matches += 1
-            
-            # 检查描述中是否包含"implementation"或"official"等指示词
-            paper_indicators = ['implementation', 'official', 'code for', 'paper', 'reproduction', 'pytorch implementation']
-            if any(pattern in repo_description for pattern in paper_indicators):
-                score += 5
-                # 如果同时包含关键词，给额外加分
-                if desc_matches > 0:
-                    score += 3
-            
-            # 5. 第一个关键词的特殊加分（通常是模型名）
-            if keywords_lower and keywords_lower[0] in repo_name:
-                score += 7
-                
-            # 6. Stars数量加分（但权重降低，避免被高星仓库误导）
-            stars = repo.get('stargazers_count', 0)
-            if stars > 5000:
-                # 高星项目有特殊处理：
-                # 如果是通用工具但关键词匹配度低，减分而不是加分
-                if repo_name in generic_tools or any(pattern in repo_name for pattern in ['tool', 'utility', 'framework']):
-                    if not exact_name_match and not impl_match and concept_matches == 0:
-                        score -= 15  # 严厉惩罚明显不相关的高星项目
-                elif concept_matches >= 1 or exact_name_match:
-                    # 如果高星项目有明确的概念匹配，适当加分
-                    score += min(1.5, stars / 10000)  # 最多加1.5分，大幅降低权重
-                else:
-                    # 其他高星项目很小的加分
-                    score += min(0.5, stars / 20000)  # 最多加0.5分
-            elif stars > 1000:
-                score += min(stars / 2000, 1)  # 最多加1分
-            elif stars > 100:
-                score += 0.5
-            
-            # 7. 最近更新加分
-            updated_at = repo.get('updated_at', '')
-            if updated_at:
-                try:
-                    updated_date = datetime.strptime(updated_at, "%Y-%m-%dT%H:%M:%SZ")
-                    days_since_update = (datetime.now() - updated_date).days
-                    if days_since_update < 180:  # 半年内更新过
-                        score += 1
-                except:
-                    pass
-            
-            # 8. 根据搜索策略调整阈值
-            min_score_threshold = {
-                "exact": 18,    # 精确搜索要求更高分数
-                "context": 15,  # 上下文搜索
-                "multi": 12,    # 多关键词搜索
-                "single": 10,   # 单关键词搜索
-                "general": 8    # 一般搜索
-            }.get(strategy, 8)
-            
-            # 9. 特殊惩罚：明显不相关的仓库
-            irrelevant_patterns = ['awesome', 'list', 'collection', 'tutorial', 'course', 'book', 'survey', 'api', 'howto']
-            for pattern in irrelevant_patterns:
-                if pattern in repo_name and not exact_name_match and concept_matches == 0:
-                    score -= 8  # 减分
-            
-            # 10. 额外的相关性检查
-            # 计算仓库名和论文标题之间的单词重叠度
-            repo_words = set(repo_name.split('-') + repo_name.split('_'))
-            title_words = set(w.lower() for w in re.findall(r'\b[A-Za-z]+\b', paper_title) if len(w) > 2)
-            overlap = len(repo_words.intersection(title_words))
-            
-            if overlap >= 2:
-                score += 4  # 有多个词重叠
-            elif overlap == 1:
-                score += 2  # 有一个词重叠
-            
-            scored_repos.append((score, repo))
-        
-        # 按分数排序，返回最高分的仓库
-        if scored_repos:
-            scored_repos.sort(key=lambda x: x[0], reverse=True)
-            best_score, best_repo = scored_repos[0]
-            
-            # 使用策略相关的阈值
-            min_threshold = {
-                "exact": 18,
-                "context": 15,
-                "multi": 12, 
-                "single": 10,
-                "general": 8
-            }.get(strategy, 8)
-            
-            print(f"    📊 Best match score: {best_score:.1f} (threshold: {min_threshold})")
-            
-            if best_score < min_threshold:
-                print(f"    ❌ Score too low, rejecting match")
-                return None
-                
-            return best_repo
+        if batch is not None:
+            entry = batch.get(metadata)
+            if entry is not None and entry['readme'] is not None:
+                return entry['readme']
+        return self._fetch_readme(owner_repo)
+
+    def _fetch_readme(self, owner_repo):
+        """
+        获取仓库README（已转为小写），无法获取时返回 None
+        """
+        readme_url = f"{self.api_url}/repos/{owner_repo}/readme"
+        readme_response = self._get(readme_url, "github_readme")
         
+        if readme_response.status_code == 200:
+            readme_data = readme_response.json()
+            if 'content' in readme_data:
+                return base64.b64decode(readme_data['content']).decode('utf-8', errors='ignore').lower()
         return None
+    
+    def _get_ranker(self, paper_title, keywords):
+        """
+        获取当前论文的排序引擎：同一论文在各个搜索策略间复用论文特征与已打分的候选仓库
+        """
+        ranker = getattr(self, '_ranker', None)
+        if ranker is None or ranker.paper.title != paper_title or ranker.paper.keywords != list(keywords):
+            ranker = RepoRanker(paper_title, keywords, self._repo_features)
+            self._ranker = ranker
+        return ranker
+
+    def _rank_repositories(self, repos, paper_title, keywords, strategy="general"):
+        """
+        对搜索结果（RepoMetadata 列表）按相关性排序，返回最佳匹配
+        改进版：更严格的评分标准，降低星星数的权重
+        """
+        ranker = self._get_ranker(paper_title, keywords)
+        best = ranker.best(repos, strategy)
+        if not best:
+            return None
+
+        # 使用策略相关的阈值
+        print(f"    📊 Best match score: {best['score']:.1f} (threshold: {best['threshold']})")
+
+        if best['score'] < best['threshold']:
+            print(f"    ❌ Score too low, rejecting match")
+            return None
+
+        return best['repo']
+
+    def _rank_candidates(self, repos, paper_title, keywords, strategy="general", limit=3):
+        """
+        graphql 模式的候选：分数达到策略阈值的前 limit 个仓库（按分数降序）
+        """
+        ranked = self._get_ranker(paper_title, keywords).rank(repos, strategy)
+        if not ranked:
+            return []
+
+        print(f"    📊 Best match score: {ranked[0]['score']:.1f} (threshold: {ranked[0]['threshold']})")
+        candidates = [item['repo'] for item in ranked[:limit] if item['score'] >= item['threshold']]
+        if not candidates:
+            print(f"    ❌ Score too low, rejecting match")
+        return candidates
@@ -2,6 +2,9 @@ import openreview
 import datetime
 import time
 
+from utils import http_client
+from utils.paper import Paper
+
 class OpenReviewFetcher:
     """
     利用 OpenReview API 拉取 ICLR、NeurIPS、ICML 等会议的已接收论文信息。
@@ -11,6 +14,8 @@ class OpenReviewFetcher:
         # conference_id 示例： "ICLR.cc/2024/Conference"
         self.client = openreview.Client(baseurl='https://api.openreview.net')
         self.conf_id = conference_id
+        parts = conference_id.split('/')
+        self.year = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
 
     def fetch_papers(self, since_date, max_papers=100):
         """
@@ -43,15 +48,16 @@ class OpenReviewFetcher:
             accepted_papers = []
             for note in camera_ready_papers:
                 if note.tcdate >= since_ts:
-                    accepted_papers.append({
-                        'title': note.content.get('title', ''),
-                        'authors': note.content.get('authors', []),
-                        'abstract': note.content.get('abstract', ''),
-                        'pdf_url': note.content.get('pdf', ''),
-                        'created': note.tcdate,
-                        'venue': self.conf_id.split('/')[0],
-                        'decision': 'Camera Ready (Accepted)'
-                    })
+                    accepted_papers.append(Paper(
+                        title=note.content.get('title', ''),
+                        authors=note.content.get('authors', []),
+                        abstract=note.content.get('abstract', ''),
+                        pdf_url=note.content.get('pdf', ''),
+                        created=note.tcdate,
+                        venue=self.conf_id.split('/')[0],
+                        year=self.year,
+                        decision='Camera Ready (Accepted)'
+                    ))
             
             return accepted_papers
                 
@@ -92,20 +98,21 @@ class OpenReviewFetcher:
             
             # 只保留已接收的论文
             if decision_info and self._is_accepted(decision_info):
-                accepted_papers.append({
-                    'title': note.content.get('title', ''),
-                    'authors': note.content.get('authors', []),
-                    'abstract': note.content.get('abstract', ''),
-                    'pdf_url': note.content.get('pdf', ''),
-                    'created': note.tcdate,
-                    'venue': self.conf_id.split('/')[0],
-                    'decision': decision_info
-                })
+                accepted_papers.append(Paper(
+                    title=note.content.get('title', ''),
+                    authors=note.content.get('authors', []),
+                    abstract=note.content.get('abstract', ''),
+                    pdf_url=note.content.get('pdf', ''),
+                    created=note.tcdate,
+                    venue=self.conf_id.split('/')[0],
+                    year=self.year,
+                    decision=decision_info
+                ))
             
             # 进度提示和API限制保护
             if (i + 1) % 20 == 0:
                 print(f"  ⏳ Processed {i + 1}/{len(submissions)}, found {len(accepted_papers)} accepted papers")
-                time.sleep(2)  # 每20个请求后暂停2秒
+                http_client.wait("openreview", 2)  # 每20个请求后暂停2秒
         
         print(f"✅ Completed! Found {len(accepted_papers)} accepted papers from {processed_count} processed submissions")
         return accepted_papers
@@ -151,6 +158,7 @@ class OpenReviewFetcher:
             except Exception as e:
                 if attempt < max_retries - 1:
                     print(f"⚠️  Retry {attempt + 1}/{max_retries} for paper {paper_id}")
+                    http_client.retry("openreview_decision", "error")
                     time.sleep(2 ** attempt)  # 指数退避
                 else:
                     print(f"❌ Failed to get decision for paper {paper_id}: {e}")
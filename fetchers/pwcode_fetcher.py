@@ -1,12 +1,13 @@
-import requests
+from utils import http_client
 
 class PWCodeFetcher:
     """
     利用 PapersWithCode API 查询论文是否被收录，及其对应的 GitHub Repo 链接。
     """
 
-    def __init__(self, pwc_api_key):
+    def __init__(self, pwc_api_key, api_url="https://paperswithcode.com/api/v1"):
         self.api_key = pwc_api_key
+        self.api_url = api_url.rstrip("/")
         self.headers = {"Authorization": f"Token {self.api_key}"}
 
     def search_paper(self, title):
@@ -15,8 +16,8 @@ class PWCodeFetcher:
         返回字典：{'repo_url': ..., 'sota': bool}
         若未找到则返回 None
         """
-        url = f"https://paperswithcode.com/api/v1/papers/search/?q={title}"
-        response = requests.get(url, headers=self.headers)
+        url = f"{self.api_url}/papers/search/?q={title}"
+        response = http_client.get(url, "pwc_search", headers=self.headers)
         if response.status_code != 200:
             return None
 
@@ -0,0 +1,336 @@
+import re
+from collections import OrderedDict
+from datetime import datetime
+
+from utils import cassette
+from utils.metrics import metrics
+
+# 根据搜索策略调整的最低分阈值
+MIN_SCORE_THRESHOLDS = {
+    "exact": 18,    # 精确搜索要求更高分数
+    "context": 15,  # 上下文搜索
+    "multi": 12,    # 多关键词搜索
+    "single": 10,   # 单关键词搜索
+    "general": 8    # 一般搜索
+}
+
+# 常见的论文实现命名模式（如"Paper-Pytorch", "Model-Implementation"等）
+IMPLEMENTATION_PATTERNS = ['implementation', 'official', 'pytorch', 'tensorflow', 'code', 'paper']
+
+# 明显不相关的通用仓库
+GENERIC_TOOLS = ['howdoi', 'graphrag', 'xpra', 'wavelets', 'nboost', 'awesome-papers', 'robustvideo']
+
+# 描述中的论文实现指示词
+DESCRIPTION_INDICATORS = ['implementation', 'official', 'code for', 'paper', 'reproduction', 'pytorch implementation']
+
+# 明显不相关的仓库名模式
+IRRELEVANT_PATTERNS = ['awesome', 'list', 'collection', 'tutorial', 'course', 'book', 'survey', 'api', 'howto']
+
+# README 重要词过滤用的停用词
+README_STOPWORDS = {'with', 'using', 'for', 'from', 'the', 'and'}
+
+
+def get_min_threshold(strategy):
+    """返回搜索策略对应的最低分阈值"""
+    return MIN_SCORE_THRESHOLDS.get(strategy, 8)
+
+
+class PaperFeatures:
+    """
+    论文侧特征，每篇论文只提取一次，供排序和验证复用。
+    """
+
+    __slots__ = (
+        'title', 'keywords', 'keywords_lower', 'core_words',
+        'concept_words', 'primary_concept_words', 'title_words',
+        'strict_title_words', 'strict_title_word_count', 'strict_important_words',
+        'loose_important_words', 'title_prefix_lower'
+    )
+
+    def __init__(self, paper_title, keywords):
+        self.title = paper_title
+        self.keywords = list(keywords)
+        self.keywords_lower = [kw.lower() for kw in keywords]
+        self.core_words = self.keywords_lower[:3]
+
+        # 主要概念（冒号前的部分或前3个词）
+        if ':' in paper_title:
+            primary_concept = paper_title.split(':')[0].strip().lower()
+        else:
+            words = paper_title.split()
+            primary_concept = ' '.join(words[:min(3, len(words))]).lower()
+        # 排序使用的概念词（长度>2）
+        self.concept_words = [w for w in primary_concept.split() if len(w) > 2]
+        # 验证使用的概念词
+        self.primary_concept_words = re.findall(r'\b[a-z0-9]{3,}\b', primary_concept)
+
+        # 标题单词集合（用于与仓库名计算重叠度）
+        self.title_words = set(w.lower() for w in re.findall(r'\b[A-Za-z]+\b', paper_title) if len(w) > 2)
+
+        # 严格验证：去掉标点后的标题词
+        self.strict_title_words = set(re.sub(r'[^\w\s]', ' ', paper_title.lower()).split())
+        self.strict_title_word_count = len(self.strict_title_words)
+        self.strict_important_words = [w for w in self.strict_title_words if len(w) > 3 and w not in README_STOPWORDS]
+
+        # 常规验证：直接按空白切分的标题词
+        loose_words = set(paper_title.lower().split())
+        self.loose_important_words = [w for w in loose_words if len(w) > 3 and w not in README_STOPWORDS]
+
+        # 标题特征部分（如"BiFormer: Vision Transformer..."中的"BiFormer"）
+        title_prefix = paper_title.split(':')[0].strip() if ':' in paper_title else paper_title.split()[0]
+        self.title_prefix_lower = title_prefix.lower()
+
+
+class RepoMetadata:
+    """
+    仓库元数据：由搜索结果条目（或 /repos/{owner}/{repo} 的返回）构建。
+    搜索结果已包含 stars、forks、创建时间、描述和 topics，排序、验证和统计共用同一个对象，
+    不需要再为选中的仓库请求 /repos。
+    """
+
+    __slots__ = ('id', 'full_name', 'name', 'html_url', 'description', 'topics', 'stars', 'forks',
+                 'created_at', 'updated_at')
+
+    def __init__(self, id=None, full_name="", name="", html_url="", description=None, topics=None, stars=0,
+                 forks=0, created_at=None, updated_at=None):
+        self.id = id
+        self.full_name = full_name
+        self.name = name
+        self.html_url = html_url
+        self.description = description
+        self.topics = topics or []
+        self.stars = stars
+        self.forks = forks
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_payload(cls, data):
+        full_name = data.get('full_name') or ''
+        return cls(
+            id=data.get('id'),
+            full_name=full_name,
+            name=data.get('name') or full_name.rsplit('/', 1)[-1],
+            html_url=data.get('html_url') or (f"https://github.com/{full_name}" if full_name else ''),
+            description=data.get('description'),
+            topics=data.get('topics') or [],
+            stars=data.get('stargazers_count') or 0,
+            forks=data.get('forks_count') or 0,
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at'),
+        )
+
+    def days_since_created(self):
+        """开源时长（天）；没有创建时间时返回 None"""
+        if not self.created_at:
+            return None
+        created_date = datetime.strptime(self.created_at, "%Y-%m-%dT%H:%M:%SZ")
+        return (cassette.now() - created_date).days
+
+
+class RepoFeatures:
+    """
+    候选仓库侧特征，每个仓库只提取一次（与论文无关，可跨论文、跨策略复用）。
+    """
+
+    __slots__ = ('name', 'description', 'stars', 'name_words', 'name_spaced', 'recently_updated')
+
+    def __init__(self, repo):
+        self.name = (repo.name or '').lower()
+        self.description = (repo.description or '').lower()
+        self.stars = repo.stars
+        self.name_words = set(self.name.split('-') + self.name.split('_'))
+        self.name_spaced = self.name.replace('-', ' ').replace('_', ' ')
+
+        # 最近更新（半年内）
+        self.recently_updated = False
+        updated_at = repo.updated_at
+        if updated_at:
+            try:
+                updated_date = datetime.strptime(updated_at, "%Y-%m-%dT%H:%M:%SZ")
+                self.recently_updated = (cassette.now() - updated_date).days < 180
+            except:
+                pass
+
+
+def repo_cache_key(repo):
+    """候选仓库（RepoMetadata）的缓存键：优先使用 id，其次 full_name / html_url"""
+    return repo.id or repo.full_name or repo.html_url or repo.name
+
+
+class FeatureCache(OrderedDict):
+    """
+    候选仓库特征的 LRU 缓存：跨论文复用，但不随处理的论文数无限增长
+    """
+
+    def __init__(self, maxsize=4096):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class RepoRanker:
+    """
+    单篇论文的候选仓库（RepoMetadata）排序引擎。
+    论文特征在构造时提取一次；候选仓库特征通过 repo_features 缓存共享；
+    同一仓库在不同策略中出现时只打分一次（分数与策略无关，只有阈值不同）。
+    """
+
+    def __init__(self, paper_title, keywords, repo_features=None):
+        self.paper = PaperFeatures(paper_title, keywords)
+        self.repo_features = repo_features if repo_features is not None else {}
+        self._scores = {}
+
+    def features_for(self, repo):
+        key = repo_cache_key(repo)
+        features = self.repo_features.get(key)
+        metrics.cache("repo_features", features is not None)
+        if features is None:
+            features = RepoFeatures(repo)
+            self.repo_features[key] = features
+        return features
+
+    def score(self, repo):
+        """
+        返回 (score, breakdown)，breakdown 为各评分项的贡献。
+        """
+        key = repo_cache_key(repo)
+        cached = self._scores.get(key)
+        metrics.cache("repo_scores", cached is not None)
+        if cached is None:
+            cached = self._score_features(self.features_for(repo))
+            self._scores[key] = cached
+        return cached
+
+    def _score_features(self, repo):
+        paper = self.paper
+        keywords_lower = paper.keywords_lower
+        repo_name = repo.name
+        score = 0
+        breakdown = {}
+
+        def add(component, value):
+            # 按原评分顺序累加，保证浮点结果一致
+            nonlocal score
+            score += value
+            breakdown[component] = breakdown.get(component, 0) + value
+
+        # 0. 预先过滤明显不相关的工具库
+        if repo_name in GENERIC_TOOLS or any(tool in repo_name for tool in GENERIC_TOOLS):
+            # 除非名称中有明确的关键词匹配，否则跳过通用工具
+            if not any(kw in repo_name for kw in keywords_lower[:2]):
+                add('generic_tool', -100)
+                return score, breakdown
+
+        # 1. 仓库名与主要概念词匹配 (权重最高)
+        concept_matches = 0
+        for concept_word in paper.concept_words:
+            if concept_word in repo_name:
+                concept_matches += 1
+                if concept_word == repo_name or repo_name.startswith(concept_word):
+                    add('concept', 15)
+                else:
+                    add('concept', 10)
+
+        # 2. 仓库名与关键词匹配
+        exact_name_match = False
+        for kw in keywords_lower:
+            if kw in repo_name:
+                if kw == repo_name or repo_name.startswith(kw) or repo_name.endswith(kw):
+                    add('keyword_name', 8)
+                    exact_name_match = True
+                else:
+                    add('keyword_name', 5)
+
+        # 3. 特别加分：实现模式
+        impl_match = False
+        for pattern in IMPLEMENTATION_PATTERNS:
+            if pattern in repo_name:
+                add('implementation', 6)
+                impl_match = True
+                break
+
+        # 4. 描述匹配
+        desc_matches = 0
+        for kw in keywords_lower:
+            if kw in repo.description:
+                add('description', 3)
+                desc_matches += 1
+
+        if any(pattern in repo.description for pattern in DESCRIPTION_INDICATORS):
+            add('indicator', 5)
+            if desc_matches > 0:
+                add('indicator', 3)
+
+        # 5. 第一个关键词的特殊加分（通常是模型名）
+        if keywords_lower and keywords_lower[0] in repo_name:
+            add('first_keyword', 7)
+
+        # 6. Stars数量加分（权重较低）
+        stars = repo.stars
+        if stars > 5000:
+            if repo_name in GENERIC_TOOLS or any(pattern in repo_name for pattern in ['tool', 'utility', 'framework']):
+                if not exact_name_match and not impl_match and concept_matches == 0:
+                    add('stars', -15)
+            elif concept_matches >= 1 or exact_name_match:
+                add('stars', min(1.5, stars / 10000))
+            else:
+                add('stars', min(0.5, stars / 20000))
+        elif stars > 1000:
+            add('stars', min(stars / 2000, 1))
+        elif stars > 100:
+            add('stars', 0.5)
+
+        # 7. 最近更新加分
+        if repo.recently_updated:
+            add('recent', 1)
+
+        # 8. 特殊惩罚：明显不相关的仓库
+        if not exact_name_match and concept_matches == 0:
+            for pattern in IRRELEVANT_PATTERNS:
+                if pattern in repo_name:
+                    add('irrelevant', -8)
+
+        # 9. 仓库名和论文标题之间的单词重叠度
+        overlap = len(repo.name_words.intersection(paper.title_words))
+        if overlap >= 2:
+            add('overlap', 4)
+        elif overlap == 1:
+            add('overlap', 2)
+
+        return score, breakdown
+
+    def rank(self, repos, strategy="general"):
+        """
+        对单个策略的候选仓库打分并按分数降序排序（同分保持原顺序）。
+        返回 [{'repo', 'score', 'breakdown', 'strategy', 'threshold'}, ...]
+        """
+        threshold = get_min_threshold(strategy)
+        ranked = []
+        for repo in repos:
+            score, breakdown = self.score(repo)
+            ranked.append({
+                'repo': repo,
+                'score': score,
+                'breakdown': breakdown,
+                'strategy': strategy,
+                'threshold': threshold
+            })
+        ranked.sort(key=lambda x: x['score'], reverse=True)
+        return ranked
+
+    def best(self, repos, strategy="general"):
+        """返回最高分候选（不做阈值判断），没有候选时返回 None"""
+        ranked = self.rank(repos, strategy)
+        return ranked[0] if ranked else None
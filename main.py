@@ -1,38 +1,21 @@
 import os
-import yaml
+import sys
 import json
+import argparse
+import subprocess
 import time
-
-from fetchers.openreview_fetcher import OpenReviewFetcher
-from fetchers.acl_fetcher import ACLFetcher
-from fetchers.cvf_fetcher import CVFFetcher
-from fetchers.github_fetcher import GitHubFetcher
-from fetchers.pwcode_fetcher import PWCodeFetcher
-
-from processors.filter_and_summarize import process_papers
-from processors.scoring import calculate_score
-from processors.trend_analyzer import analyze_trends
-from processors.report_generator import generate_report
-from processors.paper_processor import validate_and_clean_matches
-
-import requests
 from datetime import datetime
 
-# ── 1. 读取配置 ─────────────────────────────────────────
-with open("configs/config.yaml", "r") as f:
-    config = yaml.safe_load(f)
+from utils import config as config_loader
+from utils import metrics as run_metrics
+from utils.metrics import metrics
 
-# OpenReview 拉取起始日期
-since_date = config['fetch']['since_date']
+# 各子系统均在对应阶段运行时才导入（OpenReview / pandas / openai 等依赖较重）
 
-# API Keys
-PWC_API_KEY = config['paperswithcode']['api_key']
-GITHUB_TOKEN = config['github']['token']
-SLACK_WEBHOOK = config['slack'].get('webhook_url', "")
-
-# 初始化 Fetchers
-pwcode_fetcher = PWCodeFetcher(PWC_API_KEY)
-github_fetcher = GitHubFetcher(GITHUB_TOKEN)
+OUTPUT_DIR = "output"
+RAW_PATH = os.path.join(OUTPUT_DIR, "raw_papers.json")
+FILTERED_PATH = os.path.join(OUTPUT_DIR, "filtered_papers.json")
+SCORED_PATH = os.path.join(OUTPUT_DIR, "scored_papers.json")
 
 # 会议列表和对应 Fetcher 初始化
 # OpenReview 会议 ID (使用2023年数据进行测试)
@@ -52,77 +35,289 @@ cvf_confs = [
 acl_year = "2024"
 acl_conf = "ACL"
 
+STAGES = ["fetch", "filter", "score", "report"]
+
+
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _load_papers(path):
+    """顶层的每条记录转换为 Paper（不用 object_hook：它会把嵌套的 dict 字段也转换成 Paper）"""
+    from utils.paper import Paper
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [Paper.from_dict(record) for record in json.load(f)]
+
+
+def _save_papers(path, papers, fields, **kwargs):
+    """按阶段的 JSON 字段写出 Paper 列表（编码时逐条转换为 dict）"""
+    from utils.paper import json_default
+
+    _save_json(path, papers, default=json_default(fields), **kwargs)
+
+
+def _save_json(path, data, **kwargs):
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, **kwargs)
+
+
 # ── 2. 拉取并合并所有会议论文 ────────────────────────────────
-all_papers = []
-
-# 2.1 OpenReview 部分 (暂时跳过，避免API限制)
-print("⏭️  OpenReview fetching temporarily skipped (API rate limiting issues)")
-# for conf in openreview_confs:
-#     fetcher = OpenReviewFetcher(conf)
-#     papers = fetcher.fetch_papers(since_date)
-#     all_papers.extend(papers)
-
-# 2.2 CVF 部分 (已发表论文)
-for url, venue in cvf_confs:
-    fetcher = CVFFetcher(url, venue)
-    papers = fetcher.fetch_papers(max_papers=300)  # 增加获取数量以找到更多有GitHub的论文
-    all_papers.extend(papers)
-    print(f"📚 Fetched {len(papers)} papers from {venue}")
-
-# 2.3 ACL 部分 (暂时注释，URL可能有问题)
-# acl_fetcher = ACLFetcher(year=acl_year, conference=acl_conf)
-# acl_papers = acl_fetcher.fetch_papers()
-# all_papers.extend(acl_papers)
-print("ACL fetching temporarily skipped (URL needs fixing)")
-
-# 2.4 Save raw fetched data (optional)
-os.makedirs("output", exist_ok=True)
-with open("output/raw_papers.json", "w", encoding="utf-8") as f:
-    json.dump(all_papers, f, indent=2)
-
-print(f"✅ Paper fetching completed: {len(all_papers)} papers collected")
+def run_fetch(config):
+    from fetchers.cvf_fetcher import CVFFetcher
+
+    all_papers = []
+
+    # 2.1 OpenReview 部分 (暂时跳过，避免API限制)
+    print("⏭️  OpenReview fetching temporarily skipped (API rate limiting issues)")
+    # from fetchers.openreview_fetcher import OpenReviewFetcher
+    # since_date = config['fetch']['since_date']
+    # for conf in openreview_confs:
+    #     fetcher = OpenReviewFetcher(conf)
+    #     papers = fetcher.fetch_papers(since_date)
+    #     all_papers.extend(papers)
+
+    # 2.2 CVF 部分 (已发表论文)；fetch.cvf_conferences 可覆盖默认会议列表（如基准测试指向 stub 服务）
+    fetch_settings = config.get('fetch') or {}
+    conferences = [(c['url'], c['venue']) for c in fetch_settings['cvf_conferences']] \
+        if fetch_settings.get('cvf_conferences') else cvf_confs
+    for url, venue in conferences:
+        fetcher = CVFFetcher(url, venue)
+        papers = fetcher.fetch_papers(max_papers=fetch_settings.get('max_papers', 300))  # 增加获取数量以找到更多有GitHub的论文
+        all_papers.extend(papers)
+        print(f"📚 Fetched {len(papers)} papers from {venue}")
+
+    # 2.3 ACL 部分 (暂时注释，URL可能有问题)
+    # from fetchers.acl_fetcher import ACLFetcher
+    # acl_fetcher = ACLFetcher(year=acl_year, conference=acl_conf)
+    # acl_papers = acl_fetcher.fetch_papers()
+    # all_papers.extend(acl_papers)
+    print("ACL fetching temporarily skipped (URL needs fixing)")
+
+    # 2.4 arXiv 部分（本地快照或 OAI-PMH 批量拉取，按分类和日期筛选）
+    arxiv_settings = config.get('arxiv') or {}
+    if arxiv_settings.get('enabled'):
+        from fetchers.arxiv_fetcher import DEFAULT_OAI_URL, ArxivFetcher
+        fetcher = ArxivFetcher(arxiv_settings.get('categories'),
+                               arxiv_settings.get('since_date') or (config.get('fetch') or {}).get('since_date'),
+                               arxiv_settings.get('until_date'))
+        papers = fetcher.fetch_papers(snapshot_path=arxiv_settings.get('snapshot_path'),
+                                      oai_url=arxiv_settings.get('oai_url', DEFAULT_OAI_URL),
+                                      oai_set=arxiv_settings.get('oai_set'),
+                                      max_papers=arxiv_settings.get('max_papers', 2000))
+        all_papers.extend(papers)
+        print(f"📚 Fetched {len(papers)} papers from arXiv")
+
+    # 2.5 Save raw fetched data
+    from utils.paper import RAW_FIELDS
+    _save_papers(RAW_PATH, all_papers, RAW_FIELDS)
+
+    print(f"✅ Paper fetching completed: {len(all_papers)} papers collected")
+    return all_papers
+
 
 # ── 3. 关键词筛选 & 摘要精简 ────────────────────────────────
-filtered_papers = process_papers(all_papers)
-with open("output/filtered_papers.json", "w", encoding="utf-8") as f:
-    json.dump(filtered_papers, f, indent=2)
+def run_filter(config):
+    from processors.filter_and_summarize import process_papers
+    from utils.paper import FILTERED_FIELDS
+
+    filtered_papers = process_papers(_load_papers(RAW_PATH))
+    _save_papers(FILTERED_PATH, filtered_papers, FILTERED_FIELDS)
+
+    print(f"🔍 Keyword filtering completed: {len(filtered_papers)} papers remain")
+    return filtered_papers
+
+
+# ── 4. 计算每篇论文的分数 & 验证匹配结果 ─────────────────────
+def _scoring_fetchers(config):
+    from fetchers.github_fetcher import GitHubFetcher
+    from fetchers.pwcode_fetcher import PWCodeFetcher
+
+    pwcode_fetcher = PWCodeFetcher(config['paperswithcode'].get('api_key'),
+                                   config['paperswithcode'].get('api_url', "https://paperswithcode.com/api/v1"))
+    github_fetcher = GitHubFetcher(config['github']['token'],
+                                   config['github'].get('api_url', "https://api.github.com"))
+    return github_fetcher, pwcode_fetcher
+
+
+def run_score(config, workers=None):
+    from processors.paper_processor import validate_and_clean_matches
+    from utils.paper import SCORED_FIELDS
+
+    queue_settings = config.get('score_queue') or {}
+    workers = queue_settings.get('workers', 0) if workers is None else workers
+    if workers > 0 and (config.get('cassette') or {}).get('mode') not in (None, False, 'off'):
+        # worker 进程会重新打开同一个 cassette 文件，录制 / 回放时只在当前进程内打分
+        print("⚠️  Cassette record/replay runs in a single process, ignoring --workers")
+        workers = 0
+
+    print("\n📊 Calculating paper scores...")
+    papers = _load_papers(FILTERED_PATH)
+    if workers > 0:
+        scored_papers = _score_distributed(config, papers, workers, queue_settings)
+    else:
+        from processors.scoring import calculate_score
+        scored_papers = calculate_score(papers, *_scoring_fetchers(config))
+
+    # 验证和清理匹配结果，提高匹配质量
+    print("\n🧹 Validating and cleaning repository matches...")
+    with metrics.span("stage", stage="validate"):
+        scored_papers = validate_and_clean_matches(scored_papers)
+
+    _save_papers(SCORED_PATH, scored_papers, SCORED_FIELDS, ensure_ascii=False)
+    return scored_papers
+
+
+def _score_distributed(config, papers, workers, settings):
+    """
+    协调者：论文写入 SQLite 工作队列，启动 workers 个本地 worker 进程（也可以在其他机器上对同一队列
+    运行 main.py worker），等待全部完成后合并结果。本地 worker 全部退出仍有剩余论文时由协调者自己处理。
+    启用 score_schedule 时按期望价值入队；到达截止时间时取消 job，未完成的论文记录为 deferred。
+    """
+    from processors.score_queue import open_queue, run_worker
+    from processors.score_scheduler import open_scheduler
+    from processors.scoring import finalize_scores
+    from utils.config import load_keywords
+
+    # 分布式打分时耗时与 API 调用数由 worker 随结果写回队列，协调者轮询时更新调度器的估计
+    scheduler = open_scheduler(config, load_keywords(), hints_path=SCORED_PATH)
+    if scheduler:
+        papers = scheduler.order(papers)
+    deferred, stop_reason = [], None
 
-print(f"🔍 Keyword filtering completed: {len(filtered_papers)} papers remain")
+    queue = open_queue(config)
+    shards = settings.get('shards', workers)
+    job_id = queue.enqueue(papers, shards=shards)
+    log_dir = os.path.join(OUTPUT_DIR, "score_workers")
+    os.makedirs(log_dir, exist_ok=True)
+    print(f"🧵 Queued {len(papers)} papers as job {job_id} ({shards} shards) → {queue.path}")
 
-# 步骤 3：计算每篇论文的分数
-print("\n📊 Calculating paper scores...")
-scored_papers = calculate_score(filtered_papers, github_fetcher, pwcode_fetcher)
+    processes = []
+    for i in range(workers):
+        log = open(os.path.join(log_dir, f"{job_id}-worker-{i}.log"), "w", encoding="utf-8")
+        command = [sys.executable, os.path.abspath(__file__), "--config", config_loader.config_path(),
+                   "worker", "--job", job_id, "--shard", str(i % shards)]
+        processes.append((subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT), log))
+    print(f"👷 Started {workers} scoring workers (logs → {log_dir})")
 
-# 步骤 3.5：验证和清理匹配结果，提高匹配质量
-print("\n🧹 Validating and cleaning repository matches...")
-scored_papers = validate_and_clean_matches(scored_papers)
+    poll_seconds = settings.get('poll_seconds', 2)
+    last = None
+    while True:
+        progress = queue.progress(job_id)
+        if progress != last:
+            print(f"  ⏳ {progress['done']}/{progress['total']} done, {progress['leased']} leased, "
+                  f"{progress['pending'] + progress['expired']} waiting, {progress['reclaimed']} re-claimed")
+            last = progress
+        if progress['done'] + progress['cancelled'] == progress['total']:
+            break
+        if scheduler:
+            scheduler.record_progress(progress['done'], progress['seconds'], progress['api_calls'],
+                                      in_flight=progress['leased'] + progress['expired'])
+        stop_reason = scheduler.stop_reason() if scheduler else None
+        if stop_reason:
+            deferred = queue.cancel(job_id)
+            print(f"⏰ Stopping scoring early ({stop_reason}): cancelled {len(deferred)} unfinished papers")
+            for process, _ in processes:
+                if process.poll() is None:
+                    process.terminate()
+            break
+        if all(process.poll() is not None for process, _ in processes):
+            print("⚠️  All scoring workers exited with papers remaining, finishing them in the coordinator")
+            velocity_weight = (config.get('scoring') or {}).get('velocity_weight', 1.0)
+            from processors.scoring import score_paper
+            github_fetcher, pwcode_fetcher = _scoring_fetchers(config)
+            run_worker(queue, job_id, lambda paper: score_paper(paper, github_fetcher, pwcode_fetcher, velocity_weight),
+                       batch_size=settings.get('batch_size', 5), lease_seconds=settings.get('lease_seconds', 300),
+                       poll_seconds=poll_seconds, api_calls=lambda: github_fetcher._api_calls)
+            continue
+        time.sleep(poll_seconds)
+
+    for process, log in processes:
+        process.wait()
+        log.close()
+    failed = sum(1 for process, _ in processes if process.returncode)
+    if failed and not stop_reason:
+        print(f"⚠️  {failed} scoring workers exited with an error, their papers were re-claimed")
+    results = queue.results(job_id)
+    queue.close()
+    if scheduler:
+        scheduler.save_deferred(deferred, stop_reason)
+    return finalize_scores(results)
+
+
+def run_worker(config, job_id=None, shards=None):
+    """
+    分布式打分 worker：从 score_queue 领取论文打分并写回，直到 job 完成
+    job_id 为空时处理队列中最新的 job
+    """
+    from processors.score_queue import new_worker_id, open_queue, run_worker as run_queue_worker
+    from processors.scoring import score_paper
+
+    settings = config.get('score_queue') or {}
+    queue = open_queue(config)
+    job_id = job_id or queue.latest_job()
+    if job_id is None:
+        print(f"⏭️  No scoring job in {queue.path}")
+        return 0
+
+    velocity_weight = (config.get('scoring') or {}).get('velocity_weight', 1.0)
+    github_fetcher, pwcode_fetcher = _scoring_fetchers(config)
+    worker_id = new_worker_id()
+    print(f"👷 Worker {worker_id} on job {job_id} (shards: {shards or 'any'})")
+    completed = run_queue_worker(
+        queue, job_id, lambda paper: score_paper(paper, github_fetcher, pwcode_fetcher, velocity_weight),
+        worker_id=worker_id, batch_size=settings.get('batch_size', 5),
+        lease_seconds=settings.get('lease_seconds', 300), poll_seconds=settings.get('poll_seconds', 2),
+        shards=shards, api_calls=lambda: github_fetcher._api_calls,
+    )
+    queue.close()
+    print(f"✅ Worker {worker_id} scored {completed} papers")
+    return completed
 
-# 保存结果
-with open("output/scored_papers.json", "w", encoding="utf-8") as f:
-    json.dump(scored_papers, f, ensure_ascii=False, indent=2)
 
 # ── 5. 趋势统计 & 报告生成 ─────────────────────────────────
-stats = analyze_trends("output/scored_papers.json")
-report_text = generate_report("output/scored_papers.json", "output")
-print("📄 Trend report generated successfully → output/report.md")
+def run_report(config, notify=False):
+    from processors.report_generator import generate_report, load_deferred
+
+    generate_report(SCORED_PATH, OUTPUT_DIR)
+    print("📄 Trend report generated successfully → output/report.md")
+
+    if notify:
+        send_slack_notification(config, _load_json(SCORED_PATH), load_deferred())
+
 
 # ── 6. Slack 推送（若配置了 webhook） ─────────────────────────
-if SLACK_WEBHOOK and SLACK_WEBHOOK != "your-slack-webhook-here":
+def send_slack_notification(config, scored_papers, deferred=None):
+    slack_webhook = (config.get('slack') or {}).get('webhook_url', "")
+    if not slack_webhook or slack_webhook == "your-slack-webhook-here":
+        print("⏭️  Slack webhook not configured, skipping notification")
+        return
+
+    import requests
+
     try:
         # 准备Slack消息内容
         slack_summary = f"📋 *AI Research Trend Report ({datetime.now().strftime('%Y-%m-%d')})*\n\n"
         slack_summary += f"✨ *Total Papers*: {len(scored_papers)} papers analyzed\n"
-        
+        if deferred:
+            # 打分提前停止：说明这是部分结果，剩余论文在下一次运行中优先处理
+            slack_summary += (f"⏳ *Deferred Papers*: {len(deferred)} papers deferred to the next run "
+                              f"(scoring stopped early: {deferred[0].get('reason') or 'budget'})\n")
+
         # 按星星数排序
         top_papers = sorted(scored_papers, key=lambda x: x.get('stars', 0), reverse=True)
         # 过滤只显示星星数超过500的仓库
         high_star_papers = [p for p in top_papers if p.get('stars', 0) >= 500]
-        
-        if not high_star_papers:
+
+        if not scored_papers and deferred:
+            slack_summary += "\n*No papers were scored before the deadline.*"
+        elif not high_star_papers:
             slack_summary += "\n*No papers with repositories having 500+ stars were found.*"
         else:
             slack_summary += f"\n*Top {len(high_star_papers[:5])} Recommended Papers*:"
-        
+
         for i, paper in enumerate(high_star_papers[:5], 1):
             title = paper['title']
             # 智能截断：优先保留完整单词，最大80字符
@@ -135,34 +330,139 @@ if SLACK_WEBHOOK and SLACK_WEBHOOK != "your-slack-webhook-here":
                         break
                     truncated += word + " "
                 title = truncated.strip() + "..."
-            
+
             authors = paper.get('authors', [])
             first_author = authors[0] if authors else "Unknown"
             author_text = f"{first_author} et al." if len(authors) > 1 else first_author
-            
+
             repo_url = paper.get('repo', '')
             stars = paper.get('stars', 0)
-            
+
             slack_summary += f"\n{i}. *{title}*"
             slack_summary += f"\n   Authors: {author_text} | Venue: {paper.get('venue', 'N/A')}"
             slack_summary += f"\n   *Repository*: {repo_url} ({stars} ⭐)"
-        
+
         slack_summary += f"\n\nFull detailed report: output/report.md"
-        
+
         payload = {
             "text": slack_summary,
             "username": "Research Agent",
             "icon_emoji": ":robot_face:"
         }
-        
-        resp = requests.post(SLACK_WEBHOOK, json=payload)
+
+        resp = requests.post(slack_webhook, json=payload)
         if resp.status_code == 200:
             print("📱 Slack notification sent successfully")
         else:
             print(f"❌ Slack notification failed: {resp.status_code} - {resp.text}")
     except Exception as e:
         print(f"❌ Slack notification error: {str(e)}")
-else:
-    print("⏭️  Slack webhook not configured, skipping notification")
 
-print("🎉 Research Agent execution completed successfully!")
+
+# ── 跨运行趋势查询（读取 history 存储，不运行流水线） ──────────
+def run_history(config, keywords=None, venue=None):
+    from processors.trend_store import open_store
+
+    store = open_store(config)
+    if store is None:
+        print("⏭️  Trend history disabled (history.enabled: false)")
+        return
+    try:
+        runs = store.runs()
+        partial = sum(1 for run in runs if run[3])
+        print(f"🗂️  {store.path}: {len(runs)} recent runs" + (f" ({partial} partial, excluded)" if partial else ""))
+        for row in store.venue_history(venue):
+            print(f"  {row['venue']} {row['year']}: {row['total_papers']} papers, "
+                  f"{row['open_source_rate']:.0%} open source, avg score {row['avg_score']:.2f}")
+        for kw, series in store.keyword_history(keywords, venue).items():
+            points = ", ".join(f"{p['venue']} {p['year']}: {p['count']} ({p['share']:.1%})" for p in series)
+            print(f"  📈 {kw}: {points}")
+    finally:
+        store.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="AI Research Agent")
+    parser.add_argument("--config", default=config_loader.DEFAULT_CONFIG_PATH, help="Path to config.yaml")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("fetch", help="Fetch papers → output/raw_papers.json")
+    subparsers.add_parser("filter", help="Keyword filtering and summarization → output/filtered_papers.json")
+    score_parser = subparsers.add_parser("score", help="Repository matching and scoring → output/scored_papers.json")
+    score_parser.add_argument("--workers", type=int, help="Score through the work queue with N local worker processes")
+    worker_parser = subparsers.add_parser("worker", help="Claim and score papers from the scoring work queue")
+    worker_parser.add_argument("--job", help="Job id (default: latest job in the queue)")
+    worker_parser.add_argument("--shard", type=int, action="append", help="Shard to claim first (repeatable)")
+    report_parser = subparsers.add_parser("report", help="Generate output/report.md from scored papers")
+    report_parser.add_argument("--notify", action="store_true", help="Also send the Slack notification")
+    history_parser = subparsers.add_parser("history", help="Show keyword and venue trends across runs")
+    history_parser.add_argument("--keyword", action="append", help="Keyword to show (repeatable, default: all)")
+    history_parser.add_argument("--venue", help="Only show this venue")
+    all_parser = subparsers.add_parser("all", help="Run the full pipeline (default)")
+    all_parser.add_argument("--no-notify", action="store_true", help="Skip the Slack notification")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    command = args.command or "all"
+    stages = STAGES if command == "all" else [] if command == "history" else ["score"] if command == "worker" else [command]
+
+    # ── 1. 读取并校验配置（只解析一次） ─────────────────────────
+    config_loader.set_config_path(args.config)
+    try:
+        config = config_loader.validate_config(config_loader.load_config(), stages)
+    except (OSError, config_loader.ConfigError) as e:
+        print(f"❌ Configuration error: {e}")
+        return 2
+
+    # 指标与日志格式（metrics.log_format: json 时 print 输出转为结构化日志）
+    run_metrics.configure(config)
+
+    # HTTP 录制 / 回放（cassette.mode: record / replay）
+    if (config.get('cassette') or {}).get('mode') not in (None, False, 'off'):
+        if command == "worker":
+            # 与协调者共用 cassette 文件会截断录制内容（录制）或重复完整回放（回放）
+            print("❌ Configuration error: queue workers do not support cassette record/replay")
+            return 2
+        from utils import cassette
+        cassette.configure(config)
+
+    if command == "history":
+        run_history(config, args.keyword, args.venue)
+        return 0
+
+    if command == "worker":
+        run_worker(config, args.job, args.shard)
+        return 0
+
+    for stage in stages:
+        with metrics.span("stage", stage=stage):
+            if stage == "fetch":
+                run_fetch(config)
+            elif stage == "filter":
+                run_filter(config)
+            elif stage == "score":
+                run_score(config, workers=getattr(args, 'workers', None))
+            elif stage == "report":
+                notify = args.notify if command == "report" else not args.no_notify
+                run_report(config, notify=notify)
+
+    # LLM provider 链（llm_fallbacks）中每个 provider 的延迟与成功率
+    from processors.llm_client import provider_stats
+    for provider, stats in (provider_stats() or {}).items():
+        p95 = f"{stats['p95_seconds']:.2f}s" if stats['p95_seconds'] is not None else "n/a"
+        rate = f"{stats['success_rate']:.0%}" if stats['success_rate'] is not None else "n/a"
+        print(f"🔀 LLM provider {provider}: {stats['requests']} requests, {rate} success, p95 {p95}"
+              + ("" if stats['healthy'] else " (unhealthy)"))
+
+    # ── 7. 运行指标报告 ─────────────────────────────────────
+    metrics_json, metrics_prom = metrics.write_report(OUTPUT_DIR)
+    print(f"📈 Run metrics saved → {metrics_json}, {metrics_prom}")
+
+    if command == "all":
+        print("🎉 Research Agent execution completed successfully!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,59 +1,101 @@
 import re
-import yaml
-from .llm_client import LLMClient
+from .llm_client import get_llm_client
+from .prompt_compaction import compact, max_tokens_for_words
+from utils.config import load_config, load_keywords
+from utils.metrics import metrics
+from utils.paper import Paper
 
-# 关键词列表，读取 configs/keywords.txt
-with open("configs/keywords.txt", "r") as f:
-    KEYWORDS = [line.strip().lower() for line in f if line.strip()]
+# 关键词正则（读取 configs/keywords.txt，首次使用时编译）
+_keyword_patterns = None
 
-# 初始化LLM客户端
-llm_client = LLMClient()
+def _get_keyword_patterns():
+    global _keyword_patterns
+    if _keyword_patterns is None:
+        _keyword_patterns = [re.compile(rf"\b{kw}\b") for kw in load_keywords()]
+    return _keyword_patterns
 
 def keyword_filter(title, abstract):
     """
     简单关键词过滤：title+abstract 中包含任意一个关键词即通过。
     """
     text = (title + " " + abstract).lower()
-    for kw in KEYWORDS:
-        if re.search(rf"\b{kw}\b", text):
+    for pattern in _get_keyword_patterns():
+        if pattern.search(text):
             return True
     return False
 
 def summarize_abstract(abstract):
     """
     调用LLM将长摘要精简成 2-3 句。
+    发送前去掉 LaTeX / URL / 模板句并按 provider（链中最小）的输入预算截断，max_tokens 由目标摘要长度决定。
     """
     if not abstract:
         return ""
 
+    client = get_llm_client()
+    budget_config = load_config().get('prompt_budget') or {}
+    compacted = compact(abstract, client.providers, budget_config)
+    if not compacted:
+        return ""
+
     messages = [
         {"role": "system", "content": "You are a research assistant. Summarize the paper abstract into 2-3 sentences, keeping only the task, method, and contributions."},
-        {"role": "user", "content": abstract}
+        {"role": "user", "content": compacted}
     ]
     try:
-        return llm_client.generate_response(messages, temperature=0.3, max_tokens=200)
+        return client.generate_response(messages, temperature=0.3,
+                                        max_tokens=max_tokens_for_words(budget_config.get('summary_words', 60)))
     except Exception as e:
         print(f"LLM summarization error: {e}")
-        return abstract[:200] + "..."
+        return compacted[:200] + "..."
+
+def _summarize(paper):
+    """原地生成摘要，之后不再需要的 abstract 随即释放"""
+    paper.summary = summarize_abstract(paper.abstract or "")
+    paper.release_abstract()
+    return paper
+
+def _rank_filter(papers, filter_config):
+    """
+    filter.mode: rank —— 按加权关键词 profile 的相关度排序，保留 top_n / 高于 min_score 的论文
+    """
+    from .relevance_filter import rank_papers
+
+    ranked = rank_papers(
+        papers,
+        load_keywords(),
+        weights=filter_config.get('keyword_weights'),
+        top_n=filter_config.get('top_n'),
+        min_score=filter_config.get('min_score', 0.0),
+    )
+    metrics.inc("papers_filtered", len(ranked), result="kept")
+    metrics.inc("papers_filtered", len(papers) - len(ranked), result="dropped")
+    print(f"📐 Relevance ranking kept {len(ranked)}/{len(papers)} papers")
+
+    results = []
+    for paper, relevance in ranked:
+        paper = _summarize(paper)
+        paper.relevance = relevance
+        results.append(paper)
+    return results
 
 def process_papers(papers):
     """
     对拉取回来的 papers 列表做筛选与摘要简化：
-    输入 papers: 列表，每项为 {'title', 'authors', 'abstract', 'pdf_url', 'venue', 'decision'}
-    返回 filtered: 列表，每项为 {'title', 'authors', 'summary', 'pdf_url', 'venue'}
+    输入 papers: 列表，每项为 Paper（或 {'title', 'authors', 'abstract', 'pdf_url', 'venue', 'decision'} dict）
+    返回 filtered: 通过筛选的 Paper 列表，原地写入 summary 并释放 abstract
+    筛选方式由 config.yaml 的 filter.mode 决定：keyword（默认，任意关键词命中）或 rank（相关度排序）
     """
+    papers = [Paper.coerce(p) for p in papers]
+    filter_config = load_config().get('filter') or {}
+    if filter_config.get('mode', 'keyword') == 'rank':
+        return _rank_filter(papers, filter_config)
+
     results = []
     for paper in papers:
-        title = paper.get('title', "")
-        abstract = paper.get('abstract', "")
-        if keyword_filter(title, abstract):
-            summary = summarize_abstract(abstract)
-            results.append({
-                'title': title,
-                'authors': paper.get('authors', []),
-                'summary': summary,
-                'pdf_url': paper.get('pdf_url', ""),
-                'venue': paper.get('venue', ""),
-                'decision': paper.get('decision', None)
-            })
+        if keyword_filter(paper.title or "", paper.abstract or ""):
+            metrics.inc("papers_filtered", result="kept")
+            results.append(_summarize(paper))
+        else:
+            metrics.inc("papers_filtered", result="dropped")
     return results
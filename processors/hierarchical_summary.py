@@ -0,0 +1,175 @@
+"""
+分层（map-reduce）趋势总结：让 LLM 看到论文内容本身，而不只是关键词计数。
+
+- map：按 venue 或 topic 分组，把论文（标题 + 摘要）按 token 预算切成 chunk，并发调用 LLM 总结每个 chunk
+- reduce：把 map 结果按 token 预算分批合并，逐层归约，直到只剩一份；最后一轮结合统计数据写出趋势分析
+
+配置（config.yaml）:
+llm_summary:
+  mode: "hierarchical"   # aggregate（默认，只发送统计数据）/ hierarchical
+  group_by: "venue"      # venue / topic
+  chunk_tokens: 3000     # 每个 map 请求的论文内容预算
+  reduce_tokens: 6000    # 每个 reduce 请求的输入预算
+  max_workers: 4         # map / reduce 并发数
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from processors.llm_client import estimate_tokens, get_llm_client
+from processors.prompt_compaction import clean_text
+from utils.metrics import metrics
+
+MAP_PROMPT = """You are an AI research analyst. Below is a batch of papers from {group}.
+Summarize the main research directions in this batch in 3-5 concise bullet points.
+Name concrete methods, tasks and recurring ideas, and mention paper titles only as examples."""
+
+REDUCE_PROMPT = """You are an AI research analyst. Below are partial trend summaries, each covering a batch of papers.
+Merge them into one set of 5-8 concise bullet points, combining overlapping directions
+and keeping the most concrete details (methods, tasks, example papers)."""
+
+FINAL_PROMPT = """
+You are an AI research trend analyst. You are given statistics from top AI conferences and
+summaries of the research directions found in the papers themselves. Write a 200-300 word research trend summary covering:
+
+- Current hottest research directions, grounded in the paper summaries
+- Most popular keywords and their significance
+- Overall open source adoption rate and recognition patterns
+- Notable emerging trends or breakthrough areas
+- Recommendations for researchers and practitioners
+
+Use clear, professional language suitable for academic reports and research lab meetings.
+"""
+
+# 单篇论文摘要的最大长度（字符），避免个别超长摘要占满一个 chunk
+MAX_SUMMARY_CHARS = 600
+
+
+def _paper_line(paper):
+    summary = clean_text(paper.get('summary') or paper.get('abstract') or "")
+    if len(summary) > MAX_SUMMARY_CHARS:
+        summary = summary[:MAX_SUMMARY_CHARS] + "..."
+    stars = f", {paper['stars']} stars" if paper.get('stars') else ""
+    line = f"- {paper.get('title', '')} ({paper.get('venue') or 'N/A'}{stars})"
+    return f"{line}: {summary}" if summary else line
+
+
+def group_papers(papers, group_by="venue", topics=None):
+    """
+    分组：venue 按会议；topic 按 analyze_topics 的聚类结果（没有聚类结果时退回 venue）
+    返回 [(group_name, [paper, ...])]
+    """
+    groups = {}
+    if group_by == "topic" and topics and len(topics.get('labels', [])) == len(papers):
+        names = {t['id']: f"the topic '{', '.join(t['top_terms'][:3])}'" for t in topics['topics']}
+        for paper, label in zip(papers, topics['labels']):
+            groups.setdefault(names.get(label, f"topic {label}"), []).append(paper)
+    else:
+        for paper in papers:
+            groups.setdefault(paper.get('venue') or "unknown venue", []).append(paper)
+    return list(groups.items())
+
+
+def chunk_lines(lines, budget):
+    """按 token 预算把行切成若干块；单行超出预算时独占一块"""
+    chunks = []
+    current = []
+    used = 0
+    for line in lines:
+        tokens = estimate_tokens(line)
+        if current and used + tokens > budget:
+            chunks.append(current)
+            current = []
+            used = 0
+        current.append(line)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _run_parallel(requests, max_workers):
+    """
+    并发执行 [(label, messages, max_tokens)]，返回成功结果列表（保持顺序）
+    单个请求失败只跳过该块；全部失败时抛出最后一个异常
+    """
+    client = get_llm_client()
+
+    def call(request):
+        label, messages, max_tokens = request
+        try:
+            return client.generate_response(messages, temperature=0.3, max_tokens=max_tokens), None
+        except Exception as e:
+            print(f"⚠️  LLM call for {label} failed: {e}")
+            return None, e
+
+    # 每个请求带上当前上下文的副本，工作线程中的 span 仍归属当前阶段
+    contexts = [contextvars.copy_context() for _ in requests]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = list(pool.map(lambda ctx, request: ctx.run(call, request), contexts, requests))
+
+    outputs = [text for text, _ in results if text]
+    if not outputs and results:
+        raise results[-1][1] or RuntimeError("LLM returned empty responses")
+    return outputs
+
+
+def map_phase(groups, chunk_tokens, max_workers):
+    requests = []
+    for name, papers in groups:
+        chunks = chunk_lines([_paper_line(p) for p in papers], chunk_tokens)
+        for i, chunk in enumerate(chunks, 1):
+            label = name if len(chunks) == 1 else f"{name} (part {i}/{len(chunks)})"
+            messages = [
+                {"role": "system", "content": MAP_PROMPT.format(group=label)},
+                {"role": "user", "content": "\n".join(chunk)},
+            ]
+            requests.append((label, messages, 250))
+    print(f"🗺️  Map phase: {len(requests)} chunks from {sum(len(p) for _, p in groups)} papers")
+    metrics.inc("llm_summary_calls", len(requests), phase="map")
+    with metrics.span("llm_summary", phase="map"):
+        return _run_parallel(requests, max_workers)
+
+
+def reduce_phase(summaries, reduce_tokens, max_workers):
+    """逐层合并，直到所有部分总结放得进一次请求"""
+    level = 0
+    while sum(estimate_tokens(s) for s in summaries) > reduce_tokens and len(summaries) > 1:
+        level += 1
+        batches = chunk_lines(summaries, reduce_tokens)
+        if len(batches) == len(summaries):
+            # 每份总结都已超出预算，再合并也无法缩小，直接交给最后一轮
+            break
+        requests = [(f"reduce level {level} batch {i}",
+                     [{"role": "system", "content": REDUCE_PROMPT},
+                      {"role": "user", "content": "\n\n".join(batch)}], 400)
+                    for i, batch in enumerate(batches, 1)]
+        print(f"🔁 Reduce level {level}: {len(summaries)} summaries → {len(requests)}")
+        metrics.inc("llm_summary_calls", len(requests), phase="reduce")
+        with metrics.span("llm_summary", phase="reduce"):
+            summaries = _run_parallel(requests, max_workers)
+    return summaries
+
+
+def hierarchical_summary(stat_text, papers, settings, topics=None, stream=False):
+    """
+    stat_text: generate_llm_summary 生成的统计数据文本
+    settings: config.yaml 的 llm_summary 段
+    stream: 为 True 时 map / reduce 完成后，最后一轮以流式返回（文本片段的生成器）
+    返回最终的趋势分析文本
+    """
+    max_workers = settings.get('max_workers', 4)
+    groups = group_papers(papers, settings.get('group_by', "venue"), topics)
+    summaries = map_phase(groups, settings.get('chunk_tokens', 3000), max_workers)
+    summaries = reduce_phase(summaries, settings.get('reduce_tokens', 6000), max_workers)
+
+    user_prompt = (f"Here are the weekly statistics:\n\n{stat_text}\n\n"
+                   f"Research directions summarized from the papers:\n\n" + "\n\n".join(summaries) +
+                   "\n\nPlease analyze these trends and provide insights.")
+    messages = [
+        {"role": "system", "content": FINAL_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+    metrics.inc("llm_summary_calls", phase="final")
+    if stream:
+        return get_llm_client().stream_response(messages, temperature=0.3, max_tokens=500)
+    return get_llm_client().generate_response(messages, temperature=0.3, max_tokens=500)
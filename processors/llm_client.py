@@ -1,36 +1,150 @@
-import yaml
-import requests
-from openai import OpenAI
+import time
+
+from utils import cassette, http_client
+from utils.config import load_config
+from utils.metrics import metrics
+
+_default_client = None
+
+# HuggingFace 单一 prompt 中各角色的前缀
+ROLE_PREFIXES = {"system": "System", "user": "Human", "assistant": "Assistant"}
+
+# 粗略的 token 估算：英文文本平均约 4 个字符一个 token（不依赖具体模型的 tokenizer）
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """估算文本的 token 数"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def get_llm_client():
+    """
+    返回共享的 LLM 客户端，首次使用时才创建（避免导入模块时就读取配置）
+    配置了 llm_fallbacks 时返回 ProviderChain（接口相同），否则返回单个 provider 的 LLMClient
+    """
+    global _default_client
+    if _default_client is None:
+        config = load_config()
+        fallbacks = [p for p in config.get('llm_fallbacks') or [] if p != config.get('llm_provider', 'huggingface')]
+        if fallbacks:
+            from processors.provider_chain import ProviderChain
+
+            clients = [LLMClient(config)] + [LLMClient(config, provider=p) for p in fallbacks]
+            _default_client = ProviderChain(clients, config.get('llm_hedging'))
+        else:
+            _default_client = LLMClient(config)
+    return _default_client
+
+
+def provider_stats():
+    """provider 链中每个 provider 的统计；未使用链（或尚未创建客户端）时返回 None"""
+    snapshot = getattr(_default_client, 'snapshot', None)
+    return snapshot() if snapshot else None
+
 
 class LLMClient:
     """统一的LLM客户端，支持多个免费API提供商"""
     
-    def __init__(self):
-        with open("configs/config.yaml", "r") as f:
-            self.config = yaml.safe_load(f)
-        self.provider = self.config.get('llm_provider', 'huggingface')
+    def __init__(self, config=None, provider=None):
+        self.config = config if config is not None else load_config()
+        self.provider = provider or self.config.get('llm_provider', 'huggingface')
+        self.providers = [self.provider]
+        # OpenAI SDK 客户端按 provider 复用（连接池），避免每次请求重新建立连接
+        self._clients = {}
         
     def generate_response(self, messages, temperature=0.3, max_tokens=500):
         """
         统一的响应生成接口
         messages: [{"role": "system/user", "content": "..."}]
         """
+        with metrics.span("llm", provider=self.provider):
+            start = time.perf_counter()
+            try:
+                response = self._dispatch(messages, temperature, max_tokens)
+            except Exception as e:
+                metrics.inc("llm_requests", provider=self.provider, status="error", error=type(e).__name__)
+                raise
+            finally:
+                metrics.observe("llm_request_seconds", time.perf_counter() - start, provider=self.provider)
+            metrics.inc("llm_requests", provider=self.provider, status="ok")
+            return response
+    
+    def stream_response(self, messages, temperature=0.3, max_tokens=500):
+        """
+        流式生成接口：按到达顺序逐段 yield 文本
+        OpenAI 兼容 provider 使用 stream=True；HuggingFace 与录制 / 回放模式下一次性 yield 完整响应
+        span 不设置 contextvar，生成器提前关闭或在其他线程中被回收时也能正常结束计时
+        """
+        target = self._openai_compatible_target()
+        if target is None or cassette.active():
+            yield self.generate_response(messages, temperature, max_tokens)
+            return
+        
+        span = metrics.start_span("llm", provider=self.provider, stream=True)
+        start = time.perf_counter()
+        error = None
+        try:
+            first = True
+            for text in self._stream_openai_compatible(*target, messages, temperature, max_tokens):
+                if first:
+                    metrics.observe("llm_first_token_seconds", time.perf_counter() - start, provider=self.provider)
+                    first = False
+                yield text
+        except Exception as e:
+            error = type(e).__name__
+            metrics.inc("llm_requests", provider=self.provider, status="error", error=error)
+            raise
+        finally:
+            metrics.observe("llm_request_seconds", time.perf_counter() - start, provider=self.provider)
+            metrics.finish_span(span, error)
+        metrics.inc("llm_requests", provider=self.provider, status="ok")
+    
+    def _dispatch(self, messages, temperature, max_tokens):
+        """按 provider 分发请求"""
+        tape = cassette.active()
+        if tape and self.provider != "huggingface":
+            # OpenAI SDK 的请求不经过 http_client，在调用层录制 / 回放
+            request = {'provider': self.provider, 'messages': messages,
+                       'temperature': temperature, 'max_tokens': max_tokens}
+            return tape.call("llm", request, lambda: self._call_provider(messages, temperature, max_tokens))
+        return self._call_provider(messages, temperature, max_tokens)
+    
+    def _call_provider(self, messages, temperature, max_tokens):
         if self.provider == "huggingface":
             return self._call_huggingface(messages, temperature, max_tokens)
-        elif self.provider == "groq":
-            return self._call_groq(messages, temperature, max_tokens)
+        target = self._openai_compatible_target()
+        if target is None:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+        return self._call_openai_compatible(*target, messages, temperature, max_tokens)
+    
+    def _openai_compatible_target(self):
+        """
+        OpenAI 兼容 provider 的 (section, 默认 base_url, model, OpenAI 客户端参数)
+        huggingface 与未知 provider 返回 None
+        """
+        if self.provider == "groq":
+            return 'groq', "https://api.groq.com/openai/v1", self.config['groq']['model'], {}
         elif self.provider == "together":
-            return self._call_together(messages, temperature, max_tokens)
+            return 'together', "https://api.together.xyz", self.config['together']['model'], {}
         elif self.provider == "openai":
-            return self._call_openai(messages, temperature, max_tokens)
-        else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
+            # base_url 为空时使用官方地址；使用更便宜的模型
+            return 'openai', None, "gpt-4o-mini", {}
+        elif self.provider == "mock":
+            # 本地 OpenAI 兼容 stub（benchmarks/stub_server.py），用于压测与离线调试；
+            # 默认不重试，压测时能看到真实的错误率与 429 比例
+            settings = self.config.get('mock') or {}
+            return 'mock', "http://127.0.0.1:8765/v1", settings.get('model', "mock"), \
+                {'max_retries': settings.get('max_retries', 0)}
+        return None
     
     def _call_huggingface(self, messages, temperature, max_tokens):
         """调用Hugging Face Inference API"""
         api_key = self.config['huggingface']['api_key']
         model = self.config['huggingface']['model']
         
+        base_url = self.config['huggingface'].get('base_url', "https://api-inference.huggingface.co").rstrip("/")
+        
         # 将messages转换为单个prompt
         prompt = self._messages_to_prompt(messages)
         
@@ -44,8 +158,9 @@ class LLMClient:
             }
         }
         
-        response = requests.post(
-            f"https://api-inference.huggingface.co/models/{model}",
+        response = http_client.post(
+            f"{base_url}/models/{model}",
+            "llm_huggingface",
             headers=headers,
             json=data
         )
@@ -53,75 +168,88 @@ class LLMClient:
         if response.status_code == 200:
             result = response.json()
             if isinstance(result, list) and len(result) > 0:
-                return result[0].get('generated_text', '').strip()
-            return result.get('generated_text', '').strip()
+                text = result[0].get('generated_text', '').strip()
+            else:
+                text = result.get('generated_text', '').strip()
+            # HuggingFace 不返回用量，按字符数估算
+            metrics.inc("llm_tokens", estimate_tokens(prompt), provider=self.provider, direction="in")
+            metrics.inc("llm_tokens", estimate_tokens(text), provider=self.provider, direction="out")
+            return text
         else:
             raise Exception(f"Hugging Face API error: {response.status_code} {response.text}")
     
-    def _call_groq(self, messages, temperature, max_tokens):
-        """调用Groq API"""
-        api_key = self.config['groq']['api_key']
-        model = self.config['groq']['model']
-        
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.groq.com/openai/v1"
-        )
-        
-        response = client.chat.completions.create(
+    def _openai_client(self, section, default_base_url, client_kwargs):
+        """按 section 复用 OpenAI SDK 客户端"""
+        client = self._clients.get(section)
+        if client is None:
+            settings = self.config.get(section) or {}
+            
+            from openai import OpenAI
+            
+            client = self._clients[section] = OpenAI(
+                api_key=settings.get('api_key') or "not-needed",
+                base_url=settings.get('base_url', default_base_url),
+                **client_kwargs
+            )
+        return client
+    
+    def _call_openai_compatible(self, section, default_base_url, model, client_kwargs, messages, temperature, max_tokens):
+        """OpenAI 兼容接口的公共调用逻辑（groq / together / openai / mock），并记录 token 用量"""
+        response = self._openai_client(section, default_base_url, client_kwargs).chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens
         )
         
+        if response.usage:
+            metrics.inc("llm_tokens", response.usage.prompt_tokens or 0, provider=self.provider, direction="in")
+            metrics.inc("llm_tokens", response.usage.completion_tokens or 0, provider=self.provider, direction="out")
         return response.choices[0].message.content.strip()
     
-    def _call_together(self, messages, temperature, max_tokens):
-        """调用Together AI API"""
-        api_key = self.config['together']['api_key']
-        model = self.config['together']['model']
-        
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.together.xyz"
-        )
-        
-        response = client.chat.completions.create(
+    def _stream_openai_compatible(self, section, default_base_url, model, client_kwargs, messages, temperature, max_tokens):
+        """
+        stream=True 的调用，逐段 yield delta 文本
+        并非所有 provider 都在流中返回 usage，没有时按字符数估算 token 用量
+        """
+        stream = self._openai_client(section, default_base_url, client_kwargs).chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            stream=True
         )
         
-        return response.choices[0].message.content.strip()
-    
-    def _call_openai(self, messages, temperature, max_tokens):
-        """调用OpenAI API"""
-        api_key = self.config['openai']['api_key']
-        
-        client = OpenAI(api_key=api_key)
+        usage = None
+        parts = []
+        started = False
+        for chunk in stream:
+            if getattr(chunk, 'usage', None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if not text:
+                continue
+            if not started:
+                # 与非流式接口一致，去掉开头的空白
+                text = text.lstrip()
+                if not text:
+                    continue
+                started = True
+            parts.append(text)
+            yield text
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # 使用更便宜的模型
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        
-        return response.choices[0].message.content.strip()
+        if usage:
+            metrics.inc("llm_tokens", usage.prompt_tokens or 0, provider=self.provider, direction="in")
+            metrics.inc("llm_tokens", usage.completion_tokens or 0, provider=self.provider, direction="out")
+        else:
+            prompt = "".join(msg['content'] for msg in messages)
+            metrics.inc("llm_tokens", estimate_tokens(prompt), provider=self.provider, direction="in")
+            metrics.inc("llm_tokens", estimate_tokens("".join(parts)), provider=self.provider, direction="out")
     
     def _messages_to_prompt(self, messages):
         """将OpenAI格式的messages转换为单个prompt（适用于HuggingFace）"""
-        prompt = ""
-        for msg in messages:
-            role = msg["role"]
-            content = msg["content"]
-            if role == "system":
-                prompt += f"System: {content}\n"
-            elif role == "user":
-                prompt += f"Human: {content}\n"
-            elif role == "assistant":
-                prompt += f"Assistant: {content}\n"
-        prompt += "Assistant: "
-        return prompt 
\ No newline at end of file
+        parts = [f"{ROLE_PREFIXES[msg['role']]}: {msg['content']}\n" for msg in messages if msg["role"] in ROLE_PREFIXES]
+        parts.append("Assistant: ")
+        return "".join(parts)
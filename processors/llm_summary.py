@@ -1,13 +1,19 @@
-from processors.llm_client import LLMClient
+from processors.llm_client import get_llm_client
+from utils.config import load_config
 
-# 初始化LLM客户端
-llm_client = LLMClient()
-
-def generate_llm_summary(statistics: dict) -> str:
+def generate_llm_summary(statistics: dict, papers=None) -> str:
     """
     Input: statistics dictionary containing total_papers, open_source_count, avg_score, keyword_counts, etc.
+           papers: scored papers, used when llm_summary.mode is "hierarchical"
     Output: LLM-generated 200-300 word research trend summary in English
     """
+    return "".join(stream_llm_summary(statistics, papers))
+
+def stream_llm_summary(statistics: dict, papers=None):
+    """
+    Same as generate_llm_summary, but yields the summary text piece by piece as the LLM streams it.
+    Falls back to the statistical summary if the call fails before any text arrives.
+    """
     # Build statistical summary text
     stat_lines = [
         f"- Total Papers: {statistics['total_papers']}",
@@ -22,6 +28,26 @@ def generate_llm_summary(statistics: dict) -> str:
         if cnt > 0:  # Only include keywords with papers
             stat_lines.append(f"- {kw.title()}: {cnt} papers ({cnt / statistics['total_papers']:.1%})")
 
+    topics = statistics.get('topics')
+    if topics and topics['topics']:
+        stat_lines.append("\n## Topic Clusters (TF-IDF + k-means over titles and summaries):")
+        for topic in topics['topics']:
+            stat_lines.append(f"- {', '.join(topic['top_terms'][:5])}: {topic['size']} papers, "
+                              f"{topic['open_source_rate']:.0%} open source, "
+                              f"{topic['novelty']:.0%} not covered by tracked keywords")
+        if topics['emerging']:
+            stat_lines.append("\n## Emerging Topics (mostly outside tracked keywords):")
+            for topic in topics['emerging']:
+                stat_lines.append(f"- {', '.join(topic['top_terms'][:3])} ({topic['size']} papers)")
+
+    history = statistics.get('history')
+    if history and len(history['venues']) > 1:
+        stat_lines.append("\n## Historical Trends (share of papers per venue and year):")
+        for kw, series in history['keywords'].items():
+            if len(series) > 1:
+                stat_lines.append(f"- {kw.title()}: " + ", ".join(
+                    f"{point['venue']} {point['year']} {point['share']:.1%}" for point in series))
+
     stat_text = "\n".join(stat_lines)
 
     system_prompt = """
@@ -39,16 +65,29 @@ Use clear, professional language suitable for academic reports and research lab
 
     user_prompt = f"Here are the weekly statistics:\n\n{stat_text}\n\nPlease analyze these trends and provide insights."
 
+    streamed = False
     try:
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        summary = llm_client.generate_response(messages, temperature=0.3, max_tokens=400)
-        return summary
+        settings = load_config().get('llm_summary') or {}
+        if papers and settings.get('mode', 'aggregate') == 'hierarchical':
+            # Map-reduce over the paper summaries so the analysis sees actual paper content
+            from processors.hierarchical_summary import hierarchical_summary
+            chunks = hierarchical_summary(stat_text, papers, settings, topics=statistics.get('topics'), stream=True)
+        else:
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            chunks = get_llm_client().stream_response(messages, temperature=0.3, max_tokens=400)
+
+        for chunk in chunks:
+            streamed = True
+            yield chunk
         
     except Exception as e:
+        if streamed:
+            # Part of the analysis has already been written out; keep it and note the interruption
+            yield f"\n\n*Note: LLM analysis was interrupted: {str(e)}*\n"
+            return
         # Fallback: provide basic statistical summary
         fallback_summary = f"""
 **Research Activity Summary**
@@ -63,4 +102,4 @@ This report analyzed {statistics['total_papers']} papers from major AI conferenc
 
 *Note: LLM analysis unavailable due to: {str(e)}*
 """
-        return fallback_summary
+        yield fallback_summary
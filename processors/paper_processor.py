@@ -2,6 +2,79 @@ import re
 import json
 from difflib import SequenceMatcher
 
+from utils import parallel
+
+# 已知的错误匹配：标题关键词 -> 不应匹配的仓库
+KNOWN_BAD_MATCHES = {
+    "Frame Interpolation": ["google-research/frame-interpolation", "frame-interpolation"],
+    "Robust 3D Shape": ["RobustVideoMatting", "robustmatting"],
+    "Paint by Example": ["stable-diffusion", "controlnet"]
+}
+
+# 预编译的标题关键词匹配器，用于快速排除不包含任何已知关键词的论文
+_KNOWN_BAD_PATTERN = re.compile("|".join(re.escape(k) for k in KNOWN_BAD_MATCHES))
+
+
+class _TitleTokens:
+    """
+    标题分词结果，每个标题只计算一次
+    """
+    __slots__ = ('model_name', 'words', 'word_set')
+
+    def __init__(self, title):
+        # 模型名（通常是冒号前的部分，否则为第一个词）
+        self.model_name = title.split(':')[0].strip() if ':' in title else (title.split() or [""])[0]
+        self.words = re.findall(r'\b[a-z0-9]{3,}\b', title.lower())
+        self.word_set = set(self.words)
+
+
+def _tokens_for(title, cache):
+    tokens = cache.get(title)
+    if tokens is None:
+        tokens = _TitleTokens(title)
+        cache[title] = tokens
+    return tokens
+
+
+def _best_matches(groups):
+    """
+    为每个重复匹配的仓库选出最可能正确的论文
+    groups: [(repo_url, [title, ...])]，返回 [(best_title, best_score)]
+    模块级纯函数，可在进程池中执行
+    """
+    token_cache = {}
+    results = []
+    for repo_url, paper_titles in groups:
+        # 提取仓库名
+        repo_name = repo_url.split('/')[-1].lower() if repo_url else ""
+        
+        # 计算每个论文标题与仓库名的相似度
+        best_match = None
+        best_score = 0
+        # 仓库名作为 seq2，SequenceMatcher 会缓存其分析结果，所有标题共用
+        matcher = SequenceMatcher(None, "", repo_name)
+        
+        for title in paper_titles:
+            tokens = _tokens_for(title, token_cache)
+            
+            # 计算相似度 (使用最长公共子序列)
+            matcher.set_seq1(tokens.model_name.lower())
+            similarity = matcher.ratio()
+            
+            # 检查是否有精确的关键词匹配
+            word_match = any(word in repo_name for word in tokens.words)
+            
+            # 词匹配比一般相似度更重要
+            if word_match:
+                similarity += 0.3
+                
+            if similarity > best_score:
+                best_score = similarity
+                best_match = title
+        results.append((best_match, best_score))
+    return results
+
+
 def validate_and_clean_matches(scored_papers):
     """
     对匹配结果进行验证和清理，确保高质量的匹配
@@ -10,15 +83,13 @@ def validate_and_clean_matches(scored_papers):
     """
     print("🧹 Validating and cleaning repository matches...")
     
-    # 0. 检查特定的错误匹配
-    known_bad_matches = {
-        "Frame Interpolation": ["google-research/frame-interpolation", "frame-interpolation"],
-        "Robust 3D Shape": ["RobustVideoMatting", "robustmatting"],
-        "Paint by Example": ["stable-diffusion", "controlnet"]
-    }
+    token_cache = {}
     
+    # 0. 检查特定的错误匹配
     for paper in scored_papers:
-        for keyword, bad_repos in known_bad_matches.items():
+        if not paper.get('repo') or not _KNOWN_BAD_PATTERN.search(paper['title']):
+            continue
+        for keyword, bad_repos in KNOWN_BAD_MATCHES.items():
             if keyword in paper['title'] and paper.get('repo'):
                 repo_name = paper['repo'].split('/')[-1].lower()
                 full_repo_path = paper['repo'].replace("https://github.com/", "").lower()
@@ -27,60 +98,48 @@ def validate_and_clean_matches(scored_papers):
                     print(f"⚠️ Removing known bad match: {paper['title']} -> {paper['repo']}")
                     paper['repo'] = None
                     paper['stars'] = 0
+                    paper['star_velocity'] = None
     
     # 1. 识别误匹配的模式
     # 例如论文A -> 仓库A，论文B -> 仓库A (同一个仓库匹配到多个论文)
+    # 建立 repo -> 标题列表 以及 标题 -> (位置, 论文) 的索引，避免对每个重复仓库重新扫描全部论文
     repo_to_papers = {}
-    for paper in scored_papers:
+    title_to_papers = {}
+    for idx, paper in enumerate(scored_papers):
+        title_to_papers.setdefault(paper['title'], []).append((idx, paper))
         repo_url = paper.get('repo')
         if repo_url:
-            if repo_url not in repo_to_papers:
-                repo_to_papers[repo_url] = []
-            repo_to_papers[repo_url].append(paper['title'])
+            repo_to_papers.setdefault(repo_url, []).append(paper['title'])
     
     # 检查重复匹配的仓库
     duplicate_repos = {repo: papers for repo, papers in repo_to_papers.items() if len(papers) > 1}
     
     # 2. 对于每个重复匹配的仓库，保留最可能正确的匹配
-    for repo_url, paper_titles in duplicate_repos.items():
+    #    相似度计算（SequenceMatcher）与打印、清理分开：重复仓库很多时可分块在进程池中计算
+    groups = list(duplicate_repos.items())
+    chunks = parallel.chunked(groups, parallel.chunk_size())
+    best_matches = [match for chunk in parallel.map_chunks(_best_matches, chunks, "match_similarity",
+                                                           use_pool=parallel.enabled(len(groups)))
+                    for match in chunk]
+    
+    for (repo_url, paper_titles), (best_match, best_score) in zip(groups, best_matches):
         print(f"⚠️ Repository {repo_url} matched to multiple papers:")
         for title in paper_titles:
             print(f"  - {title}")
         
-        # 提取仓库名
-        repo_name = repo_url.split('/')[-1].lower() if repo_url else ""
-        
-        # 计算每个论文标题与仓库名的相似度
-        best_match = None
-        best_score = 0
-        
-        for title in paper_titles:
-            # 提取标题中的模型名（通常是冒号前的部分）
-            model_name = title.split(':')[0].strip().lower() if ':' in title else title.split()[0].lower()
-            
-            # 计算相似度 (使用最长公共子序列)
-            similarity = SequenceMatcher(None, model_name, repo_name).ratio()
-            
-            # 检查是否有精确的关键词匹配
-            title_words = re.findall(r'\b[a-z0-9]{3,}\b', title.lower())
-            word_match = any(word in repo_name for word in title_words)
-            
-            # 词匹配比一般相似度更重要
-            if word_match:
-                similarity += 0.3
-                
-            if similarity > best_score:
-                best_score = similarity
-                best_match = title
-        
         print(f"  ✅ Best match: {best_match} (score: {best_score:.2f})")
         
         # 清除其他论文的该仓库匹配
-        for paper in scored_papers:
-            if paper['title'] in paper_titles and paper['title'] != best_match:
-                print(f"  ❌ Removing match from: {paper['title']}")
-                paper['repo'] = None
-                paper['stars'] = 0
+        to_clear = []
+        for title in set(paper_titles):
+            if title != best_match:
+                to_clear.extend(title_to_papers[title])
+        to_clear.sort(key=lambda item: item[0])
+        for _, paper in to_clear:
+            print(f"  ❌ Removing match from: {paper['title']}")
+            paper['repo'] = None
+            paper['stars'] = 0
+            paper['star_velocity'] = None
     
     # 3. 检查可疑的匹配 (如基于单一通用词汇的匹配)
     suspicious_keywords = ['tool', 'utility', 'framework', 'awesome', 'list', 'collection', 'tutorial']
@@ -88,7 +147,7 @@ def validate_and_clean_matches(scored_papers):
         repo_url = paper.get('repo')
         if repo_url:
             repo_name = repo_url.split('/')[-1].lower()
-            title_words = re.findall(r'\b[a-z0-9]{3,}\b', paper['title'].lower())
+            title_words = _tokens_for(paper['title'], token_cache).words
             
             # 检查仓库名是否只匹配了标题中的通用词
             matches = [word for word in title_words if word in repo_name]
@@ -108,6 +167,7 @@ def validate_and_clean_matches(scored_papers):
                     print(f"⚠️ Suspicious match - generic high-star repo: {paper['title']} -> {repo_url}")
                     paper['repo'] = None
                     paper['stars'] = 0
+                    paper['star_velocity'] = None
             
             # 2. 如果仓库名称很长，但与论文标题没有显著重叠
             elif len(repo_name) > 15:
@@ -116,6 +176,7 @@ def validate_and_clean_matches(scored_papers):
                     print(f"⚠️ Suspicious match - low overlap ratio: {paper['title']} -> {repo_url}")
                     paper['repo'] = None
                     paper['stars'] = 0
+                    paper['star_velocity'] = None
     
     # 4. 检查模型名称与仓库名称的匹配
     for paper in scored_papers:
@@ -127,12 +188,8 @@ def validate_and_clean_matches(scored_papers):
         repo_name = repo_url.split('/')[-1].lower() if repo_url else ""
         
         # 提取模型名称 (通常是冒号前的部分或标题的第一个词)
-        model_name = ""
-        if ':' in title:
-            model_name = title.split(':')[0].strip()
-        else:
-            # 假设第一个词可能是模型名
-            model_name = title.split()[0]
+        tokens = _tokens_for(title, token_cache)
+        model_name = tokens.model_name
         
         # 检查模型名是否在仓库名中
         model_in_repo = False
@@ -146,7 +203,7 @@ def validate_and_clean_matches(scored_papers):
         # 如果模型名不在仓库名中，但这是一个高星仓库，则可疑
         if not model_in_repo and paper.get('stars', 0) > 3000:
             # 再次验证是否有其他强匹配特征
-            title_words = set(re.findall(r'\b[a-z0-9]{3,}\b', title.lower()))
+            title_words = tokens.word_set
             repo_words = set(re.findall(r'\b[a-z0-9]{3,}\b', repo_name))
             
             # 计算两者的词汇重叠
@@ -160,6 +217,7 @@ def validate_and_clean_matches(scored_papers):
                 print(f"⚠️ Suspicious match - model name not in repo: {title} -> {repo_url}")
                 paper['repo'] = None
                 paper['stars'] = 0
+                paper['star_velocity'] = None
     
     print(f"✅ Validation complete. {sum(1 for p in scored_papers if p.get('repo'))} valid matches remain.")
     return scored_papers 
\ No newline at end of file
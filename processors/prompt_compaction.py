@@ -0,0 +1,129 @@
+"""
+发送给 LLM 之前的文本压缩：去掉摘要中的 LaTeX、URL 和模板化句子，并按 provider 的输入预算截断。
+
+token 数用 llm_client.estimate_tokens 的本地估算（不依赖具体模型的 tokenizer）。
+
+配置（config.yaml）:
+prompt_budget:
+  summary_words: 60          # 目标摘要长度（词），据此设置 max_tokens
+  input_tokens:              # 每个 provider 的摘要输入预算（token）
+    huggingface: 512
+    default: 1024
+"""
+import math
+import re
+
+from processors.llm_client import estimate_tokens
+from utils.metrics import metrics
+
+# 每个 provider 的默认输入预算（token）；HuggingFace 免费推理接口的上下文较短
+DEFAULT_INPUT_TOKENS = {
+    'huggingface': 512,
+    'default': 1024,
+}
+
+# 英文文本平均每个词约 1.35 个 token
+TOKENS_PER_WORD = 1.35
+
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+|\b(?:github|gitlab)\.com/\S+", re.IGNORECASE)
+# 只保留参数内容的排版命令，如 \textbf{x} → x
+LATEX_KEEP_ARG = re.compile(
+    r"\\(?:textbf|textit|textrm|texttt|text|emph|underline|mathrm|mathbf|mathbb|mathcal|mathit|boldsymbol|operatorname)"
+    r"\{([^{}]*)\}"
+)
+# 连同参数一起删除的命令，如 \cite{...}
+LATEX_DROP = re.compile(r"\\(?:cite[tp]?|ref|eqref|label|footnote|url|href)\{[^{}]*\}(?:\{[^{}]*\})?")
+# 其余命令保留名称（\log → log, \alpha → alpha），转义字符保留字符本身（\% → %）
+LATEX_COMMAND = re.compile(r"\\([a-zA-Z]+)\*?")
+LATEX_ESCAPE = re.compile(r"\\([%&#_$])")
+# 上下标符号只在数学环境（$...$）内或紧跟 {} 时删除，普通文本中的 snake_case 保持不变
+MATH_SPAN = re.compile(r"(?<!\\)\$([^$]*)\$")
+MATH_SCRIPT = re.compile(r"(?<!\\)[\^_]")
+LATEX_SCRIPT_BRACE = re.compile(r"(?<!\\)[\^_](?=\{)")
+LATEX_SYMBOLS = re.compile(r"(?<!\\)[${}~]")
+# URL 先替换成不含句点的占位符，避免句子切分出错
+URL_PLACEHOLDER = "URLREF"
+# 与研究内容无关的模板化句子（先切分句子再逐句匹配）：
+# 代码 / 模型的发布说明（"... is available at / on / from ..." 或以发布动词结尾），项目主页，版权声明
+BOILERPLATE_SENTENCES = re.compile(
+    r"\b(?:code|codes|models?|weights|checkpoints|implementation|data(?:sets?)?|demo)\b.*?"
+    r"\b(?:is|are|will be|has been|have been|can be)\s+(?:made\s+)?(?:publicly\s+|freely\s+)?"
+    r"(?:available|released|open[- ]sourced|found|accessed|downloaded)\b"
+    r"(?:\s+(?:at|on|from|via|through|here|upon)\b|\s*(?:URLREF\s*)?[.!]?\s*$)"
+    r"|\b(?:project page|project website|homepage)\b.*URLREF"
+    r"|^\W*(?:code|project page|website|demo)\s*:\s*URLREF"
+    r"|©|\(c\)\s*\d{4}|\bcopyright\s+(?:\d{4}|by)\b|\ball rights reserved\b",
+    re.IGNORECASE,
+)
+WHITESPACE = re.compile(r"\s+")
+SPACE_BEFORE_PUNCT = re.compile(r"\s+([.,;:)])")
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def clean_text(text):
+    """去掉 URL、LaTeX 标记和模板化句子，合并空白"""
+    if not text:
+        return ""
+    # URL 先换成占位符，按句子删掉模板句（其中常带有 URL），最后去掉剩余的占位符
+    text = URL_PATTERN.sub(URL_PLACEHOLDER, text)
+    text = " ".join(sentence for sentence in SENTENCE_SPLIT.split(text)
+                    if not BOILERPLATE_SENTENCES.search(sentence))
+    text = text.replace(URL_PLACEHOLDER, "")
+    text = LATEX_DROP.sub("", text)
+    # 嵌套的排版命令需要多轮替换
+    previous = None
+    while previous != text:
+        previous = text
+        text = LATEX_KEEP_ARG.sub(r"\1", text)
+    text = MATH_SPAN.sub(lambda m: MATH_SCRIPT.sub("", m.group(1)), text)
+    text = LATEX_SCRIPT_BRACE.sub("", text)
+    text = LATEX_SYMBOLS.sub("", text)
+    text = LATEX_ESCAPE.sub(r"\1", text)
+    text = LATEX_COMMAND.sub(r"\1", text)
+    text = WHITESPACE.sub(" ", text)
+    return SPACE_BEFORE_PUNCT.sub(r"\1", text).strip()
+
+
+def trim_to_budget(text, max_tokens):
+    """按句子截断到 max_tokens 以内；第一句就超出预算时按字符截断"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    kept = []
+    used = 0
+    for sentence in SENTENCE_SPLIT.split(text):
+        tokens = estimate_tokens(sentence)
+        if used + tokens > max_tokens:
+            break
+        kept.append(sentence)
+        used += tokens
+    if kept:
+        return " ".join(kept)
+    return text[:max_tokens * 4].rsplit(" ", 1)[0]
+
+
+def input_budget(providers, budget_config=None):
+    """providers: provider 名称或列表；请求可能发往链上任一 provider，取其中最小的预算"""
+    if isinstance(providers, str):
+        providers = [providers]
+    budgets = {**DEFAULT_INPUT_TOKENS, **((budget_config or {}).get('input_tokens') or {})}
+    return min(budgets.get(provider, budgets['default']) for provider in providers)
+
+
+def max_tokens_for_words(words):
+    """根据目标输出长度（词）计算 max_tokens，留 20% 余量避免句子被截断"""
+    return int(math.ceil(words * TOKENS_PER_WORD * 1.2))
+
+
+def compact(text, provider, budget_config=None, purpose="summary"):
+    """
+    清理并截断文本，记录压缩前后的 token 数与节省量
+    provider: provider 名称或列表（provider 链）
+    返回压缩后的文本
+    """
+    before = estimate_tokens(text) if text else 0
+    compacted = trim_to_budget(clean_text(text), input_budget(provider, budget_config))
+    after = estimate_tokens(compacted) if compacted else 0
+    metrics.inc("prompt_tokens_raw", before, purpose=purpose)
+    metrics.inc("prompt_tokens_sent", after, purpose=purpose)
+    metrics.inc("prompt_tokens_saved", before - after, purpose=purpose)
+    return compacted
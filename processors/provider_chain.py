@@ -0,0 +1,222 @@
+"""
+多个 LLM provider 组成的有序链：对冲请求（hedging）+ 基于健康状态的故障转移。
+
+- 对冲：主 provider 在其滚动 p95 延迟内没有返回时，把同一请求再发给链上的下一个 provider，取先返回的结果
+- 故障转移：请求失败立即改发下一个 provider；连续失败 failure_threshold 次的 provider 在 cooldown_seconds 内
+  排到链尾（所有 provider 都不健康时仍按原顺序尝试）
+- 统计：每个 provider 的滚动延迟、成功 / 失败次数，以及对冲、故障转移、胜出次数（写入 run metrics）
+
+流式请求不做对冲（无法撤回已经输出的文本），只在第一段文本到达之前做故障转移。
+
+配置（config.yaml）:
+llm_provider: "groq"
+llm_fallbacks: ["together", "huggingface"]
+llm_hedging:
+  enabled: true
+  default_hedge_ms: 3000     # 样本不足 min_samples 时使用的对冲延迟
+  min_samples: 20
+  window: 200                # 滚动延迟窗口（最近 N 次成功请求）
+  failure_threshold: 3
+  cooldown_seconds: 60
+  max_workers: 16
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils import cassette
+from utils.metrics import metrics
+
+
+class ProviderStats:
+    """单个 provider 的滚动延迟与健康状态（线程安全）"""
+
+    def __init__(self, name, window=200):
+        self.name = name
+        self.latencies = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, seconds):
+        with self._lock:
+            self.latencies.append(seconds)
+            self.successes += 1
+            recovered = self.unhealthy_until > 0
+            self.consecutive_failures = 0
+            self.unhealthy_until = 0.0
+        if recovered:
+            print(f"✅ LLM provider {self.name} recovered")
+
+    def record_failure(self, failure_threshold, cooldown_seconds):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            tripped = self.consecutive_failures == failure_threshold
+            if self.consecutive_failures >= failure_threshold:
+                self.unhealthy_until = time.monotonic() + cooldown_seconds
+        if tripped:
+            print(f"⚠️  LLM provider {self.name} failed {failure_threshold} times in a row, "
+                  f"deprioritized for {cooldown_seconds}s")
+            metrics.inc("llm_provider_unhealthy", provider=self.name)
+
+    def healthy(self):
+        return time.monotonic() >= self.unhealthy_until
+
+    def percentile(self, q):
+        with self._lock:
+            values = sorted(self.latencies)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def snapshot(self):
+        total = self.successes + self.failures
+        return {
+            'requests': total,
+            'successes': self.successes,
+            'failures': self.failures,
+            'success_rate': round(self.successes / total, 4) if total else None,
+            'p50_seconds': self.percentile(0.5),
+            'p95_seconds': self.percentile(0.95),
+            'healthy': self.healthy(),
+        }
+
+
+class ProviderChain:
+    """与 LLMClient 相同的接口（generate_response / stream_response），按链路分发到多个 LLMClient"""
+
+    def __init__(self, clients, settings=None):
+        settings = settings or {}
+        self.clients = clients
+        self.providers = [client.provider for client in clients]
+        # 主 provider，供按 provider 取值的调用方使用（如 prompt 预算）
+        self.provider = self.providers[0]
+        self.hedging = settings.get('enabled', True)
+        self.default_hedge = settings.get('default_hedge_ms', 3000) / 1000.0
+        self.min_samples = settings.get('min_samples', 20)
+        self.failure_threshold = settings.get('failure_threshold', 3)
+        self.cooldown_seconds = settings.get('cooldown_seconds', 60)
+        self.stats = {name: ProviderStats(name, settings.get('window', 200)) for name in self.providers}
+        self._max_workers = settings.get('max_workers', 16)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="llm-hedge")
+            return self._pool
+
+    def _ordered(self):
+        """健康的 provider 按配置顺序在前，不健康的排到链尾"""
+        healthy = [c for c in self.clients if self.stats[c.provider].healthy()]
+        return healthy + [c for c in self.clients if c not in healthy]
+
+    def hedge_delay(self, provider):
+        """对冲延迟：滚动 p95，样本不足时用 default_hedge_ms"""
+        stats = self.stats[provider]
+        if len(stats.latencies) < self.min_samples:
+            return self.default_hedge
+        return stats.percentile(0.95)
+
+    def _attempt(self, client, messages, temperature, max_tokens):
+        start = time.perf_counter()
+        try:
+            response = client.generate_response(messages, temperature, max_tokens)
+        except Exception:
+            self.stats[client.provider].record_failure(self.failure_threshold, self.cooldown_seconds)
+            raise
+        self.stats[client.provider].record_success(time.perf_counter() - start)
+        return response
+
+    def generate_response(self, messages, temperature=0.3, max_tokens=500):
+        ordered = self._ordered()
+        # 录制 / 回放时不对冲，保证请求序列确定
+        if not self.hedging or len(ordered) == 1 or cassette.active():
+            return self._generate_failover(ordered, messages, temperature, max_tokens)
+        return self._generate_hedged(ordered, messages, temperature, max_tokens)
+
+    def _generate_failover(self, ordered, messages, temperature, max_tokens):
+        last_error = None
+        for i, client in enumerate(ordered):
+            if i:
+                metrics.inc("llm_failovers", provider=ordered[i - 1].provider, to=client.provider)
+            try:
+                response = self._attempt(client, messages, temperature, max_tokens)
+            except Exception as e:
+                last_error = e
+                continue
+            metrics.inc("llm_chain_wins", provider=client.provider)
+            return response
+        raise last_error
+
+    def _generate_hedged(self, ordered, messages, temperature, max_tokens):
+        pool = self._executor()
+        pending = {}
+        remaining = list(ordered)
+        last_error = None
+
+        def launch():
+            client = remaining.pop(0)
+            # 带上当前上下文，工作线程中的 span 仍归属当前阶段
+            ctx = contextvars.copy_context()
+            future = pool.submit(ctx.run, self._attempt, client, messages, temperature, max_tokens)
+            pending[future] = client
+
+        launch()
+        while pending:
+            newest = list(pending.values())[-1]
+            timeout = self.hedge_delay(newest.provider) if remaining else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # 最近发出的请求超过其 p95 仍未返回：对冲到下一个 provider，先返回的结果胜出
+                metrics.inc("llm_hedges", provider=newest.provider, to=remaining[0].provider)
+                launch()
+                continue
+            for future in done:
+                client = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    if remaining:
+                        metrics.inc("llm_failovers", provider=client.provider, to=remaining[0].provider)
+                        launch()
+                    continue
+                metrics.inc("llm_chain_wins", provider=client.provider)
+                # 其余仍在进行的请求不再等待，它们完成后照常计入 provider 统计
+                return response
+        raise last_error
+
+    def stream_response(self, messages, temperature=0.3, max_tokens=500):
+        """流式请求：第一段文本到达之前失败则转移到下一个 provider，之后的错误直接抛出"""
+        ordered = self._ordered()
+        last_error = None
+        for i, client in enumerate(ordered):
+            if i:
+                metrics.inc("llm_failovers", provider=ordered[i - 1].provider, to=client.provider)
+            start = time.perf_counter()
+            started = False
+            try:
+                for text in client.stream_response(messages, temperature, max_tokens):
+                    started = True
+                    yield text
+            except Exception as e:
+                self.stats[client.provider].record_failure(self.failure_threshold, self.cooldown_seconds)
+                if started:
+                    raise
+                last_error = e
+                continue
+            self.stats[client.provider].record_success(time.perf_counter() - start)
+            metrics.inc("llm_chain_wins", provider=client.provider)
+            return
+        raise last_error
+
+    def snapshot(self):
+        """每个 provider 的请求数、成功率与滚动 p50 / p95"""
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
@@ -0,0 +1,104 @@
+"""
+按相关度排序的论文筛选（filter.mode: rank），作为"任意关键词命中即保留"的替代方案。
+
+- 标题 + 摘要用哈希向量化（unigram + bigram，次线性 TF，行 L2 归一化），无需预先建立词表
+- 每个关键词构造一个同空间的 profile 向量，可在配置中指定权重
+- 一次稀疏矩阵乘法得到所有论文对所有关键词的余弦相似度，加权求和即相关度
+- 保留相关度不低于 min_score 的论文，再按 top_n 截断
+
+只提到一次 "attention" 的长摘要相关度很低，不会再进入 LLM 摘要与 GitHub 搜索这些昂贵的阶段。
+"""
+import zlib
+from functools import lru_cache
+
+from processors.topic_clustering import ENGLISH_STOPWORDS, tokenize
+
+N_FEATURES = 2 ** 18
+# 标题中的词计两次：标题比摘要更能说明论文方向
+TITLE_WEIGHT = 2
+
+
+@lru_cache(maxsize=65536)
+def _normalize(token):
+    """简单的复数归一（transformers → transformer），论文与关键词两侧一致处理"""
+    if len(token) > 4 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def hash_vectorize(documents, n_features=N_FEATURES):
+    """
+    documents: 已分词的文档列表
+    返回行 L2 归一化的 CSR 矩阵 (len(documents), n_features)
+    """
+    import numpy as np
+    from scipy import sparse
+
+    # zlib.crc32 在不同进程间稳定（内置 hash() 对字符串加盐）；同一个词只哈希一次
+    columns = {}
+    indptr = [0]
+    indices = []
+    counts = []
+    for tokens in documents:
+        row = {}
+        for token in tokens:
+            column = columns.get(token)
+            if column is None:
+                column = columns[token] = zlib.crc32(token.encode("utf-8")) % n_features
+            row[column] = row.get(column, 0) + 1
+        indices.extend(row.keys())
+        counts.extend(row.values())
+        indptr.append(len(indices))
+
+    X = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(documents), n_features),
+    )
+    X.data = 1.0 + np.log(X.data)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (sparse.diags((1.0 / norms).astype(np.float32)) @ X).tocsr()
+
+
+def _tokens(text):
+    tokens = [_normalize(t) for t in tokenize(text, bigrams=False, stopwords=ENGLISH_STOPWORDS)]
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _paper_tokens(paper):
+    return _tokens(paper.get('title') or "") * TITLE_WEIGHT + _tokens(paper.get('abstract') or "")
+
+
+def relevance_scores(papers, keywords, weights=None, n_features=N_FEATURES):
+    """
+    计算每篇论文对加权关键词 profile 的相关度
+    keywords: 关键词列表；weights: {keyword: weight}，未指定的关键词权重为 1.0
+    返回与 papers 等长的 numpy 数组
+    """
+    import numpy as np
+
+    if not papers or not keywords:
+        return np.zeros(len(papers))
+
+    weights = weights or {}
+    X = hash_vectorize([_paper_tokens(p) for p in papers], n_features)
+    profiles = hash_vectorize([_tokens(kw) for kw in keywords], n_features)
+    w = np.asarray([float(weights.get(kw, 1.0)) for kw in keywords], dtype=np.float32)
+
+    similarity = X @ profiles.T
+    return np.asarray(similarity @ w).ravel()
+
+
+def rank_papers(papers, keywords, weights=None, top_n=None, min_score=0.0):
+    """
+    按相关度筛选论文
+    返回 [(paper, score)]，按相关度从高到低排序
+    """
+    import numpy as np
+
+    scores = relevance_scores(papers, keywords, weights)
+    order = np.argsort(-scores, kind="stable")
+    selected = [(papers[i], round(float(scores[i]), 4)) for i in order if scores[i] >= min_score and scores[i] > 0]
+    if top_n:
+        selected = selected[:top_n]
+    return selected
@@ -0,0 +1,192 @@
+"""
+多份报告的扇出：一次遍历 scored papers 得到分组聚合，再按需渲染任意数量的报告变体。
+
+聚合的最小单元是 cell = (venue, 命中的关键词集合)：
+- 每篇论文只落入一个 cell，cell 内记录论文数、开源数、分数和，以及按 stars 的 top-k 堆
+- 任何"若干 venue × 命中任一关键词"的报告都是若干 cell 的并集，合并 cell 的代价与论文数无关
+
+因此按 venue、按关键词、按团队（venue + 关键词组合）的报告只需要模板渲染的时间。
+
+配置（config.yaml）:
+reports:
+  per_venue: true
+  per_keyword: false
+  top_k: 10
+  teams:
+    - name: "vision"
+      venues: ["CVPR"]
+      keywords: ["diffusion", "computer vision"]
+"""
+import heapq
+import os
+import re
+from datetime import datetime
+
+
+class Cell:
+    __slots__ = ('total', 'open_source', 'score_sum', 'score_count', 'top')
+
+    def __init__(self):
+        self.total = 0
+        self.open_source = 0
+        self.score_sum = 0.0
+        self.score_count = 0
+        # 小顶堆 [(stars, -index)]，保留有仓库的论文中 stars 最多的 top_k 篇
+        self.top = []
+
+
+class Aggregate:
+    """
+    scored papers 的分组聚合结果
+    cells: {(venue, frozenset(keywords)): Cell}
+    """
+
+    def __init__(self, papers, keywords, top_k=10):
+        self.papers = papers
+        self.keywords = list(keywords)
+        self.top_k = top_k
+        self.cells = {}
+        self._build()
+
+    def _build(self):
+        # 与 analyze_trends 一致：标题中按正则、忽略大小写匹配
+        patterns = [(kw, re.compile(kw, re.IGNORECASE)) for kw in self.keywords]
+        for index, paper in enumerate(self.papers):
+            title = paper.get('title') or ""
+            matched = frozenset(kw for kw, pattern in patterns if pattern.search(title))
+            key = (paper.get('venue') or "unknown", matched)
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = Cell()
+            cell.total += 1
+            if paper.get('score') is not None:
+                cell.score_sum += paper['score']
+                cell.score_count += 1
+            if paper.get('repo') is None:
+                continue
+            cell.open_source += 1
+            entry = (paper.get('stars') or 0, -index)
+            if len(cell.top) < self.top_k:
+                heapq.heappush(cell.top, entry)
+            elif entry > cell.top[0]:
+                heapq.heapreplace(cell.top, entry)
+
+    @property
+    def venues(self):
+        return sorted({venue for venue, _ in self.cells})
+
+    def select(self, venues=None, keywords=None):
+        """
+        合并满足条件的 cell：venue 在 venues 中，且命中 keywords 中任一关键词（None 表示不限）
+        返回 dict 形式的统计结果
+        """
+        venues = set(venues) if venues else None
+        keywords = {kw.lower() for kw in keywords} if keywords else None
+
+        total = open_source = score_count = 0
+        score_sum = 0.0
+        keyword_counts = dict.fromkeys(self.keywords, 0)
+        venue_counts = {}
+        tops = []
+        for (venue, matched), cell in self.cells.items():
+            if venues is not None and venue not in venues:
+                continue
+            if keywords is not None and not (matched & keywords):
+                continue
+            total += cell.total
+            open_source += cell.open_source
+            score_sum += cell.score_sum
+            score_count += cell.score_count
+            venue_counts[venue] = venue_counts.get(venue, 0) + cell.total
+            for kw in matched:
+                keyword_counts[kw] += cell.total
+            tops.append(cell.top)
+
+        top = heapq.nlargest(self.top_k, (entry for heap in tops for entry in heap))
+        return {
+            'total_papers': total,
+            'open_source_count': open_source,
+            'avg_score': round(score_sum / score_count, 2) if score_count else 0,
+            'keyword_counts': keyword_counts,
+            'venue_counts': venue_counts,
+            'top_papers': [self.papers[-neg_index] for _, neg_index in top],
+        }
+
+
+def build_aggregate(papers, keywords, reports_config):
+    """按 reports 配置构建聚合：团队报告里出现、但不在 keywords.txt 中的关键词也一并统计"""
+    keywords = list(keywords)
+    for team in reports_config.get('teams') or []:
+        for kw in team.get('keywords') or []:
+            if kw.lower() not in keywords:
+                keywords.append(kw.lower())
+    return Aggregate(papers, keywords, top_k=reports_config.get('top_k', 10))
+
+
+def build_variants(aggregate, reports_config):
+    """根据 reports 配置生成报告变体列表 [(name, title, venues, keywords)]"""
+    variants = []
+    if reports_config.get('per_venue', True):
+        for venue in aggregate.venues:
+            variants.append((f"venue-{venue}", f"{venue}", [venue], None))
+    if reports_config.get('per_keyword', False):
+        for kw in aggregate.keywords:
+            variants.append((f"keyword-{kw}", f"'{kw.title()}'", None, [kw]))
+    for team in reports_config.get('teams') or []:
+        variants.append((f"team-{team['name']}", f"Team {team['name']}", team.get('venues'), team.get('keywords')))
+    return variants
+
+
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def render_variant(title, stats):
+    """渲染单份报告（只做模板渲染，不调用 LLM）"""
+    lines = [f"# AI Research Trend Report: {title} ({datetime.now().strftime('%Y-%m-%d')})\n"]
+    total = stats['total_papers']
+    lines.append("## Executive Summary\n")
+    lines.append(f"- **Total Papers**: {total}")
+    if total:
+        lines.append(f"- **Open Source Papers**: {stats['open_source_count']} ({stats['open_source_count'] / total:.2%})")
+        lines.append(f"- **Average Recognition Score**: {stats['avg_score']:.2f}")
+    if len(stats['venue_counts']) > 1:
+        lines.append("- **Venues**: " + ", ".join(f"{v} ({n})" for v, n in sorted(stats['venue_counts'].items())))
+    lines.append("")
+
+    lines.append("## Research Topics Distribution\n")
+    for kw, cnt in sorted(stats['keyword_counts'].items(), key=lambda x: x[1], reverse=True):
+        if cnt > 0:
+            lines.append(f"- **{kw.title()}**: {cnt} papers ({cnt / total:.1%})")
+    lines.append("")
+
+    lines.append("## 📚 Top Papers by Stars\n")
+    if not stats['top_papers']:
+        lines.append("*No papers with repositories were found.*\n")
+    for i, paper in enumerate(stats['top_papers'], 1):
+        lines.append(f"{i}. **{paper.get('title', 'N/A')}** ({paper.get('venue', 'N/A')}) — "
+                     f"[GitHub]({paper['repo']}) ({paper.get('stars', 0):,} ⭐)")
+    lines.append("")
+
+    lines.append("---")
+    lines.append(f"*Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} by AI Research Agent*")
+    return "\n".join(lines)
+
+
+def render_reports(aggregate, reports_config, output_dir):
+    """渲染所有配置的报告变体到 output_dir/reports/，返回写出的文件路径列表"""
+    variants = build_variants(aggregate, reports_config)
+    if not variants:
+        return []
+    reports_dir = os.path.join(output_dir, "reports")
+    os.makedirs(reports_dir, exist_ok=True)
+    paths = []
+    for name, title, venues, keywords in variants:
+        stats = aggregate.select(venues, keywords)
+        if not stats['total_papers']:
+            continue
+        path = os.path.join(reports_dir, f"{_slug(name)}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_variant(title, stats))
+        paths.append(path)
+    return paths
@@ -1,8 +1,13 @@
 from datetime import datetime
+import hashlib
 import os
 import json
 from processors.trend_analyzer import analyze_trends
-from processors.llm_summary import generate_llm_summary
+from processors.llm_summary import stream_llm_summary
+from processors.report_engine import build_aggregate, render_reports
+from processors.trend_store import open_store
+from utils import strategy_stats
+from utils.config import load_config, load_keywords
 
 def generate_report(scored_json_path, output_dir):
     """
@@ -15,12 +20,20 @@ def generate_report(scored_json_path, output_dir):
     Returns Markdown text content.
     """
     stats = analyze_trends(scored_json_path)
+    deferred = load_deferred()
     if not stats:
-        return ""
+        # The scoring deadline can hit before the first paper finishes: still report what was deferred
+        return _write_deferred_only_report(deferred, output_dir) if deferred else ""
 
     # Load papers data for detailed recommendations
-    with open(scored_json_path, "r", encoding="utf-8") as f:
-        papers_data = json.load(f)
+    with open(scored_json_path, "rb") as f:
+        raw = f.read()
+    papers_data = json.loads(raw)
+
+    # Record this scoring run in the cross-run trend history (once per scored file, so regenerating
+    # the report does not add a run; partial runs are flagged and left out of the series) and read it back
+    stats['history'] = _record_history(papers_data, run_key="scored:" + hashlib.sha1(raw).hexdigest(),
+                                       partial=bool(deferred))
 
     # 1. Generate statistical text section
     report_lines = []
@@ -30,6 +43,8 @@ def generate_report(scored_json_path, output_dir):
     report_lines.append("## Executive Summary\n")
     report_lines.append(f"- **Total Papers**: {stats['total_papers']}")
     report_lines.append(f"- **Open Source Papers**: {stats['open_source_count']} ({stats['open_source_count']/stats['total_papers']:.2%})")
+    if deferred:
+        report_lines.append(f"- **Deferred Papers**: {len(deferred)} (scoring stopped early: {deferred[0].get('reason') or 'budget'})")
     report_lines.append("\n")
 
     # Keyword Distribution
@@ -42,6 +57,46 @@ def generate_report(scored_json_path, output_dir):
                 report_lines.append(f"- **{kw.title()}**: {cnt} papers ({cnt/stats['total_papers']:.1%})")
     report_lines.append("")
 
+    # Topic clusters (TF-IDF + k-means over titles and summaries)
+    topics = stats.get('topics')
+    if topics and topics['topics']:
+        report_lines.append("## 🧭 Topic Clusters\n")
+        report_lines.append("| Topic | Papers | Top Terms | Open Source | Avg ⭐ | Keyword Coverage |")
+        report_lines.append("|---|---|---|---|---|---|")
+        for topic in topics['topics']:
+            report_lines.append(
+                f"| {topic['id']} | {topic['size']} ({topic['share']:.1%}) | {', '.join(topic['top_terms'][:5])} "
+                f"| {topic['open_source_rate']:.0%} | {topic['avg_stars']:,.0f} | {1 - topic['novelty']:.0%} |"
+            )
+        report_lines.append("")
+        if topics['emerging']:
+            report_lines.append("### 🌱 Emerging Topics\n")
+            report_lines.append("Clusters that are mostly not covered by `configs/keywords.txt`:\n")
+            for topic in topics['emerging']:
+                report_lines.append(f"- **{', '.join(topic['top_terms'][:3])}**: {topic['size']} papers, "
+                                    f"{topic['novelty']:.0%} outside tracked keywords "
+                                    f"(e.g. *{topic['sample_titles'][0]}*)")
+            report_lines.append("")
+
+    # Historical trends (latest run per venue and year from the trend store)
+    history = stats.get('history')
+    if history and len(history['venues']) > 1:
+        report_lines.append("## 📈 Historical Trends\n")
+        report_lines.append("| Venue | Year | Papers | Open Source | Avg Score | Score p90 |")
+        report_lines.append("|---|---|---|---|---|---|")
+        for row in history['venues']:
+            report_lines.append(f"| {row['venue']} | {row['year']} | {row['total_papers']} | {row['open_source_rate']:.0%} "
+                                f"| {row['avg_score']:.2f} | {row['score_p90']:.2f} |")
+        report_lines.append("")
+        columns = [(row['venue'], row['year']) for row in history['venues']]
+        report_lines.append("| Keyword | " + " | ".join(f"{v} {y}" for v, y in columns) + " |")
+        report_lines.append("|---|" + "---|" * len(columns))
+        for kw, series in history['keywords'].items():
+            shares = {(point['venue'], point['year']): point['share'] for point in series}
+            report_lines.append(f"| {kw.title()} | " + " | ".join(
+                f"{shares[column]:.1%}" if column in shares else "-" for column in columns) + " |")
+        report_lines.append("")
+
     # 2. Paper Recommendations Section
     if papers_data:
         report_lines.append("## 📚 Recommended Papers\n")
@@ -78,6 +133,8 @@ def generate_report(scored_json_path, output_dir):
                 repo_info = f"🔗 [GitHub]({repo})"
                 if stars and stars > 0:
                     repo_info += f" ({stars:,} ⭐)"
+                if paper.get('star_velocity'):
+                    repo_info += f", +{paper['star_velocity']:,.1f} ⭐/day"
                 report_lines.append(f"**Repository**: {repo_info}")
             
             if pdf_url and pdf_url != "#":
@@ -93,15 +150,44 @@ def generate_report(scored_json_path, output_dir):
         
         report_lines.append("")
 
+    # Fastest-growing repositories (star velocity from the local star snapshot store)
+    rising = sorted((p for p in papers_data if p.get('repo') and p.get('star_velocity')),
+                    key=lambda p: p['star_velocity'], reverse=True)
+    if rising:
+        report_lines.append("## 🚀 Rising Repositories\n")
+        report_lines.append("| Paper | Repository | Stars | ⭐/day | Age (days) |")
+        report_lines.append("|---|---|---|---|---|")
+        for paper in rising[:10]:
+            report_lines.append(f"| {paper.get('title', 'N/A')} | [{paper['repo'].replace('https://github.com/', '')}]({paper['repo']}) "
+                                f"| {paper.get('stars', 0):,} | {paper['star_velocity']:,.1f} | {paper.get('days_since_created', 0)} |")
+        report_lines.append("")
+
+    # Repository search strategy yield, accumulated across runs (drives the adaptive strategy order)
+    strategy_rows = _strategy_summary()
+    if strategy_rows:
+        report_lines.append("## 🔎 Repository Search Strategies\n")
+        report_lines.append("| Strategy | Attempts | Accepted Matches | API Calls | Matches / 100 Calls |")
+        report_lines.append("|---|---|---|---|---|")
+        for row in strategy_rows:
+            report_lines.append(f"| {row['strategy']} | {row['attempts']:,} | {row['accepted']:,} "
+                                f"| {row['api_calls']:,} | {row['matches_per_call'] * 100:.1f} |")
+        report_lines.append("")
+
+    # Papers left unscored when the scoring deadline / budget was reached (prioritized in the next run)
+    if deferred:
+        report_lines.extend(_deferred_section(deferred))
+
     # 3. Insert visualization chart (if keyword_trend.png exists)
     fig_path = os.path.join(output_dir, "keyword_trend.png")
     if os.path.exists(fig_path):
         report_lines.append("## Keyword Trend Visualization")
         report_lines.append("![Keyword Distribution](keyword_trend.png)\n")
 
-    # 4. Generate LLM analysis
-    llm_text = generate_llm_summary(stats)
+    # 4. Generate LLM analysis: everything above is written to report.md first and the
+    #    analysis is streamed into the file as it arrives; the complete report is rewritten below
+    report_path = os.path.join(output_dir, "report.md")
     report_lines.append("## AI-Generated Analysis")
+    llm_text = _stream_to_file(report_path, "\n".join(report_lines) + "\n", stream_llm_summary(stats, papers_data))
     report_lines.append(llm_text)
     report_lines.append("")
 
@@ -133,7 +219,10 @@ def generate_report(scored_json_path, output_dir):
     report_lines.append("Full data is available in the following files:\n")
     report_lines.append("- [Scored Papers (JSON)](scored_papers.json)")
     report_lines.append("- [Filtered Papers (JSON)](filtered_papers.json)")
-    report_lines.append("- [Raw Papers (JSON)](raw_papers.json)\n")
+    report_lines.append("- [Raw Papers (JSON)](raw_papers.json)")
+    if deferred:
+        report_lines.append("- [Deferred Papers (JSON)](deferred_papers.json)")
+    report_lines.append("")
 
     # 7. Footer with generation info
     report_lines.append("---")
@@ -142,12 +231,111 @@ def generate_report(scored_json_path, output_dir):
     report_text = "\n".join(report_lines)
 
     # Save Markdown file
-    report_path = os.path.join(output_dir, "report.md")
     with open(report_path, "w", encoding="utf-8") as f:
         f.write(report_text)
 
+    # 8. Per-venue / per-keyword / per-team reports, all rendered from one aggregation pass
+    reports_config = load_config().get('reports') or {}
+    aggregate = build_aggregate(papers_data, load_keywords(), reports_config)
+    variant_paths = render_reports(aggregate, reports_config, output_dir)
+    if variant_paths:
+        print(f"📄 {len(variant_paths)} additional reports saved → {os.path.join(output_dir, 'reports')}")
+
     return report_text
 
+def _stream_to_file(path, head, chunks):
+    """
+    Write head to path, then append each streamed chunk as it arrives so the file is readable
+    while the LLM is still generating. Returns the concatenated chunks.
+    """
+    parts = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(head)
+        f.flush()
+        print(f"📝 Statistics and recommendations written → {path}, streaming AI analysis...")
+        for chunk in chunks:
+            parts.append(chunk)
+            f.write(chunk)
+            f.flush()
+    return "".join(parts)
+
+def _record_history(papers_data, run_key=None, partial=False, max_keywords=10):
+    """
+    Append the current run to the trend store (skipped when run_key was already recorded) and return
+    the per-venue/year history ({'venues': [...], 'keywords': {keyword: [...]}}), or None when history is disabled.
+    """
+    store = open_store(load_config())
+    if store is None:
+        return None
+    try:
+        _, recorded = store.record_run(papers_data, load_keywords(), run_key=run_key, partial=partial)
+        if not recorded:
+            print("🗂️  Trend history already has this scoring run, not recording it again")
+        elif partial:
+            print("🗂️  Partial scoring run recorded in trend history but excluded from the trend series")
+        venues = store.venue_history()
+        keywords = store.keyword_history()
+    finally:
+        store.close()
+    # Keep the keywords with the most papers across the whole history
+    top = sorted(keywords, key=lambda kw: sum(point['count'] for point in keywords[kw]), reverse=True)
+    keywords = {kw: keywords[kw] for kw in top[:max_keywords] if any(point['count'] for point in keywords[kw])}
+    return {'venues': venues, 'keywords': keywords}
+
+def _strategy_summary():
+    """Per-strategy search statistics from the strategy stats store (empty when adaptive ordering is off)"""
+    store = strategy_stats.open_store(load_config())
+    if store is None:
+        return []
+    try:
+        return store.summary()
+    finally:
+        store.close()
+
+def _deferred_section(deferred):
+    """Markdown lines listing the papers deferred by the scoring scheduler"""
+    lines = ["## ⏳ Deferred Papers\n",
+             f"This is a partial report: scoring stopped early ({deferred[0].get('reason') or 'budget'}) "
+             f"and {len(deferred)} lower-priority papers were deferred to the next run.\n"]
+    for record in deferred[:10]:
+        venue = " ".join(str(value) for value in (record.get('venue'), record.get('year')) if value)
+        lines.append(f"- {record.get('title', 'N/A')}" + (f" ({venue})" if venue else ""))
+    if len(deferred) > 10:
+        lines.append(f"- ... and {len(deferred) - 10} more")
+    lines.append("")
+    return lines
+
+def _write_deferred_only_report(deferred, output_dir):
+    """
+    Report for a run in which no paper was scored before the deadline: executive summary and the
+    deferred papers only (no statistics, LLM analysis or trend history, since there is nothing to summarize).
+    """
+    report_lines = [f"# AI Research Trend Report ({datetime.now().strftime('%Y-%m-%d')})\n",
+                    "## Executive Summary\n",
+                    "- **Total Papers**: 0",
+                    f"- **Deferred Papers**: {len(deferred)} (scoring stopped early: {deferred[0].get('reason') or 'budget'})",
+                    "\n"]
+    report_lines.extend(_deferred_section(deferred))
+    report_lines.append("## Raw Data\n")
+    report_lines.append("- [Deferred Papers (JSON)](deferred_papers.json)")
+    report_lines.append("")
+    report_lines.append("---")
+    report_lines.append(f"*Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} by AI Research Agent*")
+
+    report_text = "\n".join(report_lines)
+    with open(os.path.join(output_dir, "report.md"), "w", encoding="utf-8") as f:
+        f.write(report_text)
+    return report_text
+
+def load_deferred():
+    """Papers deferred by the scoring scheduler in this run (empty when scheduling is off or nothing was deferred)"""
+    settings = load_config().get('score_schedule') or {}
+    path = settings.get('deferred_path', "output/deferred_papers.json")
+    if not settings.get('enabled', False) or not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 def _generate_focus_from_title(title):
     """
     Based on paper title, generate a brief research focus description
@@ -0,0 +1,236 @@
+"""
+分布式打分的本地工作队列（SQLite）。
+
+单进程的 calculate_score 受限于一个 IP 和一组 token；这里把待打分的论文写入持久化队列，
+由多个 worker 进程（或共享同一队列文件的多台机器）按租约领取、打分、写回结果：
+
+- 每个 job 的论文按 shard 编号分片；worker 可以只领取指定的分片，领完后再领取其他分片
+- 领取时写入租约（lease_owner, lease_expires），worker 每打完一篇续租
+- worker 崩溃后租约过期，论文回到可领取状态，被其他 worker 重新领取（attempts 记录领取次数）
+- 结果只接受当前租约持有者的写回，过期 worker 迟到的结果被忽略
+- 协调者等待所有论文完成，合并结果后统一运行 validate_and_clean_matches
+- worker 写回结果时附带该论文的打分耗时和 GitHub API 调用数，协调者据此更新截止时间调度（score_schedule）的估计
+- 到达打分截止时间（score_schedule）时协调者取消 job：未完成的论文标记为 cancelled，不再被领取
+
+配置（config.yaml）:
+score_queue:
+  path: "output/score_queue.db"
+  workers: 0             # > 0 时 score 阶段启动这么多个本地 worker 进程（也可用 main.py score --workers N）
+  shards: 4
+  batch_size: 5          # 每次领取的论文数
+  lease_seconds: 300     # 租约时长，需大于打完一批论文（含限流等待）的时间
+  poll_seconds: 2
+"""
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+from utils.paper import FILTERED_FIELDS, SCORED_FIELDS, Paper, json_default
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    total INTEGER NOT NULL,
+    shards INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL REFERENCES jobs(job_id),
+    idx INTEGER NOT NULL,
+    shard INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_items_claim ON items (job_id, status, shard, lease_expires);
+"""
+
+# 后加入的列（已有的队列文件启动时补上）：worker 回报的单篇打分耗时与 GitHub API 调用数
+ITEM_COLUMNS = {
+    'seconds': "REAL",
+    'api_calls': "INTEGER",
+}
+
+
+def new_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class ScoreQueue:
+
+    def __init__(self, path="output/score_queue.db"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # 多个进程同时写：WAL 模式 + 较长的锁等待
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(items)")}
+        for column, definition in ITEM_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE items ADD COLUMN {column} {definition}")
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self):
+        """BEGIN IMMEDIATE：领取与写回在写锁下进行，多个 worker 不会领到同一篇论文"""
+        return _Immediate(self.conn)
+
+    def enqueue(self, papers, shards=1, job_id=None):
+        """把论文写入一个新 job，返回 job_id"""
+        job_id = job_id or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        shards = max(1, shards)
+        with self._transaction():
+            self.conn.execute("INSERT INTO jobs VALUES (?, ?, ?, ?)", (job_id, time.time(), len(papers), shards))
+            self.conn.executemany(
+                "INSERT INTO items (job_id, idx, shard, payload) VALUES (?, ?, ?, ?)",
+                [(job_id, i, i % shards, json.dumps(paper, ensure_ascii=False, default=json_default(FILTERED_FIELDS)))
+                 for i, paper in enumerate(papers)],
+            )
+        return job_id
+
+    def latest_job(self):
+        row = self.conn.execute("SELECT job_id FROM jobs ORDER BY created_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def claim(self, job_id, worker_id, limit=5, lease_seconds=300, shards=None):
+        """
+        领取最多 limit 篇待处理或租约已过期的论文，优先领取 shards 中的分片
+        返回 [(idx, paper)]
+        """
+        now = time.time()
+        claimable = "job_id = ? AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+        with self._transaction():
+            rows = []
+            if shards:
+                rows = self.conn.execute(
+                    f"SELECT idx, payload FROM items WHERE {claimable} "
+                    f"AND shard IN ({', '.join('?' * len(shards))}) ORDER BY idx LIMIT ?",
+                    (job_id, now, *shards, limit),
+                ).fetchall()
+            if not rows:
+                rows = self.conn.execute(
+                    f"SELECT idx, payload FROM items WHERE {claimable} ORDER BY idx LIMIT ?",
+                    (job_id, now, limit),
+                ).fetchall()
+            self.conn.executemany(
+                "UPDATE items SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE job_id = ? AND idx = ?",
+                [(worker_id, now + lease_seconds, job_id, idx) for idx, _ in rows],
+            )
+        return [(idx, Paper.from_dict(json.loads(payload))) for idx, payload in rows]
+
+    def renew(self, job_id, worker_id, lease_seconds=300):
+        """为该 worker 仍持有的租约续期"""
+        with self._transaction():
+            self.conn.execute(
+                "UPDATE items SET lease_expires = ? WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time() + lease_seconds, job_id, worker_id),
+            )
+
+    def complete(self, job_id, idx, worker_id, result, seconds=None, api_calls=None):
+        """写回结果（以及打分耗时、API 调用数）；租约已被其他 worker 接手时返回 False"""
+        with self._transaction():
+            cursor = self.conn.execute(
+                "UPDATE items SET status = 'done', result = ?, seconds = ?, api_calls = ?, "
+                "lease_owner = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND idx = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result, ensure_ascii=False, default=json_default(SCORED_FIELDS)), seconds, api_calls,
+                 job_id, idx, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def cancel(self, job_id):
+        """取消 job 中未完成（待领取或已领取）的论文，返回这些论文（Paper），按入队顺序"""
+        with self._transaction():
+            rows = self.conn.execute(
+                "SELECT payload FROM items WHERE job_id = ? AND status IN ('pending', 'leased') ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+            self.conn.execute(
+                "UPDATE items SET status = 'cancelled', lease_owner = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND status IN ('pending', 'leased')", (job_id,),
+            )
+        return [Paper.from_dict(json.loads(payload)) for (payload,) in rows]
+
+    def progress(self, job_id):
+        """
+        {'total', 'pending', 'leased', 'expired', 'done', 'cancelled', 'reclaimed', 'seconds', 'api_calls'}
+        seconds / api_calls：已完成论文回报的打分耗时与 GitHub API 调用数之和
+        """
+        now = time.time()
+        counts = {'total': 0, 'pending': 0, 'leased': 0, 'expired': 0, 'done': 0, 'cancelled': 0}
+        for status, expired, n in self.conn.execute(
+            "SELECT status, status = 'leased' AND lease_expires < ?, COUNT(*) FROM items WHERE job_id = ? "
+            "GROUP BY 1, 2", (now, job_id)
+        ):
+            counts['total'] += n
+            counts['expired' if expired else status] += n
+        counts['reclaimed'], counts['seconds'], counts['api_calls'] = self.conn.execute(
+            "SELECT SUM(attempts > 1), TOTAL(seconds), TOTAL(api_calls) FROM items WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        counts['reclaimed'] = counts['reclaimed'] or 0
+        counts['api_calls'] = int(counts['api_calls'])
+        return counts
+
+    def results(self, job_id):
+        """已完成论文的结果（Paper），按入队顺序"""
+        return [Paper.from_dict(json.loads(result)) for (result,) in self.conn.execute(
+            "SELECT result FROM items WHERE job_id = ? AND status = 'done' ORDER BY idx", (job_id,)
+        )]
+
+
+class _Immediate:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+def run_worker(queue, job_id, score_one, worker_id=None, batch_size=5, lease_seconds=300,
+               poll_seconds=2, shards=None, api_calls=None):
+    """
+    worker 主循环：领取 → 逐篇 score_one(paper) → 写回，直到 job 中没有未完成的论文
+    其他 worker 持有未过期租约时等待 poll_seconds 后重试（租约过期后接手）
+    api_calls: 返回本 worker 累计 GitHub API 调用数的函数，每篇论文的调用数随结果写回
+    返回本 worker 完成的论文数
+    """
+    worker_id = worker_id or new_worker_id()
+    completed = 0
+    while True:
+        batch = queue.claim(job_id, worker_id, batch_size, lease_seconds, shards)
+        if not batch:
+            progress = queue.progress(job_id)
+            if progress['pending'] + progress['leased'] + progress['expired'] == 0:
+                return completed
+            time.sleep(poll_seconds)
+            continue
+        for idx, paper in batch:
+            started = time.monotonic()
+            calls = api_calls() if api_calls else None
+            result = score_one(paper)
+            if calls is not None:
+                calls = api_calls() - calls
+            if queue.complete(job_id, idx, worker_id, result, time.monotonic() - started, calls):
+                completed += 1
+            else:
+                print(f"⚠️  Lease on paper {idx} was taken over by another worker, result discarded")
+            queue.renew(job_id, worker_id, lease_seconds)
+
+
+def open_queue(config):
+    settings = (config or {}).get('score_queue') or {}
+    return ScoreQueue(settings.get('path', "output/score_queue.db"))
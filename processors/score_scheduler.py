@@ -0,0 +1,216 @@
+"""
+打分阶段的截止时间调度：按期望价值排序论文，在时间 / API 预算内优先处理价值最高的论文，
+预算用尽时干净地停止，剩余论文记录为 deferred，在下一次运行中优先处理。
+
+期望价值 = (关键词密度 + relevance) × 会议权重 × 线索系数 × 延期系数
+- 关键词密度：标题（计两次）与摘要中关键词出现次数 / 词数 × 100
+- relevance：rank 筛选模式下的相关度
+- 线索：上一次打分结果中已有仓库的论文 × hint_boost；负缓存中仍在退避期的论文 × negative_factor
+- 延期：上一次运行被延期的论文 × deferred_boost^延期次数，避免长期排不上
+
+停止条件（每篇论文开始前检查）：
+- 距截止时间（deadline - reserve_seconds）不足以再处理一篇论文（按已处理论文的平均耗时估计）
+- 打分阶段耗时超过 time_budget_seconds
+- GitHub API 调用数达到 api_budget（按每篇论文的平均调用数预留）
+
+配置（config.yaml）:
+score_schedule:
+  enabled: true
+  deadline: "08:45"          # HH:MM（本地时间，取下一次出现的时刻）或 ISO 时间；留空不设截止时间
+  reserve_seconds: 300       # 截止时间前为验证、报告和 Slack 推送预留的时间
+  time_budget_seconds: 0     # 打分阶段最长耗时，0 不限制
+  api_budget: 0              # 打分阶段最多 GitHub API 调用数，0 不限制（分布式打分时按 worker 回报的调用数计算）
+  venue_weights: {}          # 如 {CVPR: 1.2, ACL: 0.8}，未列出的会议为 1.0
+  hint_boost: 2.0
+  negative_factor: 0.2
+  deferred_boost: 2.5
+  deferred_path: "output/deferred_papers.json"
+"""
+import json
+import math
+import os
+import re
+import time
+from datetime import datetime, timedelta
+
+from utils.metrics import metrics
+from utils.negative_cache import normalize_title
+
+
+def parse_deadline(value, now=None):
+    """
+    "HH:MM" → 下一次出现的该时刻；ISO 时间 → 该时刻；空值 → None
+    返回 datetime（本地时间，不带时区）；带时区的 ISO 时间（+08:00 / Z）换算为本地时间
+    格式无效时抛出 ValueError
+    """
+    if not value:
+        return None
+    now = now or datetime.now()
+    value = str(value).strip()
+    if re.fullmatch(r"\d{1,2}:\d{2}", value):
+        hour, minute = (int(part) for part in value.split(":"))
+        deadline = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return deadline if deadline > now else deadline + timedelta(days=1)
+    # Python 3.11 之前的 fromisoformat 不接受 "Z" 后缀
+    deadline = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith(("Z", "z")) else value)
+    if deadline.tzinfo is not None:
+        deadline = deadline.astimezone().replace(tzinfo=None)
+    return deadline
+
+
+class ScoreScheduler:
+
+    def __init__(self, settings, keywords, github_fetcher=None, hints_path=None):
+        self.settings = settings
+        self.github_fetcher = github_fetcher
+        self.venue_weights = settings.get('venue_weights') or {}
+        self.hint_boost = settings.get('hint_boost', 2.0)
+        self.negative_factor = settings.get('negative_factor', 0.2)
+        self.deferred_boost = settings.get('deferred_boost', 2.5)
+        self.deferred_path = settings.get('deferred_path', "output/deferred_papers.json")
+        self.time_budget = settings.get('time_budget_seconds') or 0
+        self.api_budget = settings.get('api_budget') or 0
+
+        # 截止时间换算为单调时钟，避免运行中系统时间调整
+        self.started = time.monotonic()
+        self.limits = []
+        deadline = parse_deadline(settings.get('deadline'))
+        if deadline is not None:
+            seconds_left = (deadline - datetime.now()).total_seconds() - settings.get('reserve_seconds', 300)
+            self.limits.append(("deadline", self.started + seconds_left))
+            print(f"⏰ Scoring deadline {deadline:%Y-%m-%d %H:%M} ({max(0, seconds_left) / 60:.0f} min left "
+                  f"after reserving {settings.get('reserve_seconds', 300)}s)")
+        if self.time_budget:
+            self.limits.append(("time budget", self.started + self.time_budget))
+
+        self._keyword_pattern = (re.compile(r"\b(?:" + "|".join(re.escape(kw) for kw in keywords) + r")\b")
+                                 if keywords else None)
+        self._known_repos = self._load_hints(hints_path)
+        self._deferrals = self._load_deferrals()
+        self._api_start = self._api_calls()
+        self._priorities = {}
+        self.processed = 0
+        self._seconds = 0.0
+        # 分布式打分：worker 回报的 GitHub API 调用数与正在处理的论文数（单进程时为 None / 0）
+        self._api_used = None
+        self._in_flight = 0
+
+    # ── 期望价值 ────────────────────────────────────────────
+    def _load_hints(self, path):
+        """上一次打分结果中已找到仓库的论文（规范化标题）"""
+        if not path or not os.path.exists(path):
+            return set()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return {normalize_title(p.get('title')) for p in json.load(f) if p.get('repo')}
+        except (OSError, ValueError):
+            return set()
+
+    def _load_deferrals(self):
+        """上一次运行被延期的论文 → 已延期次数"""
+        if not os.path.exists(self.deferred_path):
+            return {}
+        try:
+            with open(self.deferred_path, "r", encoding="utf-8") as f:
+                return {normalize_title(p['title']): p.get('deferrals', 1) for p in json.load(f)}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def keyword_density(self, paper):
+        if self._keyword_pattern is None:
+            return 0.0
+        title = (paper.get('title') or "").lower()
+        summary = (paper.get('summary') or paper.get('abstract') or "").lower()
+        text = f"{title} {title} {summary}"
+        words = len(text.split())
+        return 100.0 * len(self._keyword_pattern.findall(text)) / words if words else 0.0
+
+    def priority(self, paper):
+        cached = self._priorities.get(id(paper))
+        if cached is None:
+            cached = self._priorities[id(paper)] = self._priority(paper)
+        return cached
+
+    def _priority(self, paper):
+        value = self.keyword_density(paper) + (paper.get('relevance') or 0.0)
+        value *= self.venue_weights.get(paper.get('venue'), 1.0)
+        key = normalize_title(paper.get('title'))
+        if key in self._known_repos:
+            value *= self.hint_boost
+        else:
+            cache = getattr(self.github_fetcher, 'negative_cache', None)
+            if cache and cache.lookup(paper.get('title')):
+                value *= self.negative_factor
+        deferrals = self._deferrals.get(key, 0)
+        if deferrals:
+            value *= self.deferred_boost ** deferrals
+        return value
+
+    def order(self, papers):
+        """按期望价值降序排列（同值保持原顺序）"""
+        ranked = sorted(papers, key=self.priority, reverse=True)
+        carried = sum(1 for p in ranked if normalize_title(p.get('title')) in self._deferrals)
+        if carried:
+            print(f"⏫ {carried} papers deferred by the previous run are prioritized")
+        return ranked
+
+    # ── 预算 ────────────────────────────────────────────────
+    def _api_calls(self):
+        return getattr(self.github_fetcher, '_api_calls', 0)
+
+    def record(self, seconds):
+        """记录一篇论文的处理耗时"""
+        self.processed += 1
+        self._seconds += seconds
+
+    def record_progress(self, processed, seconds, api_calls, in_flight=0):
+        """
+        分布式打分：用 worker 通过队列回报的累计值更新估计
+        processed / seconds / api_calls：已完成论文数、打分耗时之和、GitHub API 调用数之和
+        in_flight：已被领取、尚未完成的论文数（API 预算为它们预留调用数）
+        """
+        self.processed = processed
+        self._seconds = seconds
+        self._api_used = api_calls
+        self._in_flight = in_flight
+
+    def stop_reason(self):
+        """预算不足以再处理一篇论文（按已处理论文的平均耗时 / 调用数估计）时返回原因，否则返回 None"""
+        now = time.monotonic()
+        mean_seconds = self._seconds / self.processed if self.processed else 0.0
+        for reason, limit in self.limits:
+            if limit - now <= mean_seconds:
+                return reason
+        if self.api_budget:
+            used = self._api_calls() - self._api_start if self._api_used is None else self._api_used
+            mean_calls = used / self.processed if self.processed else 0
+            if used + math.ceil(mean_calls * (1 + self._in_flight)) >= self.api_budget:
+                return "API budget"
+        return None
+
+    # ── 延期记录 ─────────────────────────────────────────────
+    def save_deferred(self, papers, reason=None):
+        """写入本次延期的论文（没有延期时写入空列表），供报告与下一次运行使用"""
+        records = [{
+            'title': paper.get('title'),
+            'venue': paper.get('venue'),
+            'year': paper.get('year'),
+            'priority': round(self.priority(paper), 3),
+            'deferrals': self._deferrals.get(normalize_title(paper.get('title')), 0) + 1,
+            'reason': reason,
+        } for paper in papers]
+        os.makedirs(os.path.dirname(self.deferred_path) or ".", exist_ok=True)
+        with open(self.deferred_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        if records:
+            metrics.inc("papers_deferred", len(records), reason=reason)
+            print(f"⏸️  Deferred {len(records)} papers to the next run ({reason}) → {self.deferred_path}")
+        return records
+
+
+def open_scheduler(config, keywords, github_fetcher=None, hints_path=None):
+    """根据 config.yaml 的 score_schedule 段创建调度器；未启用时返回 None"""
+    settings = (config or {}).get('score_schedule') or {}
+    if not settings.get('enabled', False):
+        return None
+    return ScoreScheduler(settings, keywords, github_fetcher, hints_path)
@@ -1,71 +1,121 @@
 import math
+import time
+
+from processors.score_scheduler import open_scheduler
+from utils.config import load_config, load_keywords
+from utils.metrics import metrics
+from utils.paper import Paper
 
 def calculate_score(papers, github_fetcher, pwcode_fetcher):
     """
     批量为论文匹配GitHub仓库并计算分数
     """
     scored_results = []
-    skipped_no_github = 0
+    config = load_config()
+    velocity_weight = (config.get('scoring') or {}).get('velocity_weight', 1.0)
     
     print("🔍 Starting recognition scoring (GitHub repos required)...")
-    if pwcode_fetcher.api_key == "your-pwc-api-key-here" or not pwcode_fetcher.api_key:
+    if not pwc_configured(pwcode_fetcher):
         print("⚠️  PapersWithCode API not configured, trying direct GitHub search")
+
+    # 截止时间调度：按期望价值排序，预算不足时停止并把剩余论文记录为 deferred
+    scheduler = open_scheduler(config, load_keywords(), github_fetcher, "output/scored_papers.json")
+    if scheduler:
+        papers = scheduler.order(papers)
+    deferred, stop_reason = [], None
     
     for i, paper in enumerate(papers, 1):
-        title = paper['title']
-        print(f"  📋 Processing {i}/{len(papers)}: {title[:50]}...")
-        
-        # 1. 查询 PapersWithCode
-        pwc_info = None
-        if pwcode_fetcher.api_key and pwcode_fetcher.api_key != "your-pwc-api-key-here":
+        if scheduler:
+            stop_reason = scheduler.stop_reason()
+            if stop_reason:
+                deferred = papers[i - 1:]
+                print(f"⏰ Stopping scoring early ({stop_reason}): {i - 1}/{len(papers)} papers processed")
+                break
+        print(f"  📋 Processing {i}/{len(papers)}: {paper['title'][:50]}...")
+        started = time.monotonic()
+        scored_results.append(score_paper(paper, github_fetcher, pwcode_fetcher, velocity_weight))
+        if scheduler:
+            scheduler.record(time.monotonic() - started)
+
+    if scheduler:
+        scheduler.save_deferred(deferred, stop_reason)
+
+    if github_fetcher.negative_cache:
+        cache_stats = github_fetcher.negative_cache.stats()
+        print(f"🗃️  Negative match cache: {cache_stats['entries']} papers without repos "
+              f"({cache_stats['due']} due for re-check)")
+    
+    return finalize_scores(scored_results)
+
+def pwc_configured(pwcode_fetcher):
+    return bool(pwcode_fetcher.api_key) and pwcode_fetcher.api_key != "your-pwc-api-key-here"
+
+def score_paper(paper, github_fetcher, pwcode_fetcher, velocity_weight=1.0):
+    """
+    为单篇论文匹配仓库并打分（calculate_score 与分布式 worker 共用）
+    paper 为 Paper 时原地写入 repo / stars / score 等字段，返回该 Paper
+    """
+    paper = Paper.coerce(paper)
+    title = paper.title
+    
+    # 1. 查询 PapersWithCode
+    pwc_info = None
+    if pwc_configured(pwcode_fetcher):
+        with metrics.span("pwc_lookup"):
             pwc_info = pwcode_fetcher.search_paper(title)
-        
-        is_pwcode = True if pwc_info else False
-        repo_url = pwc_info['repo_url'] if pwc_info else None
     
-        # 2. 如果没有从PWC找到，尝试直接搜索GitHub（基于论文标题）
-        github_result = None
-        if not repo_url:
-            github_result = github_fetcher.search_paper_repository(title)
-            if github_result:
-                repo_url = github_result['repo_url']
-                github_stats = github_result['stats']
-            
-        # 3. 查询 GitHub Repo Stats（如果还没有统计信息）
-        if repo_url and not github_result:
-            github_stats = github_fetcher.get_repo_stats(repo_url)
-        elif github_result:
+    is_pwcode = True if pwc_info else False
+    repo_url = pwc_info['repo_url'] if pwc_info else None
+
+    # 2. 如果没有从PWC找到，尝试直接搜索GitHub（基于论文标题）
+    github_result = None
+    if not repo_url:
+        with metrics.span("github_repo_search"):
+            github_result = github_fetcher.search_paper_repository(title, paper.venue)
+        if github_result:
+            repo_url = github_result['repo_url']
             github_stats = github_result['stats']
-        else:
-            github_stats = None
-            
-        stars = github_stats['stars'] if github_stats else 0
-        days_open = github_stats['days_since_created'] if github_stats else 0
-    
-        # 4. 计算论文分数（改为更宽容的处理方式，不跳过没有GitHub的论文）
-        score = 0
-        if repo_url and github_stats:
-            # 使用原有的评分公式
-            score = calculate_paper_score(is_pwcode, stars, days_open)
-            print(f"    ✅ Found repo with {stars} stars, score: {score:.1f}")
-        else:
-            print(f"    ⚠️ No GitHub repo found for this paper")
-            repo_url = None
-            stars = 0
-            skipped_no_github += 1
         
-        scored_results.append({
-            'title': title,
-            'authors': paper.get('authors', []),
-            'summary': paper.get('summary', ""),
-            'pdf_url': paper.get('pdf_url', ""),
-            'venue': paper.get('venue', ""),
-            'repo': repo_url,
-            'stars': stars,
-            'days_since_created': days_open,
-            'score': score
-        })
+    # 3. 查询 GitHub Repo Stats（如果还没有统计信息）
+    if repo_url and not github_result:
+        github_stats = github_fetcher.get_repo_stats(repo_url)
+    elif github_result:
+        github_stats = github_result['stats']
+    else:
+        github_stats = None
+        
+    stars = github_stats['stars'] if github_stats else 0
+    days_open = github_stats['days_since_created'] if github_stats else 0
+    star_velocity = github_stats.get('star_velocity') if github_stats else None
+    # 只有快照间的增速进入分数；lifetime 增速（stars / days_since_created）只是已有两项的组合，仅用于展示
+    scored_velocity = star_velocity if github_stats and github_stats.get('velocity_basis') == 'snapshots' else None
+
+    # 4. 计算论文分数（改为更宽容的处理方式，不跳过没有GitHub的论文）
+    score = 0
+    if repo_url and github_stats:
+        # 使用原有的评分公式
+        score = calculate_paper_score(is_pwcode, stars, days_open, scored_velocity, velocity_weight)
+        print(f"    ✅ Found repo with {stars} stars, score: {score:.1f}")
+        metrics.inc("papers_scored", source="github_search" if github_result else "paperswithcode")
+    else:
+        print(f"    ⚠️ No GitHub repo found for this paper")
+        repo_url = None
+        stars = 0
+        star_velocity = None
+        metrics.inc("papers_scored", source="none")
     
+    if paper.summary is None:
+        paper.summary = ""
+    paper.repo = repo_url
+    paper.stars = stars
+    paper.days_since_created = days_open
+    paper.star_velocity = star_velocity
+    paper.score = score
+    return paper
+
+def finalize_scores(scored_results):
+    """打印匹配统计，并按分数和星星数降序排序"""
+    skipped_no_github = sum(1 for r in scored_results if r.get('repo') is None)
     print(f"📊 Recognition scoring completed: {len(scored_results) - skipped_no_github} papers with GitHub repos found")
     print(f"⚠️  Skipped {skipped_no_github} papers without GitHub repositories")
     
@@ -74,10 +124,13 @@ def calculate_score(papers, github_fetcher, pwcode_fetcher):
     
     return scored_results
 
-def calculate_paper_score(is_pwcode, stars, days_since_created):
+def calculate_paper_score(is_pwcode, stars, days_since_created, star_velocity=None, velocity_weight=1.0):
     """
     简单综合打分公式：
       score = 2*is_pwcode + log(stars+1) + 0.5*log(days_since_created+1)
+              + velocity_weight*log(star_velocity+1)
+    star_velocity 为 stars/天（至少间隔一天的 star 快照），让快速增长的新仓库不被老牌大仓库完全压过；
+    没有快照增速时传 None，分数与不考虑增速时相同
     """
     score = 0.0
     score += 2 * (1 if is_pwcode else 0)
@@ -85,4 +138,6 @@ def calculate_paper_score(is_pwcode, stars, days_since_created):
         score += math.log(stars + 1)
     if days_since_created is not None:
         score += 0.5 * math.log(days_since_created + 1)
+    if star_velocity is not None:
+        score += velocity_weight * math.log(star_velocity + 1)
     return round(score, 2)
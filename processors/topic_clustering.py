@@ -0,0 +1,182 @@
+"""
+基于 TF-IDF + mini-batch (球面) k-means 的主题聚类，用于发现 keywords.txt 之外的新兴方向。
+
+- 标题与摘要分词后构建稀疏 TF-IDF 矩阵（scipy.sparse CSR，行 L2 归一化）
+- 在余弦空间上做 mini-batch k-means，得到主题及其代表词
+- 按主题统计规模、开源率、平均 stars，以及未被任何配置关键词覆盖的比例（novelty）
+
+numpy / scipy 只在调用时导入。
+"""
+import re
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9]*(?:-[a-z0-9]+)*")
+
+ENGLISH_STOPWORDS = frozenset("""
+a about above across after against all also an and any are as at be been being between both but by can
+could do does each for from has have how however in into is it its itself more most new not of on only
+or other our over such than that the their them then there these they this those through to towards
+under up upon using via was we what when where which while who why will with within without would
+you your yet
+""".split())
+
+# 主题聚类额外去掉论文中普遍出现、没有区分度的领域词
+STOPWORDS = ENGLISH_STOPWORDS | frozenset("""
+approach approaches based method methods model models network networks paper propose proposed
+learning deep neural novel task tasks results show shows performance state art data framework
+efficient effective toward large scale benchmark study via improving improved
+""".split())
+
+
+def tokenize(text, bigrams=True, stopwords=STOPWORDS):
+    """小写分词，去停用词与过短词；可附加相邻词二元组"""
+    tokens = [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) > 2 and t not in stopwords]
+    if bigrams and len(tokens) > 1:
+        tokens += [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return tokens
+
+
+def build_tfidf(documents, min_df=2, max_df=0.5, max_features=20000):
+    """
+    documents: 已分词的文档列表
+    返回 (X, vocabulary)，X 为行 L2 归一化的 CSR 矩阵，vocabulary 为词列表
+    """
+    import numpy as np
+    from scipy import sparse
+
+    n_docs = len(documents)
+    doc_freq = Counter()
+    for tokens in documents:
+        doc_freq.update(set(tokens))
+
+    max_count = max_df * n_docs if isinstance(max_df, float) else max_df
+    candidates = [(term, df) for term, df in doc_freq.items() if min_df <= df <= max_count]
+    candidates.sort(key=lambda item: (-item[1], item[0]))
+    vocabulary = [term for term, _ in candidates[:max_features]]
+    index = {term: i for i, term in enumerate(vocabulary)}
+
+    indptr = [0]
+    indices = []
+    counts = []
+    for tokens in documents:
+        row = Counter(index[t] for t in tokens if t in index)
+        indices.extend(row.keys())
+        counts.extend(row.values())
+        indptr.append(len(indices))
+
+    X = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(n_docs, len(vocabulary)),
+    )
+    # 次线性 TF 与平滑 IDF
+    X.data = 1.0 + np.log(X.data)
+    df = np.asarray([doc_freq[term] for term in vocabulary], dtype=np.float32)
+    idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+    X = X @ sparse.diags(idf.astype(np.float32))
+    X = X.tocsr()
+
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    X = sparse.diags((1.0 / norms).astype(np.float32)) @ X
+    return X.tocsr(), vocabulary
+
+
+def minibatch_kmeans(X, n_clusters, batch_size=1024, n_iter=100, seed=0):
+    """
+    球面 mini-batch k-means（余弦相似度），返回 (centroids, labels)
+    初始中心用 k-means++ 在一个采样子集上选取
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    n_docs = X.shape[0]
+
+    # k-means++ 初始化（在子样本上进行，避免全量距离计算）
+    sample = rng.choice(n_docs, size=min(n_docs, max(10 * n_clusters, 2000)), replace=False)
+    Xs = X[sample]
+    centers = [int(rng.integers(len(sample)))]
+    closest = 1.0 - (Xs @ Xs[centers[0]].T).toarray().ravel()
+    for _ in range(1, n_clusters):
+        weights = np.clip(closest, 0, None)
+        total = weights.sum()
+        pick = int(rng.choice(len(sample), p=weights / total)) if total > 0 else int(rng.integers(len(sample)))
+        centers.append(pick)
+        closest = np.minimum(closest, 1.0 - (Xs @ Xs[pick].T).toarray().ravel())
+    centroids = Xs[centers].toarray()
+
+    counts = np.zeros(n_clusters)
+    for _ in range(n_iter):
+        batch = rng.choice(n_docs, size=min(batch_size, n_docs), replace=False)
+        Xb = X[batch]
+        assign = np.asarray((Xb @ centroids.T).argmax(axis=1)).ravel()
+        for k in np.unique(assign):
+            members = Xb[assign == k]
+            counts[k] += members.shape[0]
+            eta = members.shape[0] / counts[k]
+            centroids[k] = (1 - eta) * centroids[k] + eta * np.asarray(members.mean(axis=0)).ravel()
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+
+    labels = np.asarray((X @ centroids.T).argmax(axis=1)).ravel()
+    return centroids, labels
+
+
+def analyze_topics(papers, keywords=None, n_topics=None, top_terms=8, seed=0):
+    """
+    对论文标题 + 摘要做主题聚类
+    返回 {'n_papers', 'topics': [...], 'emerging': [...], 'labels': [...]}；论文太少时返回 None
+    labels 与 papers 一一对应，为每篇论文所属的 topic id
+    每个 topic: {'id', 'size', 'share', 'top_terms', 'novelty', 'open_source_rate', 'avg_stars', 'sample_titles'}
+    novelty 为主题内不匹配任何配置关键词的论文比例，越高说明关键词列表越看不到该方向
+    """
+    import numpy as np
+
+    if len(papers) < 10:
+        return None
+
+    documents = [tokenize(f"{p.get('title') or ''} {p.get('summary') or p.get('abstract') or ''}") for p in papers]
+    X, vocabulary = build_tfidf(documents, min_df=2 if len(papers) < 1000 else 3)
+    if not vocabulary:
+        return None
+
+    k = n_topics or max(2, min(12, len(papers) // 25))
+    k = min(k, len(papers))
+    centroids, labels = minibatch_kmeans(X, k, seed=seed)
+
+    keyword_patterns = [re.compile(rf"\b{re.escape(kw)}\b") for kw in (keywords or [])]
+    texts = [f"{p.get('title') or ''} {p.get('summary') or ''}".lower() for p in papers]
+    covered = np.array([any(pat.search(text) for pat in keyword_patterns) for text in texts]) if keyword_patterns \
+        else np.zeros(len(papers), dtype=bool)
+    has_repo = np.array([bool(p.get('repo')) for p in papers])
+    stars = np.array([p.get('stars') or 0 for p in papers], dtype=float)
+
+    topics = []
+    for cluster in range(k):
+        members = np.flatnonzero(labels == cluster)
+        if len(members) == 0:
+            continue
+        top = np.argsort(centroids[cluster])[::-1][:top_terms]
+        by_stars = members[np.argsort(-stars[members], kind="stable")][:3]
+        topics.append({
+            'id': cluster,
+            'size': int(len(members)),
+            'share': round(len(members) / len(papers), 4),
+            'top_terms': [vocabulary[i] for i in top if centroids[cluster][i] > 0],
+            'novelty': round(float(1 - covered[members].mean()), 4),
+            'open_source_rate': round(float(has_repo[members].mean()), 4),
+            'avg_stars': round(float(stars[members].mean()), 1),
+            'sample_titles': [papers[i].get('title', '') for i in by_stars],
+        })
+    topics.sort(key=lambda t: t['size'], reverse=True)
+
+    # 新兴方向：关键词列表基本覆盖不到，且有一定规模的主题
+    emerging = [t for t in topics if t['novelty'] >= 0.5 and t['size'] >= max(3, 0.02 * len(papers))]
+    emerging.sort(key=lambda t: t['novelty'] * t['size'], reverse=True)
+
+    return {
+        'n_papers': len(papers),
+        'topics': topics,
+        'emerging': emerging,
+        'labels': labels.tolist(),
+    }
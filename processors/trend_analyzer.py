@@ -1,5 +1,7 @@
 import json
-import pandas as pd
+import re
+
+from utils.config import load_config, load_keywords
 
 def analyze_trends(scored_json_path):
     """
@@ -12,27 +14,38 @@ def analyze_trends(scored_json_path):
     if not papers:
         return {}
 
-    df = pd.DataFrame(papers)
-
     # 总论文数
-    total_papers = len(df)
+    total_papers = len(papers)
     # 开源论文数（repo 不为 None）
-    open_source_count = df['repo'].notnull().sum()
-    # 平均认可度分
-    avg_score = df['score'].mean() if 'score' in df.columns else 0
+    open_source_count = sum(1 for p in papers if p.get('repo') is not None)
+    # 平均认可度分（忽略缺失的分数）
+    scores = [p['score'] for p in papers if p.get('score') is not None]
+    avg_score = sum(scores) / len(scores) if scores else 0
 
-    # 从 configs/keywords.txt 读取关键词
-    with open("configs/keywords.txt", "r") as f:
-        keywords = [line.strip().lower() for line in f if line.strip()]
+    # 从 configs/keywords.txt 读取关键词（标题中按正则、忽略大小写匹配）
+    keywords = load_keywords()
+    titles = [p.get('title') or "" for p in papers]
 
     keyword_counts = {}
     for kw in keywords:
-        count = df['title'].str.contains(kw, case=False).sum()
-        keyword_counts[kw] = int(count)
+        pattern = re.compile(kw, re.IGNORECASE)
+        keyword_counts[kw] = sum(1 for title in titles if pattern.search(title))
 
-    return {
+    stats = {
         'total_papers': total_papers,
         'open_source_count': int(open_source_count),
         'avg_score': round(float(avg_score), 2),
         'keyword_counts': keyword_counts
     }
+
+    # 主题聚类（发现关键词列表之外的新兴方向），需在 trends.topic_clustering 中开启：
+    # 聚类要导入 numpy / scipy.sparse，默认关闭以保持 report 阶段的冷启动时间
+    trends_config = load_config().get('trends') or {}
+    if trends_config.get('topic_clustering', False):
+        try:
+            from processors.topic_clustering import analyze_topics
+            stats['topics'] = analyze_topics(papers, keywords=keywords, n_topics=trends_config.get('n_topics'))
+        except ImportError as e:
+            print(f"⚠️  Topic clustering skipped (missing dependency: {e.name})")
+
+    return stats
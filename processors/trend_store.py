@@ -0,0 +1,204 @@
+"""
+跨运行的趋势时间序列存储（SQLite）。
+
+每次打分运行的结果按 (venue, year) 聚合后追加一条 run 记录：
+- venue_stats: 论文数、开源数、平均分与分数分位数
+- keyword_counts: 各关键词命中的论文数
+
+run 以 run_key（scored_papers.json 的内容哈希）去重：对同一份打分结果重新生成报告不会追加新的 run。
+因截止时间 / 预算提前停止的打分运行（score_schedule）记为 partial，查询时忽略，避免少算该 venue/year。
+
+同一个 (venue, year) 被多次运行抓取时，查询只取最新一次完整运行的聚合，
+因此"CVPR 2022 → 2024 diffusion 增长了多少"这类问题直接查库即可，不需要重新抓取。
+"""
+import os
+import re
+import sqlite3
+
+from utils import cassette
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    total_papers INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS venue_stats (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    venue TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    total_papers INTEGER NOT NULL,
+    open_source_count INTEGER NOT NULL,
+    avg_score REAL NOT NULL,
+    score_p50 REAL NOT NULL,
+    score_p90 REAL NOT NULL,
+    max_score REAL NOT NULL,
+    PRIMARY KEY (run_id, venue, year)
+);
+CREATE TABLE IF NOT EXISTS keyword_counts (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    venue TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, venue, year, keyword)
+);
+CREATE INDEX IF NOT EXISTS idx_venue_stats_key ON venue_stats (venue, year, run_id);
+CREATE INDEX IF NOT EXISTS idx_keyword_counts_key ON keyword_counts (keyword, venue, year, run_id);
+"""
+
+# 旧版本数据库的 runs 表缺少的列
+RUN_COLUMNS = {
+    'run_key': "TEXT",
+    'partial': "INTEGER NOT NULL DEFAULT 0",
+}
+
+# 每个 (venue, year) 最新一次完整（非 partial）运行
+LATEST_RUNS = """
+SELECT v.venue, v.year, MAX(v.run_id) AS run_id FROM venue_stats v JOIN runs r ON r.run_id = v.run_id
+WHERE r.partial = 0 GROUP BY v.venue, v.year
+"""
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return float(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))])
+
+
+def aggregate(papers, keywords, default_year):
+    """
+    一次遍历按 (venue, year) 聚合论文
+    返回 {(venue, year): {'total', 'open_source', 'scores', 'keywords': {kw: count}}}
+    关键词与 analyze_trends 一致：标题中按正则、忽略大小写匹配
+    """
+    patterns = [(kw, re.compile(kw, re.IGNORECASE)) for kw in keywords]
+    groups = {}
+    for paper in papers:
+        key = (paper.get('venue') or "unknown", int(paper.get('year') or default_year))
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {'total': 0, 'open_source': 0, 'scores': [],
+                                   'keywords': dict.fromkeys(keywords, 0)}
+        group['total'] += 1
+        if paper.get('repo') is not None:
+            group['open_source'] += 1
+        if paper.get('score') is not None:
+            group['scores'].append(paper['score'])
+        title = paper.get('title') or ""
+        for kw, pattern in patterns:
+            if pattern.search(title):
+                group['keywords'][kw] += 1
+    return groups
+
+
+class TrendStore:
+
+    def __init__(self, path="history/trends.db"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        with self.conn:
+            for column, definition in RUN_COLUMNS.items():
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {definition}")
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_runs_key ON runs (run_key)")
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, papers, keywords, run_key=None, partial=False):
+        """
+        追加一次运行的聚合结果，返回 (run_id, 是否新记录)
+        run_key 已记录过时不重复追加，返回已有的 run_id
+        """
+        if run_key is not None:
+            row = self.conn.execute("SELECT run_id FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+            if row:
+                return row[0], False
+        run_at = cassette.now()
+        groups = aggregate(papers, keywords, default_year=run_at.year)
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (run_at, total_papers, run_key, partial) VALUES (?, ?, ?, ?)",
+                (run_at.isoformat(timespec="seconds"), len(papers), run_key, int(bool(partial))),
+            )
+            run_id = cursor.lastrowid
+            for (venue, year), group in groups.items():
+                scores = sorted(group['scores'])
+                self.conn.execute(
+                    "INSERT INTO venue_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, venue, year, group['total'], group['open_source'],
+                     sum(scores) / len(scores) if scores else 0.0,
+                     _quantile(scores, 0.5), _quantile(scores, 0.9), float(scores[-1]) if scores else 0.0),
+                )
+                self.conn.executemany(
+                    "INSERT INTO keyword_counts VALUES (?, ?, ?, ?, ?)",
+                    [(run_id, venue, year, kw, count) for kw, count in group['keywords'].items()],
+                )
+        return run_id, True
+
+    def venue_history(self, venue=None):
+        """
+        各 (venue, year) 最新一次完整运行的统计，按 venue、year 排序
+        返回 [{'venue', 'year', 'total_papers', 'open_source_rate', 'avg_score', 'score_p50', 'score_p90', 'max_score'}]
+        """
+        query = f"""
+            SELECT s.venue, s.year, s.total_papers, s.open_source_count, s.avg_score, s.score_p50, s.score_p90, s.max_score
+            FROM venue_stats s JOIN ({LATEST_RUNS}) latest
+              ON s.venue = latest.venue AND s.year = latest.year AND s.run_id = latest.run_id
+            {"WHERE s.venue = ?" if venue else ""}
+            ORDER BY s.venue, s.year
+        """
+        rows = self.conn.execute(query, (venue,) if venue else ()).fetchall()
+        return [{
+            'venue': v, 'year': y, 'total_papers': total,
+            'open_source_rate': round(open_source / total, 4) if total else 0.0,
+            'avg_score': round(avg, 2), 'score_p50': p50, 'score_p90': p90, 'max_score': max_score,
+        } for v, y, total, open_source, avg, p50, p90, max_score in rows]
+
+    def keyword_history(self, keywords=None, venue=None):
+        """
+        关键词在各 (venue, year) 的论文数与占比（取最新一次完整运行）
+        返回 {keyword: [{'venue', 'year', 'count', 'share'}]}
+        """
+        conditions = []
+        params = []
+        if keywords:
+            conditions.append(f"k.keyword IN ({', '.join('?' * len(keywords))})")
+            params.extend(keywords)
+        if venue:
+            conditions.append("k.venue = ?")
+            params.append(venue)
+        query = f"""
+            SELECT k.keyword, k.venue, k.year, k.count, s.total_papers
+            FROM keyword_counts k
+            JOIN ({LATEST_RUNS}) latest
+              ON k.venue = latest.venue AND k.year = latest.year AND k.run_id = latest.run_id
+            JOIN venue_stats s
+              ON s.run_id = k.run_id AND s.venue = k.venue AND s.year = k.year
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            ORDER BY k.keyword, k.venue, k.year
+        """
+        history = {}
+        for kw, v, y, count, total in self.conn.execute(query, params):
+            history.setdefault(kw, []).append({
+                'venue': v, 'year': y, 'count': count, 'share': round(count / total, 4) if total else 0.0,
+            })
+        return history
+
+    def runs(self, limit=20):
+        """最近的运行记录 [(run_id, run_at, total_papers, partial)]"""
+        return self.conn.execute(
+            "SELECT run_id, run_at, total_papers, partial FROM runs ORDER BY run_id DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+
+def open_store(config):
+    """根据 config.yaml 的 history 段打开存储；未启用时返回 None"""
+    settings = (config or {}).get('history') or {}
+    if not settings.get('enabled', True):
+        return None
+    return TrendStore(settings.get('path', "history/trends.db"))
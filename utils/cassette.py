@@ -0,0 +1,170 @@
+"""
+HTTP 录制 / 回放（cassette）。
+
+record 模式：fetchers 与 LLMClient 发出的每个请求及其响应都写入一个 gzip 压缩的 JSON Lines 文件；
+replay 模式：从文件中按请求内容查找响应，完全不访问网络，也跳过限流等待。
+同一个请求出现多次时按录制顺序依次返回，用尽后重复返回最后一个响应。
+
+配置（config.yaml）:
+cassette:
+  mode: "off"        # off / record / replay
+  path: "output/cassettes/run.jsonl.gz"
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+from utils.metrics import metrics
+
+# 录制时保留的响应头（其余丢弃以减小体积）
+KEPT_HEADERS = ('Content-Type', 'Retry-After', 'X-RateLimit-Remaining', 'X-RateLimit-Reset')
+
+
+class CassetteMiss(Exception):
+    """回放模式下找不到对应的录制内容"""
+
+
+def request_key(kind, method, url, params=None, body=None):
+    """根据请求内容生成稳定的键（不包含 headers，避免把 token 写入 cassette）"""
+    payload = json.dumps([kind, method.upper(), url, params, body], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+
+    def __init__(self, path, mode):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.recorded_at = None
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._file = None
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+            self.recorded_at = datetime.now()
+            self._write({'type': 'meta', 'recorded_at': self.recorded_at.isoformat()})
+            atexit.register(self.close)
+        else:
+            self._load()
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    def _write(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.get('type') == 'meta':
+                    self.recorded_at = datetime.fromisoformat(entry['recorded_at'])
+                    continue
+                self._entries.setdefault(entry['key'], deque()).append(entry)
+        print(f"📼 Replaying {sum(len(v) for v in self._entries.values())} recorded exchanges from {self.path}")
+
+    def _next(self, key, description):
+        with self._lock:
+            queue = self._entries.get(key)
+            if not queue:
+                metrics.inc("cassette_lookups", result="miss")
+                raise CassetteMiss(f"No recorded exchange for {description}")
+            metrics.inc("cassette_lookups", result="hit")
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    # ── HTTP 层 ──────────────────────────────────────────
+    def record_http(self, method, url, params, body, response=None, error=None):
+        entry = {'key': request_key("http", method, url, params, body), 'method': method, 'url': url}
+        if error is not None:
+            entry['error'] = type(error).__name__
+            entry['message'] = str(error)
+        else:
+            entry['status'] = response.status_code
+            entry['headers'] = {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers}
+            entry['body'] = response.text
+        self._write(entry)
+
+    def replay_http(self, method, url, params, body):
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        entry = self._next(request_key("http", method, url, params, body), f"{method} {url}")
+        if 'error' in entry:
+            error_cls = getattr(requests.exceptions, entry['error'], requests.exceptions.RequestException)
+            raise error_cls(entry['message'])
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response._content = entry['body'].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+    # ── 调用层（用于不经过 http_client 的 SDK 调用）───────
+    def call(self, kind, request, func):
+        """
+        录制 / 回放一次函数调用的返回值（需可 JSON 序列化）
+        request: 描述该调用的可序列化内容，用于生成键
+        """
+        key = request_key(kind, "CALL", kind, None, request)
+        if self.replaying:
+            entry = self._next(key, kind)
+            if 'error' in entry:
+                raise Exception(entry['message'])
+            return entry['result']
+        try:
+            result = func()
+        except Exception as e:
+            self._write({'key': key, 'kind': kind, 'error': type(e).__name__, 'message': str(e)})
+            raise
+        self._write({'key': key, 'kind': kind, 'result': result})
+        return result
+
+
+_active = None
+
+
+def configure(config):
+    """根据 config.yaml 的 cassette 段启用录制 / 回放，返回当前 cassette（未启用时为 None）"""
+    global _active
+    settings = (config or {}).get('cassette', {}) or {}
+    mode = settings.get('mode', 'off')
+    if mode in (None, False, 'off'):
+        _active = None
+        return None
+    path = settings.get('path', 'output/cassettes/run.jsonl.gz')
+    _active = Cassette(path, mode)
+    print(f"📼 Cassette {mode} mode: {path}")
+    return _active
+
+
+def active():
+    return _active
+
+
+def now():
+    """当前时间；启用 cassette 时固定为录制开始时间，保证录制与回放中与时间相关的计算一致"""
+    if _active is not None and _active.recorded_at is not None:
+        return _active.recorded_at
+    return datetime.now()
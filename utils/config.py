@@ -0,0 +1,103 @@
+"""
+配置与关键词的统一加载入口：整个进程只解析一次 config.yaml / keywords.txt。
+"""
+import yaml
+
+DEFAULT_CONFIG_PATH = "configs/config.yaml"
+DEFAULT_KEYWORDS_PATH = "configs/keywords.txt"
+
+# 各阶段需要的配置项
+REQUIRED_KEYS = {
+    'fetch': [],
+    'filter': ['llm_provider'],
+    'score': ['github.token', 'paperswithcode'],
+    'report': ['llm_provider'],
+}
+
+SUPPORTED_PROVIDERS = ('huggingface', 'groq', 'together', 'openai', 'mock')
+
+_config = None
+_config_path = DEFAULT_CONFIG_PATH
+_keywords = None
+
+
+class ConfigError(ValueError):
+    """config.yaml 缺少必要配置或配置不合法"""
+
+
+def set_config_path(path):
+    """设置配置文件路径（需在第一次 load_config 之前调用）"""
+    global _config_path, _config
+    _config_path = path
+    _config = None
+
+
+def config_path():
+    """当前使用的配置文件路径（用于启动使用同一配置的子进程）"""
+    return _config_path
+
+
+def load_config():
+    """读取并缓存 config.yaml"""
+    global _config
+    if _config is None:
+        with open(_config_path, "r") as f:
+            _config = yaml.safe_load(f) or {}
+    return _config
+
+
+def load_keywords(path=DEFAULT_KEYWORDS_PATH):
+    """读取并缓存 keywords.txt（小写，去空行）"""
+    global _keywords
+    if _keywords is None:
+        with open(path, "r") as f:
+            _keywords = [line.strip().lower() for line in f if line.strip()]
+    return _keywords
+
+
+def _lookup(config, dotted):
+    value = config
+    for part in dotted.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def validate_config(config, stages):
+    """
+    检查指定阶段所需的配置项，缺失时抛出 ConfigError
+    stages: 如 ["fetch", "filter", "score", "report"]
+    """
+    missing = []
+    for stage in stages:
+        for key in REQUIRED_KEYS.get(stage, []):
+            if _lookup(config, key) is None and key not in missing:
+                missing.append(key)
+    if missing:
+        raise ConfigError(f"Missing required config keys: {', '.join(missing)}")
+
+    if any(stage in ('filter', 'report') for stage in stages):
+        # llm_provider 与 llm_fallbacks（provider 链）中的每个 provider 都要可用
+        for key, provider in [('llm_provider', config.get('llm_provider', 'huggingface'))] + \
+                [('llm_fallbacks', p) for p in config.get('llm_fallbacks') or []]:
+            if provider not in SUPPORTED_PROVIDERS:
+                raise ConfigError(f"Unsupported {key}: {provider} (choose from {', '.join(SUPPORTED_PROVIDERS)})")
+            # mock（本地 stub）不需要 api_key
+            if provider != 'mock' and (not isinstance(config.get(provider), dict) or 'api_key' not in config[provider]):
+                raise ConfigError(f"Missing '{provider}.api_key' for {key} '{provider}'")
+
+    # 录制 / 回放只支持单进程：worker 进程会重新打开同一个 cassette 文件（录制时截断并发写入，回放时各自完整回放）
+    cassette_mode = (config.get('cassette') or {}).get('mode')
+    if 'score' in stages and cassette_mode not in (None, False, 'off') and (config.get('score_queue') or {}).get('workers'):
+        raise ConfigError(f"cassette.mode '{cassette_mode}' cannot be combined with score_queue.workers > 0 "
+                          f"(record and replay run in a single process)")
+
+    deadline = (config.get('score_schedule') or {}).get('deadline')
+    if 'score' in stages and deadline:
+        from processors.score_scheduler import parse_deadline
+        try:
+            parse_deadline(deadline)
+        except (TypeError, ValueError):
+            raise ConfigError(f"Invalid score_schedule.deadline: {deadline!r} (use HH:MM or an ISO datetime)")
+    return config
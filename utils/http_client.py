@@ -0,0 +1,62 @@
+"""
+fetchers 与 LLMClient 共用的 HTTP 请求入口。
+所有请求在这里统一记录耗时、状态码和错误，便于定位慢在哪个 endpoint；
+启用 cassette 时在这里录制或回放。
+"""
+import time
+
+import requests
+
+from utils import cassette
+from utils.metrics import metrics
+
+
+def request(method, url, endpoint, **kwargs):
+    """
+    发送 HTTP 请求并记录指标
+    endpoint: 逻辑接口名（如 "github_search"），用作指标标签
+    """
+    tape = cassette.active()
+    with metrics.span("http", endpoint=endpoint):
+        start = time.perf_counter()
+        try:
+            if tape and tape.replaying:
+                response = tape.replay_http(method, url, kwargs.get('params'), kwargs.get('json'))
+            else:
+                try:
+                    response = requests.request(method, url, **kwargs)
+                except Exception as e:
+                    if tape:
+                        tape.record_http(method, url, kwargs.get('params'), kwargs.get('json'), error=e)
+                    raise
+                if tape:
+                    tape.record_http(method, url, kwargs.get('params'), kwargs.get('json'), response=response)
+        except Exception as e:
+            metrics.inc("http_errors", endpoint=endpoint, error=type(e).__name__)
+            raise
+        finally:
+            metrics.observe("http_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+        metrics.inc("http_requests", endpoint=endpoint, status=response.status_code)
+        return response
+
+
+def get(url, endpoint, **kwargs):
+    return request("GET", url, endpoint, **kwargs)
+
+
+def post(url, endpoint, **kwargs):
+    return request("POST", url, endpoint, **kwargs)
+
+
+def retry(endpoint, reason):
+    """记录一次重试"""
+    metrics.inc("http_retries", endpoint=endpoint, reason=reason)
+
+
+def wait(endpoint, seconds):
+    """限流 / 礼貌性等待；回放模式下不需要真的等待"""
+    metrics.rate_limit_wait(endpoint, seconds)
+    tape = cassette.active()
+    if tape and tape.replaying:
+        return
+    time.sleep(seconds)
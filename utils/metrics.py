@@ -0,0 +1,346 @@
+"""
+运行期指标与链路追踪。
+
+模块级的 `metrics` 注册表在整个进程内共享，fetchers / LLMClient / processors 通过它记录：
+  - span:     阶段和单次请求的耗时（可嵌套，记录父子关系）
+  - counter:  按 endpoint / status / retry 等标签计数
+  - histogram: 延迟分布
+  - cache:    命中 / 未命中，报告中给出命中率
+运行结束后 write_report() 输出 JSON 报告和 Prometheus 文本格式。
+"""
+import contextvars
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Prometheus 风格的延迟桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# 报告中保留的原始 span 数量上限
+MAX_TRACE_SPANS = 5000
+
+# 每个直方图用于计算分位数的样本数上限（蓄水池抽样，长时间运行时内存不随观测数增长）
+HISTOGRAM_RESERVOIR = 1024
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_current_stage = contextvars.ContextVar("current_stage", default=None)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(label_key, extra=None):
+    items = list(label_key) + list(extra or [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class _Histogram:
+    """桶计数、总和与最大值是精确的；分位数由最多 HISTOGRAM_RESERVOIR 个均匀抽样的样本估计"""
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'max', 'values', '_rng')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.max = None
+        self.values = []
+        self._rng = random.Random(0)
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.values) < HISTOGRAM_RESERVOIR:
+            self.values.append(value)
+        else:
+            # 蓄水池抽样：第 count 个观测以 HISTOGRAM_RESERVOIR / count 的概率替换一个已有样本
+            slot = self._rng.randrange(self.count)
+            if slot < HISTOGRAM_RESERVOIR:
+                self.values[slot] = value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def percentile(self, q):
+        if not self.values:
+            return None
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MetricsRegistry:
+    """进程内指标注册表（线程安全）"""
+
+    def __init__(self, prefix="research_agent"):
+        self.prefix = prefix
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.counters = {}
+            self.histograms = {}
+            self.spans = []
+
+    # ── 基本指标 ──────────────────────────────────────────
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def cache(self, name, hit):
+        """记录一次缓存查询"""
+        self.inc("cache_requests", cache=name, result="hit" if hit else "miss")
+
+    def rate_limit_wait(self, endpoint, seconds):
+        """记录一次限流等待"""
+        self.inc("rate_limit_waits", endpoint=endpoint)
+        self.inc("rate_limit_wait_seconds", seconds, endpoint=endpoint)
+
+    # ── span ─────────────────────────────────────────────
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        计时 span，可嵌套：
+            with metrics.span("stage", stage="score"):
+                ...
+        耗时同时写入 span_seconds 直方图
+        """
+        if not self.enabled:
+            yield None
+            return
+        span = self._new_span(name, labels)
+        token = _current_span.set(span)
+        stage_token = _current_stage.set(span['labels']['stage']) if name == "stage" and 'stage' in labels else None
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span['error'] = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            _current_span.reset(token)
+            if stage_token is not None:
+                _current_stage.reset(stage_token)
+            self._finish_span(span, labels, duration)
+
+    def start_span(self, name, **labels):
+        """
+        不设置 contextvar 的 span，用于跨 yield 计时的生成器：生成器可能在其他线程 / 上下文中被关闭，
+        此时无法还原 contextvar。父 span 为调用时的当前 span，其中的请求不会挂到这个 span 下。
+        结束时调用 finish_span(span)
+        """
+        if not self.enabled:
+            return None
+        span = self._new_span(name, labels)
+        span['_labels'] = labels
+        span['_perf_start'] = time.perf_counter()
+        return span
+
+    def finish_span(self, span, error=None):
+        if span is None:
+            return
+        if error:
+            span['error'] = error
+        labels = span.pop('_labels')
+        self._finish_span(span, labels, time.perf_counter() - span.pop('_perf_start'))
+
+    def _new_span(self, name, labels):
+        parent = _current_span.get()
+        return {
+            'id': next(self._ids),
+            'parent': parent['id'] if parent else None,
+            'name': name,
+            'labels': {k: str(v) for k, v in labels.items()},
+            'start': round(time.time() - self.started_at, 6),
+        }
+
+    def _finish_span(self, span, labels, duration):
+        span['duration'] = round(duration, 6)
+        self.observe("span_seconds", duration, span=span['name'], **labels)
+        with self._lock:
+            if len(self.spans) < MAX_TRACE_SPANS:
+                self.spans.append(span)
+
+    def current_stage(self):
+        """返回当前所在的 stage 名称（用于结构化日志）"""
+        return _current_stage.get()
+
+    # ── 报告 ─────────────────────────────────────────────
+    def cache_ratios(self):
+        totals = {}
+        for (name, labels), value in self.counters.items():
+            if name != "cache_requests":
+                continue
+            label_dict = dict(labels)
+            entry = totals.setdefault(label_dict['cache'], {'hit': 0, 'miss': 0})
+            entry[label_dict['result']] += value
+        return {
+            cache: {**counts, 'ratio': round(counts['hit'] / (counts['hit'] + counts['miss']), 4)}
+            for cache, counts in totals.items() if counts['hit'] + counts['miss']
+        }
+
+    def to_dict(self):
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            histograms = [
+                {
+                    'name': name, 'labels': dict(labels), 'count': hist.count,
+                    'sum': round(hist.sum, 6),
+                    'mean': round(hist.sum / hist.count, 6) if hist.count else None,
+                    'p50': hist.percentile(0.5), 'p95': hist.percentile(0.95), 'p99': hist.percentile(0.99),
+                    'max': hist.max,
+                }
+                for (name, labels), hist in sorted(self.histograms.items())
+            ]
+            spans = list(self.spans)
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'wall_seconds': round(time.time() - self.started_at, 3),
+            'counters': counters,
+            'histograms': histograms,
+            'cache_ratios': self.cache_ratios(),
+            'spans': spans,
+        }
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            seen = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{name}_total"
+                if metric not in seen:
+                    lines.append(f"# TYPE {metric} counter")
+                    seen.add(metric)
+                lines.append(f"{metric}{_format_labels(labels)} {value}")
+            for (name, labels), hist in sorted(self.histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                if metric not in seen:
+                    lines.append(f"# TYPE {metric} histogram")
+                    seen.add(metric)
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f"{metric}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{metric}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist.count}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {round(hist.sum, 6)}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {hist.count}")
+        ratios = self.cache_ratios()
+        if ratios:
+            metric = f"{self.prefix}_cache_hit_ratio"
+            lines.append(f"# TYPE {metric} gauge")
+            for cache, entry in sorted(ratios.items()):
+                lines.append(f'{metric}{{cache="{cache}"}} {entry["ratio"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, output_dir="output"):
+        """写出 run_metrics.json 与 run_metrics.prom，返回两个文件路径"""
+        os.makedirs(output_dir, exist_ok=True)
+        json_path = os.path.join(output_dir, "run_metrics.json")
+        prom_path = os.path.join(output_dir, "run_metrics.prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        with open(prom_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
+
+
+class StructuredStdout:
+    """
+    将 print 输出的每一行转换为一条 JSON 日志：
+    {"ts": ..., "level": ..., "stage": ..., "msg": ...}
+    """
+
+    def __init__(self, stream, registry):
+        self.stream = stream
+        self.registry = registry
+        self._buffer = ""
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _level(line):
+        if "❌" in line:
+            return "error"
+        if "⚠️" in line:
+            return "warning"
+        return "info"
+
+    def write(self, text):
+        with self._lock:
+            self._buffer += text
+            while "\n" in self._buffer:
+                line, self._buffer = self._buffer.split("\n", 1)
+                self._emit(line)
+        return len(text)
+
+    def _emit(self, line):
+        msg = line.strip()
+        if not msg:
+            return
+        record = {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'level': self._level(msg),
+            'stage': self.registry.current_stage(),
+            'msg': msg,
+        }
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        with self._lock:
+            if self._buffer:
+                self._emit(self._buffer)
+                self._buffer = ""
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def enable_structured_logs():
+    """把 stdout 上的 print 输出切换为结构化 JSON 日志"""
+    if not isinstance(sys.stdout, StructuredStdout):
+        sys.stdout = StructuredStdout(sys.stdout, metrics)
+
+
+def configure(config):
+    """
+    根据 config.yaml 的 metrics 段配置：
+    metrics:
+      enabled: true
+      log_format: "text"   # 或 "json"
+    """
+    settings = (config or {}).get('metrics', {}) or {}
+    metrics.enabled = settings.get('enabled', True)
+    if settings.get('log_format', 'text') == 'json':
+        enable_structured_logs()
+    return settings
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,127 @@
+"""
+未找到仓库的论文的负缓存（SQLite）。
+
+大部分论文没有 GitHub 仓库，但 search_paper_repository 每次运行都会为它们跑完整个搜索策略级联
+（多次搜索 + 验证）。这里按规范化标题记录"未找到仓库"以及尝试过的策略，
+在退避期内直接跳过搜索；退避期随连续未命中次数指数增长（1 天、3 天、9 天……，不超过 max_ttl_days）。
+之后的搜索找到仓库时删除该记录。
+
+搜索因限流、HTTP 错误或异常而未完整执行时不记录，避免把临时故障当作"没有仓库"。
+cassette 录制 / 回放时不使用缓存，保证请求序列与本地状态无关。
+
+配置（config.yaml）:
+negative_cache:
+  enabled: true
+  path: "history/negative_matches.db"
+  ttl_days: 1            # 第一次未命中后的重查间隔
+  backoff_factor: 3      # 每次连续未命中后间隔乘以该系数
+  max_ttl_days: 30
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from utils import cassette
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS negative_matches (
+    title_key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    misses INTEGER NOT NULL,
+    strategies TEXT NOT NULL,
+    first_miss INTEGER NOT NULL,
+    last_checked INTEGER NOT NULL,
+    next_check INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+SECONDS_PER_DAY = 86400
+
+
+def normalize_title(title):
+    """小写、去标点、合并空白：同一论文在不同会议页面上的标题写法映射到同一个键"""
+    return " ".join(re.sub(r"[^\w\s]", " ", (title or "").lower()).split())
+
+
+class NegativeCache:
+
+    def __init__(self, path="history/negative_matches.db", ttl_days=1, backoff_factor=3, max_ttl_days=30):
+        self.path = path
+        self.ttl_days = ttl_days
+        self.backoff_factor = backoff_factor
+        self.max_ttl_days = max_ttl_days
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # 分布式打分时多个 worker 进程共享同一文件
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def ttl(self, misses):
+        """连续 misses 次未命中后的重查间隔（天）"""
+        return min(self.max_ttl_days, self.ttl_days * self.backoff_factor ** max(0, misses - 1))
+
+    def lookup(self, title):
+        """
+        仍在退避期内时返回 {'misses', 'strategies', 'last_checked', 'next_check'}，
+        否则（未记录或已到重查时间）返回 None
+        """
+        now = int(cassette.now().timestamp())
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT misses, strategies, last_checked, next_check FROM negative_matches WHERE title_key = ?",
+                (normalize_title(title),),
+            ).fetchone()
+        if row is None or row[3] <= now:
+            return None
+        return {'misses': row[0], 'strategies': json.loads(row[1]), 'last_checked': row[2], 'next_check': row[3]}
+
+    def record_miss(self, title, strategies):
+        """记录一次完整搜索未找到仓库，返回下一次重查前的天数"""
+        key = normalize_title(title)
+        now = int(cassette.now().timestamp())
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT misses, first_miss FROM negative_matches WHERE title_key = ?", (key,)
+            ).fetchone()
+            misses = (row[0] if row else 0) + 1
+            ttl_days = self.ttl(misses)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO negative_matches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, title, misses, json.dumps(strategies, ensure_ascii=False), row[1] if row else now, now,
+                 now + int(ttl_days * SECONDS_PER_DAY)),
+            )
+        return ttl_days
+
+    def clear(self, title):
+        """找到仓库后删除记录"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM negative_matches WHERE title_key = ?", (normalize_title(title),))
+
+    def stats(self):
+        """{'entries', 'due'}：记录总数与已到重查时间的记录数"""
+        now = int(cassette.now().timestamp())
+        with self._lock:
+            entries, due = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(next_check <= ?), 0) FROM negative_matches", (now,)
+            ).fetchone()
+        return {'entries': entries, 'due': due}
+
+
+def open_cache(config):
+    """根据 config.yaml 的 negative_cache 段打开缓存；未启用或处于 cassette 录制 / 回放时返回 None"""
+    settings = (config or {}).get('negative_cache') or {}
+    if not settings.get('enabled', True) or cassette.active():
+        return None
+    return NegativeCache(
+        settings.get('path', "history/negative_matches.db"),
+        settings.get('ttl_days', 1),
+        settings.get('backoff_factor', 3),
+        settings.get('max_ttl_days', 30),
+    )
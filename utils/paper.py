@@ -0,0 +1,121 @@
+"""
+论文记录：带 __slots__ 的紧凑对象，从 fetcher 一路传到打分阶段，各阶段原地更新，不再反复复制 dict。
+
+- venue / decision / 作者名用 sys.intern 驻留（大量论文共享同一字符串），authors 存为 tuple
+- 摘要生成后 process_papers 会释放 abstract，后续阶段只保留 summary
+- 提供 get / [] 访问，沿用 dict 写法的代码（p.get('repo')、p['stars'] = 0）无需修改；
+  值为 None 的字段视为缺失（get 返回默认值）
+- 与各阶段 JSON（raw / filtered / scored）互相转换，输出的键与键顺序与原来的 dict 一致：
+    [Paper.from_dict(d) for d in json.load(f)]           # 只转换顶层记录（嵌套的 dict 字段保持为 dict）
+    json.dump(papers, f, indent=2, default=json_default(SCORED_FIELDS))
+"""
+import sys
+
+# 各阶段 JSON 的字段（顺序即输出顺序）
+RAW_FIELDS = ('title', 'authors', 'abstract', 'pdf_url', 'created', 'venue', 'year', 'decision')
+FILTERED_FIELDS = ('title', 'authors', 'summary', 'pdf_url', 'venue', 'year', 'decision', 'relevance')
+SCORED_FIELDS = ('title', 'authors', 'summary', 'pdf_url', 'venue', 'year',
+                 'repo', 'stars', 'days_since_created', 'star_velocity', 'score')
+
+# 只在有值时输出的字段（OpenReview 的 created、rank 模式的 relevance）
+OPTIONAL_FIELDS = frozenset(('created', 'relevance'))
+
+_INTERNED = frozenset(('venue', 'decision'))
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Paper:
+    __slots__ = ('title', 'authors', 'abstract', 'summary', 'pdf_url', 'created', 'venue', 'year', 'decision',
+                 'relevance', 'repo', 'stars', 'days_since_created', 'star_velocity', 'score', 'extra')
+
+    def __init__(self, title="", authors=(), abstract=None, summary=None, pdf_url="", venue="", year=None,
+                 decision=None, created=None, **extra):
+        self.title = title
+        self.authors = tuple(_intern(a) for a in authors or ())
+        self.abstract = abstract
+        self.summary = summary
+        self.pdf_url = pdf_url
+        self.created = created
+        self.venue = _intern(venue)
+        self.year = year
+        self.decision = _intern(decision)
+        self.relevance = None
+        self.repo = None
+        self.stars = None
+        self.days_since_created = None
+        self.star_velocity = None
+        self.score = None
+        # JSON 中出现的其他字段原样保留
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """由任一阶段的 JSON dict 构建"""
+        paper = cls()
+        for key, value in data.items():
+            paper[key] = value
+        return paper
+
+    @classmethod
+    def coerce(cls, paper):
+        """dict 转为 Paper，已是 Paper 时原样返回"""
+        return paper if isinstance(paper, cls) else cls.from_dict(paper)
+
+    def to_dict(self, fields=SCORED_FIELDS):
+        data = {}
+        for field in fields:
+            value = getattr(self, field)
+            if value is None and field in OPTIONAL_FIELDS:
+                continue
+            data[field] = list(value) if field == 'authors' else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def release_abstract(self):
+        """摘要已生成后释放原始 abstract"""
+        self.abstract = None
+
+    # ── dict 兼容接口 ─────────────────────────────────────
+    def get(self, key, default=None):
+        if key in Paper.__slots__ and key != 'extra':
+            value = getattr(self, key)
+        else:
+            value = (self.extra or {}).get(key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None and not (key in Paper.__slots__ or key in (self.extra or {})):
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key == 'authors':
+            value = tuple(_intern(a) for a in value or ())
+        elif key in _INTERNED:
+            value = _intern(value)
+        if key in Paper.__slots__ and key != 'extra':
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __repr__(self):
+        return f"Paper({self.title!r}, venue={self.venue!r}, year={self.year!r})"
+
+
+def json_default(fields):
+    """json.dump 的 default 参数：按 fields 把 Paper 转为 dict（编码时逐条转换）"""
+    def default(obj):
+        if isinstance(obj, Paper):
+            return obj.to_dict(fields)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return default
@@ -0,0 +1,96 @@
+"""
+CPU 密集任务的进程池执行（绕开 GIL）。
+
+调用方把输入切成紧凑、可 pickle 的 chunk，交给模块级的纯函数处理：
+    results = parallel.map_chunks(parse_listing_chunk, chunks, "cvf_parse", venue, year)
+返回与 chunks 一一对应的结果列表。进程池未启用、输入太少或进程池不可用时在当前进程内按顺序执行，结果相同。
+
+配置（config.yaml）:
+parallel:
+  processes: 0        # 0 / 1: 进程内执行；> 1: 进程池大小；"auto": CPU 核数
+  chunk_size: 200     # 每个 chunk 的条目数（由调用方用于切分）
+  min_items: 1000     # 条目数少于该值时不启用进程池（进程启动与序列化开销大于收益）
+"""
+import atexit
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.config import load_config
+from utils.metrics import metrics
+
+_pool = None
+_pool_size = 0
+
+
+def settings():
+    try:
+        return load_config().get('parallel') or {}
+    except OSError:
+        return {}
+
+
+def process_count():
+    processes = settings().get('processes', 0)
+    if processes == "auto":
+        return os.cpu_count() or 1
+    return int(processes or 0)
+
+
+def chunk_size(default=200):
+    return settings().get('chunk_size', default)
+
+
+def enabled(n_items):
+    """条目数达到 min_items 且配置了多个进程时使用进程池"""
+    return process_count() > 1 and n_items >= settings().get('min_items', 1000)
+
+
+def chunked(items, size):
+    """按 size 切分列表"""
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _get_pool():
+    global _pool, _pool_size
+    size = process_count()
+    if _pool is None or _pool_size != size:
+        shutdown()
+        _pool = ProcessPoolExecutor(max_workers=size)
+        _pool_size = size
+    return _pool
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+atexit.register(shutdown)
+
+
+def map_chunks(func, chunks, task, *args, use_pool=True):
+    """
+    对每个 chunk 执行 func(chunk, *args)，按顺序返回结果
+    func 与参数必须可 pickle（模块级函数、基本类型）；use_pool=False 或进程池出错时在进程内执行
+    """
+    if use_pool and process_count() > 1 and len(chunks) > 1:
+        try:
+            pool = _get_pool()
+            with metrics.span("parallel", task=task, mode="process"):
+                futures = [pool.submit(func, chunk, *args) for chunk in chunks]
+                results = [future.result() for future in futures]
+            metrics.inc("parallel_chunks", len(chunks), task=task, mode="process")
+            return results
+        except (BrokenProcessPool, OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            # 进程池不可用（受限环境、pickle 失败等）时退回进程内执行
+            print(f"⚠️  Process pool unavailable for {task} ({type(e).__name__}: {e}), running in-process")
+            shutdown()
+    with metrics.span("parallel", task=task, mode="inline"):
+        results = [func(chunk, *args) for chunk in chunks]
+    metrics.inc("parallel_chunks", len(chunks), task=task, mode="inline")
+    return results
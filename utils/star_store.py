@@ -0,0 +1,97 @@
+"""
+仓库 star 快照存储（SQLite）。
+
+GitHubFetcher 每次获取仓库统计时追加一条 (repo, 时间, stars, forks) 快照，
+之后由快照差分得到 star 增速（stars/天），不需要额外调用分页的 stargazers 接口。
+只有一条快照时退化为生命周期平均增速 stars / days_since_created。
+
+配置（config.yaml）:
+star_history:
+  enabled: true
+  path: "history/stars.db"
+  window_days: 30      # 增速计算窗口
+"""
+import os
+import sqlite3
+import threading
+
+from utils import cassette
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS star_snapshots (
+    repo TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    stars INTEGER NOT NULL,
+    forks INTEGER NOT NULL,
+    PRIMARY KEY (repo, ts)
+) WITHOUT ROWID;
+"""
+
+SECONDS_PER_DAY = 86400
+
+
+class StarStore:
+
+    def __init__(self, path="history/stars.db", window_days=30):
+        self.path = path
+        self.window_days = window_days
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def record(self, repo, stars, forks, when=None):
+        """追加一条快照（同一时刻重复记录时覆盖）"""
+        ts = int((when or cassette.now()).timestamp())
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO star_snapshots VALUES (?, ?, ?, ?)",
+                              (repo.lower(), ts, int(stars or 0), int(forks or 0)))
+
+    def history(self, repo):
+        """[(ts, stars, forks)]，按时间升序"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT ts, stars, forks FROM star_snapshots WHERE repo = ? ORDER BY ts", (repo.lower(),)
+            ).fetchall()
+
+    def velocity(self, repo, days_since_created=None):
+        """
+        最近约 window_days 天的 star 增速（stars/天）
+        返回 (velocity, basis)，basis 为 'snapshots' / 'lifetime'；无法计算时返回 (None, None)
+        """
+        with self._lock:
+            latest = self.conn.execute(
+                "SELECT ts, stars FROM star_snapshots WHERE repo = ? ORDER BY ts DESC LIMIT 1", (repo.lower(),)
+            ).fetchone()
+            if latest is None:
+                return None, None
+            # 基准快照：窗口起点之前最近的一条；没有则取最早的一条
+            earliest = self.conn.execute(
+                "SELECT ts, stars FROM star_snapshots WHERE repo = ? AND ts <= ? ORDER BY ts DESC LIMIT 1",
+                (repo.lower(), latest[0] - self.window_days * SECONDS_PER_DAY),
+            ).fetchone() or self.conn.execute(
+                "SELECT ts, stars FROM star_snapshots WHERE repo = ? ORDER BY ts LIMIT 1", (repo.lower(),)
+            ).fetchone()
+
+        elapsed_days = (latest[0] - earliest[0]) / SECONDS_PER_DAY
+        # 至少间隔一天的快照才足以估计增速
+        if elapsed_days >= 1:
+            return round(max(0, latest[1] - earliest[1]) / elapsed_days, 2), 'snapshots'
+        if days_since_created is not None:
+            return round(latest[1] / max(days_since_created, 1), 2), 'lifetime'
+        return None, None
+
+
+def open_store(config):
+    """
+    根据 config.yaml 的 star_history 段打开存储；未启用或处于 cassette 录制 / 回放时返回 None
+    （回放时时钟固定在录制时刻，读写本机快照会让增速依赖本地数据库，结果不可复现）
+    """
+    settings = (config or {}).get('star_history') or {}
+    if not settings.get('enabled', True) or cassette.active():
+        return None
+    return StarStore(settings.get('path', "history/stars.db"), settings.get('window_days', 30))
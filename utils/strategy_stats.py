@@ -0,0 +1,148 @@
+"""
+GitHub 仓库搜索策略的命中统计（SQLite），用于自适应调整策略顺序。
+
+search_paper_repository 的每个策略（exact、context_pair:paper、multi、single 等）执行后记录
+(会议, 策略) 的尝试次数、通过验证的匹配数和消耗的 API 调用数。之后的搜索按"每次 API 调用的期望匹配数"
+对策略排序：
+
+- 期望值 = (accepted + 1) / (api_calls + PRIOR_CALLS)
+- 某会议下尝试次数不足 min_attempts 时使用所有会议的合计统计；仍不足的策略排在最前面（先积累统计），
+  全部没有统计时即默认顺序
+- 期望值低于 min_yield 的策略跳过；但每篇论文以 explore_rate 的概率（按标题确定）仍然尝试，
+  保证被跳过的策略统计继续更新
+- 每篇论文最多尝试 max_per_paper 个策略
+
+cassette 录制 / 回放时不使用统计（策略顺序固定，请求序列可复现）。
+
+配置（config.yaml）:
+search_strategies:
+  adaptive: true
+  path: "history/search_strategies.db"
+  max_per_paper: 6
+  min_attempts: 20
+  min_yield: 0.005
+  explore_rate: 0.1
+"""
+import os
+import random
+import sqlite3
+import threading
+
+from utils import cassette
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS strategy_stats (
+    venue TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    accepted INTEGER NOT NULL,
+    api_calls INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (venue, strategy)
+) WITHOUT ROWID;
+"""
+
+# 期望值的先验：相当于每个策略预先记了 1 次匹配、PRIOR_CALLS 次 API 调用
+PRIOR_CALLS = 10
+
+
+class StrategyStats:
+
+    def __init__(self, path="history/search_strategies.db", min_attempts=20, min_yield=0.005, explore_rate=0.1):
+        self.path = path
+        self.min_attempts = min_attempts
+        self.min_yield = min_yield
+        self.explore_rate = explore_rate
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # 分布式打分时多个 worker 进程共享同一文件
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def record(self, venue, strategy, accepted, api_calls):
+        """累加一次策略执行的结果"""
+        now = int(cassette.now().timestamp())
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO strategy_stats VALUES (?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (venue, strategy) DO UPDATE SET attempts = attempts + 1, "
+                "accepted = accepted + excluded.accepted, api_calls = api_calls + excluded.api_calls, "
+                "updated_at = excluded.updated_at",
+                (venue or "", strategy, int(bool(accepted)), api_calls, now),
+            )
+
+    def _rows(self, venue):
+        """({strategy: (attempts, accepted, api_calls)} 该会议, 同结构的所有会议合计)"""
+        with self._lock:
+            per_venue = {s: (a, h, c) for s, a, h, c in self.conn.execute(
+                "SELECT strategy, attempts, accepted, api_calls FROM strategy_stats WHERE venue = ?", (venue or "",)
+            )}
+            overall = {s: (a, h, c) for s, a, h, c in self.conn.execute(
+                "SELECT strategy, SUM(attempts), SUM(accepted), SUM(api_calls) FROM strategy_stats GROUP BY strategy"
+            )}
+        return per_venue, overall
+
+    def expected_yield(self, strategy, per_venue, overall):
+        """每次 API 调用的期望匹配数；统计不足时返回 None"""
+        for rows in (per_venue, overall):
+            attempts, accepted, api_calls = rows.get(strategy, (0, 0, 0))
+            if attempts >= self.min_attempts:
+                return (accepted + 1) / (api_calls + PRIOR_CALLS)
+        return None
+
+    def plan(self, strategies, venue, paper_title, max_per_paper=None):
+        """
+        strategies: 按默认顺序排列的 [(name, run)]
+        返回 (要执行的 [(name, run)], 跳过的策略名列表)
+        """
+        per_venue, overall = self._rows(venue)
+        yields = [self.expected_yield(name, per_venue, overall) for name, _ in strategies]
+        # 按论文标题确定是否探索，同一论文每次运行的决定一致
+        explore = random.Random(paper_title).random() < self.explore_rate
+        kept, skipped = [], []
+        for (name, run), value in zip(strategies, yields):
+            if value is not None and value < self.min_yield and not explore:
+                skipped.append(name)
+            else:
+                kept.append((value, len(kept), name, run))
+        # 有统计的策略按期望值降序；没有统计的视为最优先（先积累统计），同值保持默认顺序
+        kept.sort(key=lambda item: (-(item[0] if item[0] is not None else float('inf')), item[1]))
+        planned = [(name, run) for _, _, name, run in kept]
+        if max_per_paper:
+            skipped.extend(name for name, _ in planned[max_per_paper:])
+            planned = planned[:max_per_paper]
+        return planned, skipped
+
+    def summary(self):
+        """所有会议合计的每个策略统计，按每次调用的匹配数降序"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT strategy, SUM(attempts), SUM(accepted), SUM(api_calls) FROM strategy_stats GROUP BY strategy"
+            ).fetchall()
+        result = [{
+            'strategy': strategy,
+            'attempts': attempts,
+            'accepted': accepted,
+            'api_calls': api_calls,
+            'matches_per_call': accepted / api_calls if api_calls else 0.0,
+        } for strategy, attempts, accepted, api_calls in rows]
+        result.sort(key=lambda r: r['matches_per_call'], reverse=True)
+        return result
+
+
+def open_store(config):
+    """根据 config.yaml 的 search_strategies 段打开统计；未启用自适应或处于 cassette 录制 / 回放时返回 None"""
+    settings = (config or {}).get('search_strategies') or {}
+    if not settings.get('adaptive', True) or cassette.active():
+        return None
+    return StrategyStats(
+        settings.get('path', "history/search_strategies.db"),
+        settings.get('min_attempts', 20),
+        settings.get('min_yield', 0.005),
+        settings.get('explore_rate', 0.1),
+    )